@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""Compare model artifact size and load time against plain pickle."""
+
+import mmap
+import os
+import pickle
+import sys
+import tempfile
+import time
+
+from sklearn.datasets import make_classification
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.cloud import artifact_format
+
+
+def best_time(fn, repeats):
+    #Best wall time of `repeats` calls, in milliseconds
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def load_mapped(path):
+    #Load from a read-only mapping, as the disk artifact cache does
+    with open(path, 'rb') as f:
+        return artifact_format.loads(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+def main():
+    X, y = make_classification(n_samples=50000, n_features=20, n_informative=10, random_state=0)
+    model = Pipeline([
+        ('scaler', StandardScaler()),
+        ('model', RandomForestClassifier(n_estimators=100, random_state=0))
+    ]).fit(X, y)
+
+    raw = pickle.dumps(model)
+    print(f"{'format':>12} {'MB':>8} {'ratio':>6} {'dump ms':>9} {'load ms':>9} {'mmap load ms':>13}")
+    print(f"{'pickle':>12} {len(raw) / 1e6:>8.2f} {1:>6.2f} "
+          f"{best_time(lambda: pickle.dumps(model), 3):>9.1f} "
+          f"{best_time(lambda: pickle.loads(raw), 5):>9.1f} {'-':>13}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # The last row keeps every tree's node table out-of-band and mappable
+        for spec, mmap_min_bytes in [('none', None), ('zlib:1', None), ('zlib:6', None),
+                                     ('lzma:1', None), ('lzma:6', None), ('none', 0)]:
+            data = artifact_format.dumps(model, spec, mmap_min_bytes)
+            label = spec if mmap_min_bytes is None else f'{spec}/mmap'
+            path = os.path.join(tmp, label.replace(':', '-').replace('/', '-'))
+            with open(path, 'wb') as f:
+                f.write(data)
+            print(f"{label:>12} {len(data) / 1e6:>8.2f} {len(data) / len(raw):>6.2f} "
+                  f"{best_time(lambda: artifact_format.dumps(model, spec, mmap_min_bytes), 3):>9.1f} "
+                  f"{best_time(lambda: artifact_format.loads(data), 5):>9.1f} "
+                  f"{best_time(lambda: load_mapped(path), 5):>13.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""Benchmark FlatForest against scikit-learn RandomForestClassifier.predict."""
+
+import os
+import sys
+import time
+
+import numpy as np
+from sklearn.datasets import make_classification
+from sklearn.ensemble import RandomForestClassifier
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.forest import FlatForest
+
+
+def best_time(fn, X, repeats):
+    #Best wall time of `repeats` calls, in milliseconds
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(X)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    X, y = make_classification(n_samples=20000, n_features=10, n_informative=6,
+                               n_classes=3, random_state=0)
+    forest = RandomForestClassifier(n_estimators=100, random_state=0).fit(X, y)
+    flat = FlatForest.from_sklearn(forest)
+    X_new = np.random.default_rng(0).normal(size=(100000, X.shape[1]))
+
+    print(f"{'rows':>8} {'sklearn ms':>12} {'flat ms':>10} {'speedup':>8} identical")
+    for n_rows in [1, 100, 1000, 10000, 100000]:
+        batch = X_new[:n_rows]
+        repeats = 50 if n_rows <= 1000 else 3
+        sklearn_ms = best_time(forest.predict, batch, repeats)
+        flat_ms = best_time(flat.predict, batch, repeats)
+        identical = np.array_equal(forest.predict_proba(batch), flat.predict_proba(batch))
+        print(f"{n_rows:>8} {sklearn_ms:>12.2f} {flat_ms:>10.2f} {sklearn_ms / flat_ms:>7.1f}x {identical}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""Add the GET /models secondary indexes to an existing ml-models table.
+
+Each run requests the next missing index (DynamoDB builds one at a time) and
+backfills `created_bucket` on items written before the time-bucketed index
+existed, then tags the table so created_after queries start using that index.
+Re-run until every index reports ACTIVE. The API never changes the table
+schema itself.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.cloud.dynamodb_client import GLOBAL_SECONDARY_INDEXES, DynamoDBClient
+
+
+def main():
+    client = DynamoDBClient()
+    requested = client.create_missing_index()
+    if requested:
+        print(f"Requested index {requested}")
+
+    # Items created from now on carry created_bucket, so one full pass suffices
+    print(f"Backfilled created_bucket on {client.backfill_created_buckets()} items")
+    client.mark_backfill_complete()
+    print("Recorded the created_bucket backfill as complete")
+
+    client.table.reload()
+    statuses = {index['IndexName']: index['IndexStatus']
+                for index in (client.table.global_secondary_indexes or [])}
+    for index in GLOBAL_SECONDARY_INDEXES:
+        print(f"{index['IndexName']}: {statuses.get(index['IndexName'], 'MISSING')}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,2 +1,9 @@
-"""ML Pipeline package."""
-from .data_processor import DataProcessor
+"""ML Pipeline package."""
+
+
+def __getattr__(name):
+    # Imported lazily so predict-only processes can use src.* without pandas/sklearn
+    if name == 'DataProcessor':
+        from .data_processor import DataProcessor
+        return DataProcessor
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
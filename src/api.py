@@ -6,29 +6,122 @@ Serves your existing DataProcessor through HTTP endpoints
 from flask import Flask, jsonify, request
 import json
 import os
+import queue
+import threading
+from typing import NamedTuple, Optional
+from sklearn.ensemble import RandomForestClassifier
 from src.data_processor import DataProcessor
+from src.dataset_cache import DatasetCache
+from src.jobs import JobQueue
 
 app = Flask(__name__)
 
-# Global processor instance
-processor = DataProcessor()
-model_trained = False
-last_training_data = None
+# Parsed datasets shared by every processor in this process
+dataset_cache = DatasetCache()
+
+
+class ModelSnapshot(NamedTuple):
+    """Immutable view of the served model.
+
+    A snapshot is never modified once published: writers build a new one off
+    to the side and swap the module-level `snapshot` reference. Reading that
+    reference is atomic, so request handlers take it once without a lock and
+    use only that snapshot for the rest of the request.
+    """
+    version: int
+    processor: Optional[DataProcessor]
+    training_data: Optional[dict]
+    model_params: dict
+
+    @property
+    def trained(self):
+        return self.processor is not None
+
+
+def initial_snapshot():
+    """Untrained snapshot with the default model configuration"""
+    return ModelSnapshot(0, None, None, DataProcessor().model.get_params())
+
+
+# The served model; replaced whole by publish(), never mutated
+snapshot = initial_snapshot()
+# Serializes writers so versions are not reused; readers never take it
+_publish_lock = threading.Lock()
+
+
+def publish(processor=None, training_data=None, model_params=None):
+    """Swap in a new snapshot and return it; in-flight requests keep the old one"""
+    global snapshot
+    if processor is not None:
+        processor.dataset_cache = dataset_cache
+        if isinstance(processor.model, RandomForestClassifier):
+            # Compile now so readers never build it lazily on the hot path
+            processor.compiled_model()
+    with _publish_lock:
+        snapshot = ModelSnapshot(snapshot.version + 1, processor, training_data,
+                                 model_params or snapshot.model_params)
+        return snapshot
+
+# Background training jobs (POST /train with "async": true)
+jobs = JobQueue()
+
+
+def train_processor(data_path, model_params=None, cache=None, progress=None):
+    """Train a fresh processor on data_path; returns it with its training summary.
+
+    Module-level so training jobs can run it in a worker process.
+    """
+    progress = progress or (lambda fraction, message=None: None)
+    trained = DataProcessor(dataset_cache=cache)
+    if model_params:
+        trained.model.set_params(**model_params)
+    
+    progress(0.1, "Loading data")
+    data = trained.load_data(data_path)
+    clean_data = trained.clean_data(data)
+    X, y = trained.split_features_target(clean_data)
+    X_train, X_test, y_train, y_test = trained.prepare_data(X, y)
+    
+    progress(0.3, "Training model")
+    train_accuracy = trained.train_model(X_train, y_train)
+    progress(0.9, "Evaluating model")
+    test_accuracy = trained.evaluate_model(X_test, y_test)
+    
+    return trained, {
+        "train_accuracy": float(train_accuracy),
+        "test_accuracy": float(test_accuracy),
+        "training_samples": len(X_train),
+        "test_samples": len(X_test)
+    }
+
+
+def publish_trained(result):
+    """Serve a model trained by train_processor; returns its training summary"""
+    trained, training_data = result
+    published = publish(trained, training_data, trained.model.get_params())
+    return {**training_data, "model_version": published.version}
+
 
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
+    current = snapshot
     return jsonify({
         "status": "healthy",
         "message": "ML API is running",
-        "model_trained": model_trained
+        "model_trained": current.trained,
+        "model_version": current.version,
+        "dataset_cache": dataset_cache.stats(),
+        "jobs": jobs.stats()
     }), 200
 
 @app.route('/train', methods=['POST'])
 def train_model():
-    """Train the ML model with provided data or default dataset"""
-    global model_trained, last_training_data
-    
+    """Train the ML model with provided data or default dataset.
+
+    With "async": true the training is queued as a background job and the
+    response is 202 with the job ID; poll GET /jobs/<job_id> for its status.
+    """
     try:
         # Load data (using default dataset for simplicity)
         data_path = request.json.get('data_path', 'data/iris_simple.csv')
@@ -39,30 +132,30 @@ def train_model():
                 "path": data_path
             }), 400
         
-        # Process data and train model
-        data = processor.load_data(data_path)
-        clean_data = processor.clean_data(data)
-        X, y = processor.split_features_target(clean_data)
-        X_train, X_test, y_train, y_test = processor.prepare_data(X, y)
+        # Train with the configuration set through PUT /model
+        model_params = snapshot.model_params
         
-        # Train model
-        train_accuracy = processor.train_model(X_train, y_train)
-        test_accuracy = processor.evaluate_model(X_test, y_test)
+        if request.json.get('async', False):
+            priority = request.json.get('priority', 0)
+            if not isinstance(priority, int):
+                return jsonify({"error": "priority must be an integer"}), 400
+            try:
+                job = jobs.submit(train_processor, data_path, model_params,
+                                  priority=priority, name="train", on_success=publish_trained)
+            except queue.Full as e:
+                return jsonify({"error": "Job queue is full", "details": str(e)}), 503
+            return jsonify({
+                "message": "Training job queued",
+                "job_id": job.id,
+                "status_url": f"/jobs/{job.id}"
+            }), 202, {"Location": f"/jobs/{job.id}"}
         
-        model_trained = True
-        last_training_data = {
-            "train_accuracy": float(train_accuracy),
-            "test_accuracy": float(test_accuracy),
-            "training_samples": len(X_train),
-            "test_samples": len(X_test)
-        }
+        # Process data and train model
+        training_data = publish_trained(train_processor(data_path, model_params, dataset_cache))
         
         return jsonify({
             "message": "Model trained successfully",
-            "train_accuracy": float(train_accuracy),
-            "test_accuracy": float(test_accuracy),
-            "training_samples": len(X_train),
-            "test_samples": len(X_test)
+            **training_data
         }), 201
         
     except Exception as e:
@@ -71,12 +164,32 @@ def train_model():
             "details": str(e)
         }), 500
 
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Report a training job's status, progress and timings"""
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found", "job_id": job_id}), 404
+    return jsonify(job.to_dict()), 200
+
+@app.route('/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """Cancel a queued or running training job"""
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found", "job_id": job_id}), 404
+    if not jobs.cancel(job_id):
+        return jsonify({"error": "Job already finished", "job": job.to_dict()}), 409
+    return jsonify({"message": "Job cancelled", "job": job.to_dict()}), 200
+
 @app.route('/predict', methods=['GET'])
 def get_predictions():
     """Get model predictions and status"""
-    global model_trained, last_training_data
+    # One snapshot for the whole request, even if a new model is published meanwhile
+    current = snapshot
+    processor = current.processor
     
-    if not model_trained:
+    if not current.trained:
         return jsonify({
             "error": "Model not trained yet",
             "message": "Please train the model first using POST /train"
@@ -87,16 +200,17 @@ def get_predictions():
         data = processor.load_data('data/iris_simple.csv')
         clean_data = processor.clean_data(data)
         X, y = processor.split_features_target(clean_data)
-        X_train, X_test, y_train, y_test = processor.prepare_data(X, y)
+        X_train, X_test, y_train, y_test = processor.split_data(X, y)
         
-        # Make predictions on test set
-        predictions = processor.model.predict(X_test).tolist()
+        # Make predictions on test set with the scaler fitted at training time
+        predictions = processor.predict(X_test).tolist()
         actual = y_test.tolist()
         
         return jsonify({
             "predictions": predictions,
             "actual": actual,
-            "model_info": last_training_data,
+            "model_info": current.training_data,
+            "model_version": current.version,
             "prediction_count": len(predictions)
         }), 200
         
@@ -121,15 +235,11 @@ def update_model_config():
         n_estimators = config.get('n_estimators', 10)
         random_state = config.get('random_state', 42)
         
-        # Create new processor with updated config
-        from sklearn.ensemble import RandomForestClassifier
-        processor.model = RandomForestClassifier(
+        # Publish the new config; the model needs retraining with it
+        published = publish(model_params=RandomForestClassifier(
             n_estimators=n_estimators, 
             random_state=random_state
-        )
-        
-        global model_trained
-        model_trained = False  # Need to retrain with new config
+        ).get_params())
         
         return jsonify({
             "message": "Model configuration updated",
@@ -137,6 +247,7 @@ def update_model_config():
                 "n_estimators": n_estimators,
                 "random_state": random_state
             },
+            "model_version": published.version,
             "note": "Model needs retraining"
         }), 200
         
@@ -146,21 +257,83 @@ def update_model_config():
             "details": str(e)
         }), 500
 
+@app.route('/model/sweep', methods=['POST'])
+def sweep_model():
+    """Run a parallel hyperparameter sweep and keep the best model"""
+    try:
+        config = request.json
+        
+        if not config or not config.get('param_grid'):
+            return jsonify({
+                "error": "No parameter grid provided"
+            }), 400
+        
+        data_path = config.get('data_path', 'data/iris_simple.csv')
+        
+        if not os.path.exists(data_path):
+            return jsonify({
+                "error": "Data file not found",
+                "path": data_path
+            }), 400
+        
+        # Built off to the side; the served snapshot is untouched until publish
+        processor = DataProcessor(dataset_cache=dataset_cache)
+        processor.model.set_params(**snapshot.model_params)
+        data = processor.load_data(data_path)
+        clean_data = processor.clean_data(data)
+        X, y = processor.split_features_target(clean_data)
+        X_train, X_test, y_train, y_test = processor.prepare_data(X, y)
+        
+        # Candidates are scored on the held-out split; the winner is refitted
+        leaderboard = processor.sweep(
+            X_train, y_train, X_test, y_test,
+            param_grid=config['param_grid'],
+            strategy=config.get('strategy', 'grid'),
+            n_jobs=config.get('n_jobs'),
+            time_budget=config.get('time_budget')
+        )
+        train_accuracy = processor.model.score(X_train, y_train)
+        test_accuracy = processor.evaluate_model(X_test, y_test)
+        
+        training_data = {
+            "train_accuracy": float(train_accuracy),
+            "test_accuracy": float(test_accuracy),
+            "training_samples": len(X_train),
+            "test_samples": len(X_test),
+            "best_params": leaderboard[0]['params']
+        }
+        published = publish(processor, training_data, processor.model.get_params())
+        
+        return jsonify({
+            "message": "Sweep completed",
+            "best_params": leaderboard[0]['params'],
+            "leaderboard": leaderboard,
+            "model_version": published.version,
+            **training_data
+        }), 201
+        
+    except (ValueError, TimeoutError) as e:
+        return jsonify({
+            "error": "Sweep failed",
+            "details": str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            "error": "Sweep failed",
+            "details": str(e)
+        }), 500
+
 @app.route('/model', methods=['DELETE'])
 def reset_model():
     """Reset/clear the model"""
-    global model_trained, last_training_data
-    
     try:
-        # Reset to fresh processor
-        global processor
-        processor = DataProcessor()
-        model_trained = False
-        last_training_data = None
+        # Back to an untrained model with the default configuration
+        published = publish(model_params=initial_snapshot().model_params)
         
+        # 204 has no body, so the version travels in a header
         return jsonify({
             "message": "Model reset successfully"
-        }), 204
+        }), 204, {"X-Model-Version": str(published.version)}
         
     except Exception as e:
         return jsonify({
@@ -178,7 +351,10 @@ def not_found(error):
             "POST /train", 
             "GET /predict",
             "PUT /model",
-            "DELETE /model"
+            "POST /model/sweep",
+            "DELETE /model",
+            "GET /jobs/<job_id>",
+            "DELETE /jobs/<job_id>"
         ]
     }), 404
 
@@ -0,0 +1,121 @@
+"""Micro-batching of concurrent prediction requests.
+
+Requests submitted within `max_wait_ms` of each other are stacked and
+scored with one vectorized predict call, up to `max_batch_size` rows.
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class MicroBatcher:
+    """Coalesces small predict calls into batches on a background thread.
+
+    `max_batch_size` trades latency for throughput: larger batches amortise
+    the per-call overhead, while `max_wait` bounds how long the first request
+    of a batch waits for others to join. Both default to the
+    PREDICT_MAX_BATCH_SIZE and PREDICT_MAX_WAIT_MS environment variables.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=None, max_wait_ms=None):
+        self.predict_fn = predict_fn
+        self.max_batch_size = int(max_batch_size or os.getenv('PREDICT_MAX_BATCH_SIZE', 256))
+        self.max_wait = float(max_wait_ms if max_wait_ms is not None
+                              else os.getenv('PREDICT_MAX_WAIT_MS', 5)) / 1000
+        self.batches = 0
+        self.requests = 0
+        self._queue = queue.Queue()
+        # Guards _closed so nothing is queued behind the stop marker
+        self._lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, X):
+        """Queue rows for prediction; returns a Future of their predictions.
+
+        Once the batcher is closed, rows are scored right away on the calling
+        thread, so a request racing close() still gets an answer.
+        """
+        future = Future()
+        with self._lock:
+            if not self._closed:
+                self._queue.put((np.asarray(X), future))
+                return future
+        try:
+            future.set_result(self.predict_fn(np.asarray(X)))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def predict(self, X, timeout=None):
+        """Blocking submit."""
+        return self.submit(X).result(timeout)
+
+    def _collect(self):
+        """Block for one request, then gather more until full or timed out.
+
+        Returns None once the batcher has been closed.
+        """
+        first = self._queue.get()
+        if first is None:
+            return None
+        pending = [first]
+        rows = len(first[0])
+        deadline = time.monotonic() + self.max_wait
+        while rows < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                # Closed: finish this batch, stop on the next collect
+                self._queue.put(None)
+                break
+            pending.append(item)
+            rows += len(item[0])
+        return pending
+
+    def close(self):
+        """Stop the worker thread after the requests already queued."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+
+    def _run(self):
+        while True:
+            pending = self._collect()
+            if pending is None:
+                return
+            try:
+                predictions = self.predict_fn(np.concatenate([X for X, _ in pending]))
+            except Exception as e:
+                for _, future in pending:
+                    future.set_exception(e)
+                continue
+            self.batches += 1
+            self.requests += len(pending)
+            start = 0
+            for X, future in pending:
+                future.set_result(predictions[start:start + len(X)])
+                start += len(X)
+
+    def stats(self):
+        """Batches run and requests served so far."""
+        return {
+            'batches': self.batches,
+            'requests': self.requests,
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000,
+        }
+
@@ -1,4 +1,4 @@
-from .dynamodb_client import DynamoDBClient
+from .dynamodb_client import DynamoDBClient, ModelAlreadyExistsError, ModelNotFoundError
 from .s3_client import S3Client
 
-__all__ = ['DynamoDBClient', 'S3Client']
\ No newline at end of file
+__all__ = ['DynamoDBClient', 'S3Client', 'ModelAlreadyExistsError', 'ModelNotFoundError']
\ No newline at end of file
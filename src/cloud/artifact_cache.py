@@ -0,0 +1,162 @@
+import hashlib
+import mmap
+import os
+import tempfile
+from typing import Optional
+from botocore.exceptions import ClientError
+from . import transfer
+
+# Each entry is one file: the object's ETag, NUL-padded to HEADER_SIZE bytes,
+# followed by the body. Data and ETag are published by the same rename, so a
+# reader never pairs one download's bytes with another's ETag.
+HEADER_SIZE = 256
+
+
+class DiskArtifactCache:     #Node-local cache of S3 objects shared by all worker processes.
+
+    # Entries are validated with a conditional GET (IfNoneMatch) on every use,
+    # written atomically, evicted least recently used first past `max_bytes`,
+    # and returned memory-mapped rather than read into the heap.
+
+    def __init__(self, directory: str, max_bytes: Optional[int] = None):
+        self.directory = directory
+        self.max_bytes = int(max_bytes if max_bytes is not None
+                             else os.getenv('MODEL_ARTIFACT_CACHE_MAX_BYTES', 2 * 1024 ** 3))
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key: str):
+        # Entry file for an S3 key
+        name = hashlib.sha256(key.encode()).hexdigest()[:32]
+        return os.path.join(self.directory, name + '.bin')
+
+    def get(self, s3, bucket: str, key: str, part_size: Optional[int] = None,
+            max_concurrency: Optional[int] = None, revalidate: bool = True):
+        # Return the object body as a read-only mmap, downloading only if it changed;
+        # immutable keys (revalidate=False) are served without a request
+        data_path = self._path(key)
+        etag = self._read_etag(data_path)
+        if etag and not revalidate:
+            try:
+                mapped = self._map(data_path)
+            except FileNotFoundError:
+                # Evicted by another process since the ETag was read
+                etag = None
+            else:
+                self.hits += 1
+                self._touch(data_path)
+                return mapped
+        conditions = {'IfNoneMatch': etag} if etag else {}
+        fetched = {}
+
+        def fetch(fd):
+            # Ranged parts are written in place after the header, which is filled last
+            fetched['etag'] = transfer.download(s3, bucket, key, transfer.FileSink(fd, HEADER_SIZE),
+                                                part_size, max_concurrency, **conditions)[1]
+            header = (fetched['etag'] or '').encode()
+            if len(header) > HEADER_SIZE:
+                # Never revalidated; the next get downloads it again
+                header = b''
+            os.pwrite(fd, header.ljust(HEADER_SIZE, b'\0'), 0)
+
+        try:
+            self._write_atomic(data_path, fetch)
+        except ClientError as e:
+            status = e.response.get('ResponseMetadata', {}).get('HTTPStatusCode')
+            if etag and (e.response['Error']['Code'] in ('304', 'NotModified') or status == 304):
+                self.hits += 1
+                self._touch(data_path)
+                return self._map(data_path)
+            if e.response['Error']['Code'] == 'NoSuchKey':
+                self.discard(key)
+            raise
+
+        self.misses += 1
+        self._evict(keep=data_path)
+        return self._map(data_path)
+
+    def discard(self, key: str):
+        # Remove the cached entry for an S3 key, if any
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def _read_etag(self, data_path: str) -> Optional[str]:
+        try:
+            with open(data_path, 'rb') as f:
+                header = f.read(HEADER_SIZE)
+        except OSError:
+            return None
+        if len(header) < HEADER_SIZE:
+            return None
+        return header.rstrip(b'\0').decode() or None
+
+    def _write_atomic(self, path: str, write):
+        # Fill a temp file in the same directory via write(fd), then rename over the entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix='.tmp-')
+        try:
+            try:
+                write(fd)
+            finally:
+                os.close(fd)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def _touch(self, path: str):
+        # mtime doubles as the last-use time other processes see
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _map(self, path: str):
+        # Body of an entry, without its header
+        with open(path, 'rb') as f:
+            # The mapping stays valid after close, and even if another
+            # process evicts (unlinks) the file meanwhile
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return memoryview(mapped)[HEADER_SIZE:]
+
+    def _evict(self, keep: str):
+        # Drop least recently used entries until the directory fits the budget
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.bin'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, path, st.st_size))
+
+        total = sum(size for _, _, size in entries)
+        for _, path, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        # Per-process counters
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'max_bytes': self.max_bytes,
+            'directory': self.directory
+        }
@@ -0,0 +1,208 @@
+import json
+import lzma
+import os
+import pickle
+import struct
+import tempfile
+import zlib
+from typing import Any, Iterator, Optional, Tuple
+
+# Versioned model artifact format.
+#
+#   preamble   b"MLPA" | u16 format version | u32 header length   (little endian)
+#   header     JSON: compression, pickle segment, buffer segments, crc32
+#   segments   the (optionally compressed) pickle stream, then every large
+#              out-of-band buffer, each starting on a 64-byte boundary
+#
+# Objects are pickled with protocol 5; contiguous NumPy arrays of at least
+# `mmap_min_bytes` (MODEL_ARTIFACT_MMAP_MIN_BYTES, 16 MiB) are written
+# out-of-band and uncompressed, so loading from a memory-mapped file rebuilds
+# them as views of the mapping instead of copies. Everything else (object
+# structure, smaller arrays such as per-tree node tables) goes through the
+# codec, which is where most of the size reduction comes from. The pickle
+# stream is compressed as it is produced and spooled (to disk past
+# SPOOL_MAX_BYTES), since the header in front of it needs its length and CRC.
+
+MAGIC = b'MLPA'
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+
+_PREAMBLE = struct.Struct('<4sHI')
+
+CODECS = {
+    'none': (lambda data, level: data, lambda data: data),
+    'zlib': (lambda data, level: zlib.compress(data, level), zlib.decompress),
+    'lzma': (lambda data, level: lzma.compress(data, preset=level), lzma.decompress),
+}
+DEFAULT_LEVELS = {'none': 0, 'zlib': 1, 'lzma': 1}
+
+# Incremental counterparts of the CODECS compressors, producing the same streams
+COMPRESSORS = {
+    'none': lambda level: None,
+    'zlib': lambda level: zlib.compressobj(level),
+    'lzma': lambda level: lzma.LZMACompressor(preset=level),
+}
+
+SPOOL_MAX_BYTES = 8 * 1024 ** 2
+READ_CHUNK = 1024 ** 2
+
+
+class _CompressedSpool:
+    #File-like pickle target: compresses each write into a spool and tracks length and CRC
+
+    def __init__(self, codec: str, level: int):
+        self.compressor = COMPRESSORS[codec](level)
+        self.spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+        self.length = 0
+        self.crc = 0
+
+    def write(self, data) -> int:
+        # Uncompressed in-band array data arrives as a PickleBuffer
+        view = memoryview(data)
+        self._append(self.compressor.compress(view) if self.compressor else view)
+        return view.nbytes
+
+    def finish(self):
+        if self.compressor:
+            self._append(self.compressor.flush())
+        self.spool.seek(0)
+
+    def _append(self, data):
+        if len(data):
+            self.spool.write(data)
+            self.length += memoryview(data).nbytes
+            self.crc = zlib.crc32(data, self.crc)
+
+
+def parse_compression(spec: Optional[str] = None) -> Tuple[str, int]:
+    #Parse "codec" or "codec:level", defaulting to MODEL_ARTIFACT_COMPRESSION
+    spec = spec or os.getenv('MODEL_ARTIFACT_COMPRESSION', 'zlib:1')
+    codec, _, level = spec.partition(':')
+    if codec not in CODECS:
+        raise ValueError(f"Unknown artifact compression: {codec}")
+    return codec, int(level) if level else DEFAULT_LEVELS[codec]
+
+
+def _pad(offset: int) -> int:
+    return -offset % ALIGNMENT
+
+
+def iter_chunks(obj: Any, compression: Optional[str] = None,
+                mmap_min_bytes: Optional[int] = None) -> Iterator[bytes]:
+    #Serialize obj as a sequence of byte chunks without joining the array buffers
+    codec, level = parse_compression(compression)
+    if mmap_min_bytes is None:
+        mmap_min_bytes = int(os.getenv('MODEL_ARTIFACT_MMAP_MIN_BYTES', 16 * 1024 ** 2))
+
+    buffers = []
+
+    def out_of_band(buffer):
+        # A false return value keeps the buffer out of the pickle stream
+        view = buffer.raw()
+        if view.nbytes < mmap_min_bytes:
+            return True
+        buffers.append(view)
+        return False
+
+    stream = _CompressedSpool(codec, level)
+    try:
+        pickle.Pickler(stream, protocol=5, buffer_callback=out_of_band).dump(obj)
+        stream.finish()
+        yield from _iter_segments(stream, buffers, codec, level)
+    finally:
+        stream.spool.close()
+
+
+def _iter_segments(stream: _CompressedSpool, buffers: list, codec: str, level: int) -> Iterator[bytes]:
+    #Header, then the spooled pickle stream and every out-of-band buffer at their offsets
+    crc = stream.crc
+    for view in buffers:
+        crc = zlib.crc32(view, crc)
+
+    # Segment offsets depend on the header length, which depends on the
+    # offsets; grow the reserved header space until it fits
+    header_len = 0
+    while True:
+        offset = _PREAMBLE.size + header_len
+        offset += _pad(offset)
+        segments = [[offset, stream.length]]
+        offset += stream.length
+        for view in buffers:
+            offset += _pad(offset)
+            segments.append([offset, view.nbytes])
+            offset += view.nbytes
+        header = json.dumps({
+            'compression': codec,
+            'level': level,
+            'pickle': segments[0],
+            'buffers': segments[1:],
+            'crc32': crc,
+            'size': offset
+        }).encode()
+        if len(header) <= header_len:
+            break
+        header_len = len(header)
+    header = header.ljust(header_len)
+
+    yield _PREAMBLE.pack(MAGIC, FORMAT_VERSION, header_len) + header
+    position = _PREAMBLE.size + header_len
+    for index, (start, length) in enumerate(segments):
+        if start > position:
+            yield b'\0' * (start - position)
+        if index == 0:
+            yield from iter(lambda: stream.spool.read(READ_CHUNK), b'')
+        else:
+            yield buffers[index - 1]
+        position = start + length
+
+
+def dump(obj: Any, fp, compression: Optional[str] = None, mmap_min_bytes: Optional[int] = None) -> int:
+    #Write obj to a binary file object; returns the number of bytes written
+    written = 0
+    for chunk in iter_chunks(obj, compression, mmap_min_bytes):
+        fp.write(chunk)
+        written += len(chunk) if isinstance(chunk, bytes) else chunk.nbytes
+    return written
+
+
+def dumps(obj: Any, compression: Optional[str] = None, mmap_min_bytes: Optional[int] = None) -> bytes:
+    #Serialize obj to bytes
+    return b''.join(iter_chunks(obj, compression, mmap_min_bytes))
+
+
+def read_header(data) -> Optional[dict]:
+    #Parsed header of an artifact, or None for a legacy raw pickle
+    view = memoryview(data)
+    if len(view) < _PREAMBLE.size or bytes(view[:len(MAGIC)]) != MAGIC:
+        return None
+    _, version, header_len = _PREAMBLE.unpack(view[:_PREAMBLE.size])
+    if version > FORMAT_VERSION:
+        raise ValueError(f"Unsupported artifact format version: {version}")
+    header = json.loads(bytes(view[_PREAMBLE.size:_PREAMBLE.size + header_len]))
+    if len(view) < header['size']:
+        raise ValueError("Truncated model artifact")
+    return header
+
+
+def loads(data, verify: bool = True) -> Any:
+    #Load an artifact from bytes, a memoryview or an mmap; raw pickles load as before
+
+    # Large arrays come back as views of `data`, so an mmap must stay open
+    # for as long as the loaded object is in use
+    header = read_header(data)
+    if header is None:
+        return pickle.loads(data)
+
+    view = memoryview(data)
+    start, length = header['pickle']
+    stream = view[start:start + length]
+    buffers = [view[offset:offset + nbytes] for offset, nbytes in header['buffers']]
+
+    if verify:
+        crc = zlib.crc32(stream)
+        for buffer in buffers:
+            crc = zlib.crc32(buffer, crc)
+        if crc != header['crc32']:
+            raise ValueError("Model artifact checksum mismatch")
+
+    return pickle.loads(CODECS[header['compression']][1](stream), buffers=buffers)
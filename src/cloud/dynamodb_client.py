@@ -1,9 +1,21 @@
+import base64
 import boto3
+import copy
+import hashlib
 import json
 import os
-from typing import Dict, Optional, List
-from datetime import datetime
-from decimal import Decimal
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional, List, Union
+from datetime import datetime, timezone
+from decimal import Decimal, InvalidOperation
+from functools import reduce
+from boto3.dynamodb.conditions import Attr, Key
+from boto3.dynamodb.types import TypeDeserializer
 from botocore.exceptions import ClientError
 
 def convert_floats_to_decimals(obj):
@@ -29,10 +41,203 @@ def convert_decimals_to_floats(obj):
     else:
         return obj
 
+
+class ModelAlreadyExistsError(ValueError):
+    """create_model found an item with the same model_id."""
+
+    def __init__(self, model_id: str, existing: Optional[Dict] = None):
+        super().__init__(f"Model {model_id} already exists")
+        self.existing = existing
+
+
+class ModelNotFoundError(ValueError):
+    """update_model or delete_model found no item with the model_id."""
+
+    def __init__(self, model_id: str):
+        super().__init__(f"Model {model_id} not found")
+
+
+def _condition_failed(error: ClientError) -> bool:
+    return error.response['Error']['Code'] == 'ConditionalCheckFailedException'
+
+
+def _parse_decimal(value) -> Decimal:
+    try:
+        number = Decimal(str(value))
+    except InvalidOperation:
+        raise ValueError(f"Invalid number: {value}")
+    if not number.is_finite():
+        raise ValueError(f"Invalid number: {value}")
+    return number
+
+
+def _parse_timestamp(value) -> str:
+    # created_at is stored as a naive UTC isoformat string, which sorts correctly as text
+    text = str(value)
+    if text.endswith(('Z', 'z')):
+        # fromisoformat only accepts a "Z" suffix from Python 3.11 on
+        text = text[:-1] + '+00:00'
+    try:
+        parsed = datetime.fromisoformat(text)
+    except ValueError:
+        raise ValueError(f"Invalid ISO 8601 timestamp: {value}")
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed.isoformat()
+
+
+# Query filters with their own attribute and comparison; any other filter key
+# is an equality match on the attribute of that name
+RANGE_FILTERS = {
+    'accuracy_threshold': lambda value: Attr('test_accuracy').gte(_parse_decimal(value)),
+    'created_after': lambda value: Attr('created_at').gt(_parse_timestamp(value)),
+}
+
+
+# Secondary indexes: models by type, and models by creation month
+# (created_bucket = "YYYY-MM"), both sorted by created_at
+MODEL_TYPE_INDEX = 'model_type-created_at-index'
+CREATED_BUCKET_INDEX = 'created_bucket-created_at-index'
+INDEX_ATTRIBUTES = {'model_type': 'S', 'created_at': 'S', 'created_bucket': 'S'}
+GLOBAL_SECONDARY_INDEXES = [
+    {
+        'IndexName': MODEL_TYPE_INDEX,
+        'KeySchema': [
+            {'AttributeName': 'model_type', 'KeyType': 'HASH'},
+            {'AttributeName': 'created_at', 'KeyType': 'RANGE'}
+        ],
+        'Projection': {'ProjectionType': 'ALL'}
+    },
+    {
+        'IndexName': CREATED_BUCKET_INDEX,
+        'KeySchema': [
+            {'AttributeName': 'created_bucket', 'KeyType': 'HASH'},
+            {'AttributeName': 'created_at', 'KeyType': 'RANGE'}
+        ],
+        'Projection': {'ProjectionType': 'ALL'}
+    }
+]
+
+# Table tag recording that every item has created_bucket. Until it is set
+# (by scripts/migrate_dynamodb_indexes.py, or at table creation) the bucket
+# index would silently miss older items, so created_after queries scan.
+BACKFILL_TAG = {'Key': 'created_bucket_backfill', 'Value': 'complete'}
+
+# Past this many months a created_after query scans instead of querying each bucket
+MAX_BUCKET_QUERIES = 24
+
+# batch_get_item accepts at most 100 keys per request
+BATCH_GET_SIZE = 100
+BATCH_GET_MAX_RETRIES = 8
+BATCH_GET_BASE_DELAY = 0.05
+
+# Conditional puts create_models keeps in flight at once
+BULK_WRITE_CONCURRENCY = 16
+
+
+def created_bucket(created_at: str) -> str:
+    """Month bucket ("YYYY-MM") of an ISO timestamp."""
+    return created_at[:7]
+
+
+def _month_buckets(start: str, end: str) -> List[str]:
+    year, month = int(start[:4]), int(start[5:7])
+    buckets = []
+    while f"{year:04d}-{month:02d}" <= end:
+        buckets.append(f"{year:04d}-{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return buckets
+
+
+# GET /models page sizes
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+_FIELD_NAME = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+
+class ModelPage:
+    """One page of query results, read from DynamoDB lazily as it is iterated.
+
+    `next_cursor` is set once iteration finishes, or None on the last page.
+    """
+
+    def __init__(self, items: Iterable[Dict] = (), next_cursor: Optional[str] = None):
+        self._items = items
+        self.next_cursor = next_cursor
+
+    def __iter__(self):
+        return iter(self._items)
+
+
+def encode_cursor(fingerprint: str, request_index: int, start_key: Optional[Dict]) -> str:
+    """Opaque cursor: which planned request to resume, and where in it."""
+    payload = json.dumps({'q': fingerprint, 'r': request_index, 'k': start_key})
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor: str, fingerprint: str):
+    """(request_index, start_key) from a cursor issued for the same query."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        position = int(payload['r']), payload['k']
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor")
+    if payload.get('q') != fingerprint:
+        raise ValueError("Cursor does not match this query")
+    return position
+
+
+def build_projection(fields: Optional[List[str]]) -> Dict:
+    """ProjectionExpression arguments for the requested attributes (model_id always included)."""
+    if not fields:
+        return {}
+    names = ['model_id'] + [field for field in fields if field != 'model_id']
+    invalid = [name for name in names if not _FIELD_NAME.match(name)]
+    if invalid:
+        raise ValueError(f"Invalid field names: {', '.join(invalid)}")
+    # Placeholders avoid clashes with DynamoDB reserved words such as "name" or "status"
+    return {
+        'ProjectionExpression': ', '.join(f'#f{i}' for i in range(len(names))),
+        'ExpressionAttributeNames': {f'#f{i}': name for i, name in enumerate(names)}
+    }
+
+
+def build_filter_expression(filters: Dict):
+    """Combine query filters into one DynamoDB condition, or None without filters."""
+    conditions = [
+        RANGE_FILTERS[key](value) if key in RANGE_FILTERS else Attr(key).eq(value)
+        for key, value in filters.items()
+    ]
+    return reduce(lambda left, right: left & right, conditions) if conditions else None
+
+
 class DynamoDBClient:    
-    def __init__(self, table_name: str = "ml-models"): # Initialize DynamoDB client
+    def __init__(self, table_name: str = "ml-models", cache_ttl: Optional[float] = None,
+                 negative_cache_ttl: Optional[float] = None, cache_max_entries: Optional[int] = None):
+        # Initialize DynamoDB client
         self.table_name = table_name
         
+        # Read-through cache for get_model. Writes through this client
+        # invalidate immediately; writes from other processes show up within
+        # the TTL. Missing IDs are cached for the (shorter) negative TTL.
+        self.cache_ttl = float(cache_ttl if cache_ttl is not None
+                               else os.getenv('MODEL_METADATA_CACHE_TTL_SECONDS', 30))
+        self.negative_cache_ttl = float(negative_cache_ttl if negative_cache_ttl is not None
+                                        else os.getenv('MODEL_METADATA_NEGATIVE_TTL_SECONDS', 2))
+        self.cache_max_entries = int(cache_max_entries if cache_max_entries is not None
+                                     else os.getenv('MODEL_METADATA_CACHE_MAX_ENTRIES', 10000))
+        self._cache = OrderedDict()  # model_id -> (item or None, fetched_at, expires_at)
+        self._cache_lock = threading.Lock()
+        # Bumped on invalidation so a read that raced a write is not cached;
+        # both are only kept for IDs with a read in flight
+        self._generations = {}
+        self._reads_in_flight = {}
+        self._cache_counters = {'hits': 0, 'negative_hits': 0, 'misses': 0, 'expirations': 0,
+                                'invalidations': 0}
+        self._served_age_total = 0.0
+        self._served_age_max = 0.0
+        
         try:
             # Configure the boto3 for LocalStack
             self.dynamodb = boto3.resource(
@@ -44,6 +249,8 @@ class DynamoDBClient:
             )
             
             self.table = None
+            self.active_indexes = set()
+            self.created_bucket_backfilled = False
             self._ensure_table_exists()
         except Exception as e:
             raise Exception(f"Failed to initialize DynamoDB client: {str(e)}")
@@ -52,12 +259,70 @@ class DynamoDBClient:
         try:
             self.table = self.dynamodb.Table(self.table_name)
             self.table.load()
+            self._read_index_state()
         except ClientError as e:
             if e.response['Error']['Code'] == 'ResourceNotFoundException':
                 self._create_table()
             else:
                 raise
     
+    def _read_index_state(self):
+        # Which indexes queries may use. Read-only: creating indexes and
+        # backfilling is left to scripts/migrate_dynamodb_indexes.py
+        self.active_indexes = {index['IndexName'] for index in (self.table.global_secondary_indexes or [])
+                               if index.get('IndexStatus') == 'ACTIVE'}
+        try:
+            tags = self.dynamodb.meta.client.list_tags_of_resource(
+                ResourceArn=self.table.table_arn).get('Tags', [])
+        except ClientError:
+            # Without permission to read tags, fall back to scanning
+            tags = []
+        self.created_bucket_backfilled = BACKFILL_TAG in tags
+    
+    def create_missing_index(self) -> Optional[str]:
+        # Request the next missing secondary index; returns its name, or None when
+        # nothing is missing or an index is still building. DynamoDB builds one new
+        # GSI per UpdateTable call, so each call requests at most one.
+        existing = {index['IndexName']: index.get('IndexStatus')
+                    for index in (self.table.global_secondary_indexes or [])}
+        missing = [index for index in GLOBAL_SECONDARY_INDEXES if index['IndexName'] not in existing]
+        if not missing or any(status != 'ACTIVE' for status in existing.values()):
+            return None
+        try:
+            self.dynamodb.meta.client.update_table(
+                TableName=self.table_name,
+                AttributeDefinitions=[{'AttributeName': name, 'AttributeType': kind}
+                                      for name, kind in INDEX_ATTRIBUTES.items()],
+                GlobalSecondaryIndexUpdates=[{'Create': missing[0]}]
+            )
+        except ClientError as e:
+            # Another process got there first
+            if e.response['Error']['Code'] not in ('ResourceInUseException', 'LimitExceededException'):
+                raise
+            return None
+        return missing[0]['IndexName']
+    
+    def backfill_created_buckets(self) -> int:
+        # Add created_bucket to items written before the time-bucketed index existed
+        updated = 0
+        request = {
+            'FilterExpression': Attr('created_bucket').not_exists() & Attr('created_at').exists(),
+            'ProjectionExpression': 'model_id, created_at'
+        }
+        for item in self._paginate(self.table.scan, request):
+            self.table.update_item(
+                Key={'model_id': item['model_id']},
+                UpdateExpression='SET created_bucket = :bucket',
+                ExpressionAttributeValues={':bucket': created_bucket(item['created_at'])}
+            )
+            updated += 1
+        return updated
+    
+    def mark_backfill_complete(self):
+        # Record that every item has created_bucket, letting queries use the bucket index
+        self.dynamodb.meta.client.tag_resource(ResourceArn=self.table.table_arn, Tags=[BACKFILL_TAG])
+        self.created_bucket_backfilled = True
+    
 
     def _create_table(self): #table creation
         try:
@@ -68,13 +333,19 @@ class DynamoDBClient:
                 ],
                 AttributeDefinitions=[
                     {'AttributeName': 'model_id', 'AttributeType': 'S'}
-                ],
-                BillingMode='PAY_PER_REQUEST'
+                ] + [{'AttributeName': name, 'AttributeType': kind}
+                     for name, kind in INDEX_ATTRIBUTES.items()],
+                GlobalSecondaryIndexes=GLOBAL_SECONDARY_INDEXES,
+                BillingMode='PAY_PER_REQUEST',
+                # Every item of a new table is written with created_bucket
+                Tags=[BACKFILL_TAG]
             )
 
             
             # Wait for table to be created
             self.table.wait_until_exists()
+            self.active_indexes = {index['IndexName'] for index in GLOBAL_SECONDARY_INDEXES}
+            self.created_bucket_backfilled = True
         except ClientError as e:
             if e.response['Error']['Code'] != 'ResourceInUseException':
                 raise
@@ -82,84 +353,305 @@ class DynamoDBClient:
     def create_model(self, model_id: str, metadata: Dict) -> Dict:# Create new model entry.
         
         try:
-             # Check if model already exists
-            existing = self.get_model(model_id)
-            if existing:
-                raise ValueError(f"Model {model_id} already exists")
-            
+            created_at = datetime.utcnow().isoformat()
             item = {
                 'model_id': model_id,
-                'created_at': datetime.utcnow().isoformat(),
-                'updated_at': datetime.utcnow().isoformat(),
+                'created_at': created_at,
+                'created_bucket': created_bucket(created_at),
+                'updated_at': created_at,
                 **metadata
             }
 
             # Convert float values to Decimal for DynamoDB compatibility
             item = convert_floats_to_decimals(item)
             
-            self.table.put_item(Item=item)
+            # One round trip: the put only succeeds if the ID is free
+            self.table.put_item(
+                Item=item,
+                ConditionExpression=Attr('model_id').not_exists(),
+                ReturnValuesOnConditionCheckFailure='ALL_OLD'
+            )
             return item
             
         except ClientError as e:
+            if _condition_failed(e):
+                existing = e.response.get('Item')
+                raise ModelAlreadyExistsError(model_id, self._deserialize(existing) if existing else None)
             raise Exception(f"Failed to create model: {str(e)}")
+        finally:
+            # After the write, so a read racing it cannot re-cache the old item
+            self.invalidate(model_id)
+    
+    def _deserialize(self, item: Dict) -> Dict:
+        # Items attached to client errors use the low-level {"S": ...} encoding
+        deserializer = TypeDeserializer()
+        return convert_decimals_to_floats({key: deserializer.deserialize(value) for key, value in item.items()})
     
     def get_model(self, model_id: str) -> Optional[Dict]:
-        # Get model by ID
+        # Get model by ID, from the read-through cache when fresh
+        cached, item, generation = self._cache_lookup(model_id)
+        if cached:
+            return item
+        
+        try:
+            item = self._fetch_model(model_id)
+        except BaseException:
+            self._cache_release(model_id)
+            raise
+        self._cache_store(model_id, item, generation)
+        return copy.deepcopy(item)
+    
+    def get_models(self, model_ids: List[str]) -> List[Optional[Dict]]:
+        # Get many models in input order (None where missing); cache misses are
+        # read with batch_get_item, BATCH_GET_SIZE keys per request
+        found = {}
+        generations = {}
+        for model_id in dict.fromkeys(model_ids):
+            cached, item, generation = self._cache_lookup(model_id)
+            if cached:
+                found[model_id] = item
+            else:
+                generations[model_id] = generation
+        
+        missing = list(generations)
+        try:
+            for start in range(0, len(missing), BATCH_GET_SIZE):
+                chunk = missing[start:start + BATCH_GET_SIZE]
+                items = {item['model_id']: convert_decimals_to_floats(item)
+                         for item in self._batch_get(chunk)}
+                for model_id in chunk:
+                    found[model_id] = items.get(model_id)
+                    self._cache_store(model_id, found[model_id], generations.pop(model_id))
+        finally:
+            # Reads a failed batch never finished
+            for model_id in generations:
+                self._cache_release(model_id)
+        
+        return [copy.deepcopy(found[model_id]) for model_id in model_ids]
+    
+    def _batch_get(self, model_ids: List[str]) -> List[Dict]:
+        # One batch_get_item call, retrying throttled (unprocessed) keys with
+        # jittered exponential backoff
+        request = {self.table_name: {'Keys': [{'model_id': model_id} for model_id in model_ids]}}
+        items = []
+        for attempt in range(BATCH_GET_MAX_RETRIES + 1):
+            try:
+                response = self.dynamodb.batch_get_item(RequestItems=request)
+            except ClientError as e:
+                raise Exception(f"Failed to get models: {str(e)}")
+            items.extend(response.get('Responses', {}).get(self.table_name, []))
+            request = response.get('UnprocessedKeys')
+            if not request:
+                return items
+            if attempt < BATCH_GET_MAX_RETRIES:
+                time.sleep(random.uniform(0, BATCH_GET_BASE_DELAY * 2 ** attempt))
+        raise Exception(f"Failed to get models: keys still unprocessed after {BATCH_GET_MAX_RETRIES} retries")
+    
+    def _cache_lookup(self, model_id: str):
+        # (True, copy of item, None) on a fresh hit, else (False, None, generation)
+        now = time.monotonic()
+        with self._cache_lock:
+            entry = self._cache.get(model_id)
+            if entry is not None:
+                item, fetched_at, expires_at = entry
+                if now < expires_at:
+                    self._cache.move_to_end(model_id)
+                    self._cache_counters['hits' if item is not None else 'negative_hits'] += 1
+                    self._served_age_total += now - fetched_at
+                    self._served_age_max = max(self._served_age_max, now - fetched_at)
+                    return True, copy.deepcopy(item), None
+                del self._cache[model_id]
+                self._cache_counters['expirations'] += 1
+            self._cache_counters['misses'] += 1
+            self._reads_in_flight[model_id] = self._reads_in_flight.get(model_id, 0) + 1
+            return False, None, self._generations.get(model_id, 0)
+    
+    def _cache_store(self, model_id: str, item: Optional[Dict], generation: int):
+        # Skipped when a write invalidated the ID while it was being read
+        with self._cache_lock:
+            stored = self._generations.get(model_id, 0) == generation
+            self._end_read(model_id)
+            if stored:
+                ttl = self.cache_ttl if item is not None else self.negative_cache_ttl
+                fetched_at = time.monotonic()
+                self._cache[model_id] = (item, fetched_at, fetched_at + ttl)
+                self._cache.move_to_end(model_id)
+                while len(self._cache) > self.cache_max_entries:
+                    self._cache.popitem(last=False)
+    
+    def _cache_release(self, model_id: str):
+        # End a read that failed without storing anything
+        with self._cache_lock:
+            self._end_read(model_id)
+    
+    def _end_read(self, model_id: str):
+        # Caller holds _cache_lock; the last read of an ID drops its generation
+        remaining = self._reads_in_flight.pop(model_id) - 1
+        if remaining:
+            self._reads_in_flight[model_id] = remaining
+        else:
+            self._generations.pop(model_id, None)
+    
+    def _fetch_model(self, model_id: str) -> Optional[Dict]:
         try:
             response = self.table.get_item(Key={'model_id': model_id})
             item = response.get('Item')
             if item:
                 # Convert Decimal values back to float for JSON serialization
                 return convert_decimals_to_floats(item)
-            return item
+            return None
         except ClientError as e:
             if e.response['Error']['Code'] == 'ResourceNotFoundException':
                 return None
             raise
     
-    def update_model(self, model_id: str, updates: Dict) -> Dict: # Update existing model
+    def invalidate(self, model_id: str):
+        # Drop a cached item and discard any read of it still in flight
+        with self._cache_lock:
+            if model_id in self._reads_in_flight:
+                self._generations[model_id] = self._generations.get(model_id, 0) + 1
+            if self._cache.pop(model_id, None) is not None:
+                self._cache_counters['invalidations'] += 1
+    
+    def cache_stats(self) -> Dict:
+        # Hit ratio and the age of cached items when they were served
+        with self._cache_lock:
+            counters = dict(self._cache_counters)
+            served = counters['hits'] + counters['negative_hits']
+            lookups = served + counters['misses']
+            return {
+                **counters,
+                'entries': len(self._cache),
+                'hit_ratio': served / lookups if lookups else 0.0,
+                'mean_served_age_seconds': self._served_age_total / served if served else 0.0,
+                'max_served_age_seconds': self._served_age_max,
+                'ttl_seconds': self.cache_ttl,
+                'negative_ttl_seconds': self.negative_cache_ttl
+            }
+    
+    def update_model(self, model_id: str, updates: Dict, return_previous: bool = False):
+        # Update existing model; with return_previous, returns (new item, item before
+        # the update) so the caller can undo it with restore_model
         
         try:
-            # Check if model exists
-            if not self.get_model(model_id):
-                raise ValueError(f"Model {model_id} not found")
-            
-            
             update_expr = "SET updated_at = :updated_at" # Build update expression
             expr_values = {':updated_at': datetime.utcnow().isoformat()}
             
             for key, value in updates.items():
-                if key not in ['model_id', 'created_at']:
+                if key not in ['model_id', 'created_at', 'created_bucket']:
                     update_expr += f", {key} = :{key}"
                     expr_values[f":{key}"] = value
             
             # Convert float values to Decimal for DynamoDB compatibility
             expr_values = convert_floats_to_decimals(expr_values)
+            # Without the condition update_item would create a partial item
             response = self.table.update_item(
                 Key={'model_id': model_id},
                 UpdateExpression=update_expr,
+                ConditionExpression=Attr('model_id').exists(),
                 ExpressionAttributeValues=expr_values,
-                ReturnValues='ALL_NEW'
+                ReturnValues='ALL_OLD' if return_previous else 'ALL_NEW'
             )
             
             # Convert Decimal values back to float for JSON serialization
-            return convert_decimals_to_floats(response['Attributes'])
+            item = convert_decimals_to_floats(response['Attributes'])
+            if not return_previous:
+                return item
+            # The old item plus the values just written is the new item
+            written = convert_decimals_to_floats({key[1:]: value for key, value in expr_values.items()})
+            return {**item, **written}, item
             
         except ClientError as e:
+            if _condition_failed(e):
+                raise ModelNotFoundError(model_id)
             raise Exception(f"Failed to update model: {str(e)}")
+        finally:
+            self.invalidate(model_id)
+    
+    def restore_model(self, model_id: str, previous: Dict, keys: Iterable[str]) -> bool:
+        # Undo an update: put back the previous values of `keys`, removing the
+        # ones the item did not have before
+        names, values, assignments, removals = {}, {}, [], []
+        for i, key in enumerate(dict.fromkeys(keys)):
+            if key in ('model_id', 'created_at', 'created_bucket'):
+                continue
+            names[f'#a{i}'] = key
+            if key in previous:
+                assignments.append(f'#a{i} = :a{i}')
+                values[f':a{i}'] = previous[key]
+            else:
+                removals.append(f'#a{i}')
+        if not names:
+            return True
+        
+        expression = ' '.join(part for part in (
+            assignments and 'SET ' + ', '.join(assignments),
+            removals and 'REMOVE ' + ', '.join(removals)
+        ) if part)
+        kwargs = {'ExpressionAttributeValues': convert_floats_to_decimals(values)} if values else {}
+        try:
+            self.table.update_item(
+                Key={'model_id': model_id},
+                UpdateExpression=expression,
+                ConditionExpression=Attr('model_id').exists(),
+                ExpressionAttributeNames=names,
+                **kwargs
+            )
+            return True
+        except ClientError as e:
+            if _condition_failed(e):
+                raise ModelNotFoundError(model_id)
+            raise Exception(f"Failed to restore model: {str(e)}")
+        finally:
+            self.invalidate(model_id)
     
     def delete_model(self, model_id: str) -> bool:   # Delete model by ID
 
         try:
-            # Check if model exists
-            if not self.get_model(model_id):
-                raise ValueError(f"Model {model_id} not found")
-            
-            self.table.delete_item(Key={'model_id': model_id})
+            self.table.delete_item(
+                Key={'model_id': model_id},
+                ConditionExpression=Attr('model_id').exists()
+            )
             return True
             
         except ClientError as e:
+            if _condition_failed(e):
+                raise ModelNotFoundError(model_id)
             raise Exception(f"Failed to delete model: {str(e)}")
+        finally:
+            self.invalidate(model_id)
+    
+    def create_models(self, metadata_by_id: Dict[str, Dict]) -> Dict[str, Union[Dict, Exception]]:
+        # Write many new models, each with create_model's conditional put so an ID
+        # taken meanwhile is never overwritten (batch_writer puts cannot be
+        # conditional). Puts run concurrently; returns the created item per ID, or
+        # the exception its put raised (ModelAlreadyExistsError for taken IDs)
+        if not metadata_by_id:
+            return {}
+        workers = min(len(metadata_by_id), BULK_WRITE_CONCURRENCY)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {model_id: pool.submit(self.create_model, model_id, metadata)
+                       for model_id, metadata in metadata_by_id.items()}
+        outcomes = {}
+        for model_id, future in futures.items():
+            try:
+                outcomes[model_id] = future.result()
+            except Exception as e:
+                outcomes[model_id] = e
+        return outcomes
+    
+    def delete_models(self, model_ids: List[str]) -> bool:
+        # Delete many models with batch_writer; IDs that do not exist are ignored
+        try:
+            with self.table.batch_writer() as batch:
+                for model_id in dict.fromkeys(model_ids):
+                    batch.delete_item(Key={'model_id': model_id})
+            return True
+        except ClientError as e:
+            raise Exception(f"Failed to delete models: {str(e)}")
+        finally:
+            for model_id in model_ids:
+                self.invalidate(model_id)
     
     def list_models(self, limit: int = 100) -> List[Dict]:
         #List all models
@@ -172,28 +664,94 @@ class DynamoDBClient:
             raise Exception(f"Failed to list models: {str(e)}")
     
     def query_models(self, **kwargs) -> List[Dict]:
-        # Query models with filters, rather simple now
+        # Query models with filters evaluated by DynamoDB, reading every page
+        operation, requests = self._plan_query(kwargs)  # ValueError on malformed values
         try:
-            # Quick implem 
-            items = self.list_models()
-            
-            # Apply filters
-            filtered = items
-            for key, value in kwargs.items():
-                filtered = [item for item in filtered if self._compare_values(item.get(key), value)]
+            items = [item for request in requests for item in self._paginate(operation, request)]
             
-            return filtered
+            # Convert Decimal values back to float for JSON serialization
+            return [convert_decimals_to_floats(item) for item in items]
             
         except Exception as e:
             raise Exception(f"Failed to query models: {str(e)}")
-
-    def _compare_values(self, item_value, filter_value):
-        """Compare values accounting for different data types (Decimal, float, etc.)"""
-        if item_value is None:
-            return False
+    
+    def query_models_page(self, filters: Dict, limit: int = DEFAULT_PAGE_SIZE,
+                          cursor: Optional[str] = None, fields: Optional[List[str]] = None) -> ModelPage:
+        # Up to `limit` models matching filters, starting at `cursor`; read while iterated.
+        # Malformed filters, limits, cursors or fields raise ValueError up front.
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+        operation, requests = self._plan_query(filters)
+        projection = build_projection(fields)
         
-        # Convert both values to strings for comparison to handle Decimal types
-        try:
-            return str(item_value) == str(filter_value)
-        except:
-            return item_value == filter_value
\ No newline at end of file
+        # Cursors only resume the query (and query plan) that issued them
+        fingerprint = hashlib.sha256(json.dumps(
+            [filters, [request.get('IndexName') for request in requests[:1]]], sort_keys=True, default=str
+        ).encode()).hexdigest()[:16]
+        request_index, start_key = decode_cursor(cursor, fingerprint) if cursor else (0, None)
+        
+        page = ModelPage()
+        
+        def read():
+            nonlocal request_index, start_key
+            returned = 0
+            while request_index < len(requests) and returned < limit:
+                # Limit bounds items evaluated, so a page never overshoots
+                request = {**requests[request_index], **projection, 'Limit': limit - returned}
+                if start_key:
+                    request['ExclusiveStartKey'] = start_key
+                response = operation(**request)
+                for item in response.get('Items', []):
+                    returned += 1
+                    yield convert_decimals_to_floats(item)
+                start_key = response.get('LastEvaluatedKey')
+                if start_key is None:
+                    request_index += 1
+            if request_index < len(requests):
+                page.next_cursor = encode_cursor(fingerprint, request_index, start_key)
+        
+        page._items = read()
+        return page
+    
+    def _plan_query(self, filters: Dict):
+        # Pick the cheapest way to answer the filters: (table.query or table.scan, [request kwargs])
+        filters = dict(filters)
+        
+        if 'model_type' in filters and MODEL_TYPE_INDEX in self.active_indexes:
+            key_condition = Key('model_type').eq(filters.pop('model_type'))
+            if 'created_after' in filters:
+                key_condition &= Key('created_at').gt(_parse_timestamp(filters.pop('created_after')))
+            return self.table.query, [self._request(MODEL_TYPE_INDEX, key_condition, filters)]
+        
+        if 'created_after' in filters and CREATED_BUCKET_INDEX in self.active_indexes \
+                and self.created_bucket_backfilled:
+            after = _parse_timestamp(filters['created_after'])
+            buckets = _month_buckets(created_bucket(after), created_bucket(datetime.utcnow().isoformat()))
+            if len(buckets) <= MAX_BUCKET_QUERIES:
+                rest = {key: value for key, value in filters.items() if key != 'created_after'}
+                return self.table.query, [
+                    self._request(CREATED_BUCKET_INDEX,
+                                  Key('created_bucket').eq(bucket) & Key('created_at').gt(after), rest)
+                    for bucket in buckets
+                ]
+        
+        filter_expression = build_filter_expression(filters)
+        return self.table.scan, [{'FilterExpression': filter_expression} if filter_expression is not None else {}]
+    
+    def _request(self, index_name: str, key_condition, filters: Dict) -> Dict:
+        # Index query request with the filters the key condition does not cover
+        request = {'IndexName': index_name, 'KeyConditionExpression': key_condition}
+        filter_expression = build_filter_expression(filters)
+        if filter_expression is not None:
+            request['FilterExpression'] = filter_expression
+        return request
+    
+    def _paginate(self, operation, request: Dict):
+        # Yield items from every page of a query or scan
+        request = dict(request)
+        while True:
+            response = operation(**request)
+            yield from response.get('Items', [])
+            if 'LastEvaluatedKey' not in response:
+                return
+            request['ExclusiveStartKey'] = response['LastEvaluatedKey']
@@ -1,17 +1,35 @@
 import boto3
+import hashlib
 import json
 import os
-import pickle
+import tempfile
 from typing import Dict, Optional, Any
 from botocore.exceptions import ClientError
+from . import artifact_format, transfer
+from .artifact_cache import DiskArtifactCache
+
+# S3 limit on keys per delete_objects request
+DELETE_BATCH_SIZE = 1000
 
 
 class S3Client:     #Handles S3 operations for ML model artifacts.
 
+    # Artifacts are content-addressed: the bytes live once under
+    # blobs/<sha256>, models/<id>/model.ref points a model at its blob, and an
+    # empty refs/<sha256>/<id> marker per model counts references for garbage
+    # collection. Models written before this layout keep models/<id>/model.pkl.
     
-    def __init__(self, bucket_name: str = "ml-models-bucket"):
-        #Initialize S3 client
+    def __init__(self, bucket_name: str = "ml-models-bucket", cache_dir: Optional[str] = None,
+                 cache_max_bytes: Optional[int] = None, compression: Optional[str] = None,
+                 part_size: Optional[int] = None, max_concurrency: Optional[int] = None):
+        #Initialize S3 client; model downloads go through a disk cache when a directory is configured
         self.bucket_name = bucket_name
+        self.compression = compression
+        # Multipart/ranged transfer settings for model artifacts
+        self.part_size = part_size or transfer.default_part_size()
+        self.max_concurrency = max_concurrency or transfer.default_concurrency()
+        cache_dir = cache_dir or os.getenv('MODEL_ARTIFACT_CACHE_DIR')
+        self.artifact_cache = DiskArtifactCache(cache_dir, cache_max_bytes) if cache_dir else None
         
         try:
             # Configure boto3 for LocalStack
@@ -48,46 +66,50 @@ class S3Client:     #Handles S3 operations for ML model artifacts.
     def upload_model(self, model_id: str, model_object: Any, metadata: Dict = None) -> str:
         #Upload model artifact to S3
         try:
-            # Serialize model
-            model_key = f"models/{model_id}/model.pkl"
-            model_bytes = pickle.dumps(model_object)
+            # Store the blob once, then point the model at it
+            return self.attach_model(model_id, self.put_blob(model_object), metadata, model_object)
             
-            # Upload model removing the metadata in s3 object metadata
+        except Exception as e:
+            raise Exception(f"Failed to upload model: {str(e)}")
+    
+    def attach_model(self, model_id: str, digest: str, metadata: Dict = None,
+                     model_object: Any = None) -> str:
+        #Point a new model at a blob already stored with put_blob and write its metadata
+        self.link_model(model_id, digest, model_object)
+        
+        # Upload metadata as JSON
+        if metadata:
+            metadata_key = f"models/{model_id}/metadata.json"
             self.s3.put_object(
                 Bucket=self.bucket_name,
-                Key=model_key,
-                Body=model_bytes
+                Key=metadata_key,
+                Body=json.dumps(metadata, indent=2),
+                ContentType='application/json'
             )
-            
-            # Upload metadata as JSON
-            if metadata:
-                metadata_key = f"models/{model_id}/metadata.json"
-                self.s3.put_object(
-                    Bucket=self.bucket_name,
-                    Key=metadata_key,
-                    Body=json.dumps(metadata, indent=2),
-                    ContentType='application/json'
-                )
-            
-            return model_key
-            
-        except Exception as e:
-            raise Exception(f"Failed to upload model: {str(e)}")
+        
+        return self._blob_key(digest)
     
     def download_model(self, model_id: str) -> Optional[Any]:
         # download model artifact from S3
         try:
-            model_key = f"models/{model_id}/model.pkl"
+            digest = self._read_pointer(model_id)
+            model_key = self._blob_key(digest) if digest else f"models/{model_id}/model.pkl"
             
-            # Download model
-            response = self.s3.get_object(
-                Bucket=self.bucket_name,
-                Key=model_key
-            )
+            if self.artifact_cache:
+                # Blobs never change, so only legacy keys are revalidated against
+                # their ETag; large arrays stay views of the mapped file
+                return artifact_format.loads(self.artifact_cache.get(
+                    self.s3, self.bucket_name, model_key, self.part_size, self.max_concurrency,
+                    revalidate=digest is None
+                ))
+            
+            # Download model in parallel byte ranges into one preallocated buffer
+            sink = transfer.BufferSink()
+            transfer.download(self.s3, self.bucket_name, model_key, sink,
+                              self.part_size, self.max_concurrency)
             
             # Deserialize model
-            model_bytes = response['Body'].read()
-            model_object = pickle.loads(model_bytes)
+            model_object = artifact_format.loads(sink.buffer)
             
             return model_object
             
@@ -96,6 +118,142 @@ class S3Client:     #Handles S3 operations for ML model artifacts.
                 return None
             raise Exception(f"Failed to download model: {str(e)}")
     
+    def _blob_key(self, digest: str) -> str:
+        return f"blobs/{digest}"
+    
+    def _object_exists(self, key: str) -> bool:
+        try:
+            self.s3.head_object(Bucket=self.bucket_name, Key=key)
+            return True
+        except ClientError as e:
+            if e.response['Error']['Code'] in ('404', 'NoSuchKey'):
+                return False
+            raise
+    
+    def put_blob(self, model_object: Any) -> str:
+        #Store a serialized model under its SHA-256 and return the digest; existing blobs are not re-uploaded
+        digest = hashlib.sha256()
+        # The hash is only known once serialization finishes, so the bytes are
+        # spooled (to disk past one part) rather than streamed straight to S3
+        with tempfile.SpooledTemporaryFile(max_size=self.part_size) as spool:
+            for chunk in artifact_format.iter_chunks(model_object, self.compression):
+                digest.update(chunk)
+                spool.write(chunk)
+            
+            blob_key = self._blob_key(digest.hexdigest())
+            if not self._object_exists(blob_key):
+                spool.seek(0)
+                transfer.upload_stream(
+                    self.s3, self.bucket_name, blob_key,
+                    iter(lambda: spool.read(self.part_size), b''),
+                    self.part_size, self.max_concurrency
+                )
+        return digest.hexdigest()
+    
+    def link_model(self, model_id: str, digest: str, model_object: Any = None):
+        #Point a model at a stored blob, releasing the blob it pointed at before.
+        #model_object, the blob's source, lets a blob deleted concurrently be restored
+        previous = self._read_pointer(model_id)
+        
+        # Reference first, so the blob is never unreferenced while pointed at
+        self.s3.put_object(Bucket=self.bucket_name, Key=f"refs/{digest}/{model_id}", Body=b'')
+        
+        # put_blob may have skipped the upload because the blob existed, and a
+        # _release_blob that listed no refs before ours landed may since have
+        # deleted it. Now that our ref is visible no later release deletes it,
+        # so checking once here is enough to catch that interleaving
+        if not self._object_exists(self._blob_key(digest)):
+            if model_object is None or self.put_blob(model_object) != digest:
+                self.s3.delete_object(Bucket=self.bucket_name, Key=f"refs/{digest}/{model_id}")
+                raise Exception(f"Blob {digest} was deleted while being linked to {model_id}")
+        
+        # The switch itself is this one PUT; before it the model is unchanged
+        try:
+            self.s3.put_object(
+                Bucket=self.bucket_name,
+                Key=f"models/{model_id}/model.ref",
+                Body=json.dumps({'blob': digest}),
+                ContentType='application/json'
+            )
+        except Exception:
+            if previous != digest:
+                self._release_blob(digest, model_id)
+            raise
+        
+        # After the switch, failing to free the old artifact only leaks it
+        try:
+            if previous is None:
+                # Drop a pre-content-addressing artifact if there was one
+                self.s3.delete_object(Bucket=self.bucket_name, Key=f"models/{model_id}/model.pkl")
+            elif previous != digest:
+                self._release_blob(previous, model_id)
+        except Exception:
+            pass
+    
+    def _read_pointer(self, model_id: str) -> Optional[str]:
+        #Blob digest a model points at, or None for legacy or missing models
+        try:
+            response = self.s3.get_object(Bucket=self.bucket_name, Key=f"models/{model_id}/model.ref")
+            return json.loads(response['Body'].read())['blob']
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'NoSuchKey':
+                return None
+            raise
+    
+    def _release_blob(self, digest: str, model_id: str):
+        #Drop a model's reference and delete the blob once nothing refers to it
+        self.s3.delete_object(Bucket=self.bucket_name, Key=f"refs/{digest}/{model_id}")
+        self.discard_blob(digest)
+    
+    def discard_blob(self, digest: str):
+        #Delete a blob stored with put_blob unless some model refers to it, e.g. after the
+        #write it was uploaded for was rejected. A later link_model re-uploads it if needed
+        response = self.s3.list_objects_v2(Bucket=self.bucket_name, Prefix=f"refs/{digest}/", MaxKeys=1)
+        if response.get('KeyCount', len(response.get('Contents', []))) == 0:
+            self.s3.delete_object(Bucket=self.bucket_name, Key=self._blob_key(digest))
+            if self.artifact_cache:
+                self.artifact_cache.discard(self._blob_key(digest))
+    
+    def upload_predictor(self, model_id: str, predictor_bytes: bytes) -> str:
+        #Upload the NumPy-only predictor artifact next to model.pkl
+        try:
+            predictor_key = f"models/{model_id}/predictor.npz"
+            self.s3.put_object(
+                Bucket=self.bucket_name,
+                Key=predictor_key,
+                Body=predictor_bytes
+            )
+            return predictor_key
+            
+        except Exception as e:
+            raise Exception(f"Failed to upload predictor: {str(e)}")
+    
+    def download_predictor(self, model_id: str, return_etag: bool = False):
+        # Download the raw predictor artifact bytes from S3; with return_etag,
+        # (bytes, ETag) so callers can revalidate later with predictor_etag
+        try:
+            response = self.s3.get_object(
+                Bucket=self.bucket_name,
+                Key=f"models/{model_id}/predictor.npz"
+            )
+            predictor_bytes = response['Body'].read()
+            return (predictor_bytes, response.get('ETag')) if return_etag else predictor_bytes
+            
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'NoSuchKey':
+                return (None, None) if return_etag else None
+            raise Exception(f"Failed to download predictor: {str(e)}")
+    
+    def predictor_etag(self, model_id: str) -> Optional[str]:
+        # Current ETag of a model's predictor artifact (a HEAD request), or None if it has none
+        try:
+            response = self.s3.head_object(Bucket=self.bucket_name, Key=f"models/{model_id}/predictor.npz")
+            return response.get('ETag')
+        except ClientError as e:
+            if e.response['Error']['Code'] in ('404', 'NoSuchKey'):
+                return None
+            raise Exception(f"Failed to check predictor: {str(e)}")
+    
     def get_model_metadata(self, model_id: str) -> Optional[Dict]:
         # Get model metadata from S3
         try:
@@ -114,29 +272,23 @@ class S3Client:     #Handles S3 operations for ML model artifacts.
                 return None
             raise
     
-    def update_model(self, model_id: str, model_object: Any = None, metadata: Dict = None) -> str:
-        # Update existing model in S3 
+    def update_model(self, model_id: str, model_object: Any = None, metadata: Dict = None,
+                     digest: Optional[str] = None) -> str:
+        # Update existing model in S3; `digest` repoints it at a blob already stored with
+        # put_blob (pass model_object too so the blob can be restored if deleted meanwhile)
         try:
             # Check if model exists
             existing_metadata = self.get_model_metadata(model_id)
             if not existing_metadata:
                 raise ValueError(f"Model {model_id} not found")
             
-            # Update model if provided
-            if model_object:
-                model_key = f"models/{model_id}/model.pkl"
-                model_bytes = pickle.dumps(model_object)
-                
-                self.s3.put_object(
-                    Bucket=self.bucket_name,
-                    Key=model_key,
-                    Body=model_bytes
-                )
-
+            # Update model if provided; an unchanged artifact is not re-uploaded
+            if model_object and digest is None:
+                digest = self.put_blob(model_object)
             
+            metadata_key = f"models/{model_id}/metadata.json"
             if metadata: # Merge with existing metadata   
                 updated_metadata = {**existing_metadata, **metadata}
-                metadata_key = f"models/{model_id}/metadata.json"
                 
                 self.s3.put_object(
                     Bucket=self.bucket_name,
@@ -145,7 +297,22 @@ class S3Client:     #Handles S3 operations for ML model artifacts.
                     ContentType='application/json'
                 )
             
-            return f"models/{model_id}/model.pkl"
+            # Repoint last, so a failure leaves the old artifact served
+            if digest:
+                try:
+                    self.link_model(model_id, digest, model_object)
+                except Exception:
+                    if metadata:
+                        self.s3.put_object(
+                            Bucket=self.bucket_name,
+                            Key=metadata_key,
+                            Body=json.dumps(existing_metadata, indent=2),
+                            ContentType='application/json'
+                        )
+                    raise
+            
+            digest = self._read_pointer(model_id)
+            return self._blob_key(digest) if digest else f"models/{model_id}/model.pkl"
             
         except Exception as e:
             raise Exception(f"Failed to update model: {str(e)}")
@@ -163,6 +330,8 @@ class S3Client:     #Handles S3 operations for ML model artifacts.
             if 'Contents' not in response:
                 raise ValueError(f"Model {model_id} not found")
             
+            digest = self._read_pointer(model_id)
+            
             # Delete all objects
             objects = [{'Key': obj['Key']} for obj in response['Contents']]
             
@@ -171,11 +340,75 @@ class S3Client:     #Handles S3 operations for ML model artifacts.
                 Delete={'Objects': objects}
             )
             
+            if digest:
+                # The blob itself goes only with its last reference
+                self._release_blob(digest, model_id)
+            elif self.artifact_cache:
+                self.artifact_cache.discard(f"models/{model_id}/model.pkl")
+            
             return True
             
         except Exception as e:
             raise Exception(f"Failed to delete model: {str(e)}")
     
+    def delete_models(self, model_ids: list) -> list:
+        #Delete the artifacts of many models with batched delete_objects; returns the IDs that had objects
+        try:
+            keys = []
+            released = []
+            deleted = []
+            for model_id in dict.fromkeys(model_ids):
+                model_keys = self._list_keys(f"models/{model_id}/")
+                if not model_keys:
+                    continue
+                deleted.append(model_id)
+                keys.extend(model_keys)
+                digest = self._read_pointer(model_id)
+                if digest:
+                    keys.append(f"refs/{digest}/{model_id}")
+                    released.append(digest)
+                elif self.artifact_cache:
+                    self.artifact_cache.discard(f"models/{model_id}/model.pkl")
+            self._delete_keys(keys)
+            
+            # Blobs go once their last reference has been deleted
+            orphaned = [self._blob_key(digest) for digest in dict.fromkeys(released)
+                        if not self._list_keys(f"refs/{digest}/", max_keys=1)]
+            self._delete_keys(orphaned)
+            if self.artifact_cache:
+                for blob_key in orphaned:
+                    self.artifact_cache.discard(blob_key)
+            
+            return deleted
+            
+        except Exception as e:
+            raise Exception(f"Failed to delete models: {str(e)}")
+    
+    def _list_keys(self, prefix: str, max_keys: Optional[int] = None) -> list:
+        #Keys under prefix, following continuation tokens unless max_keys caps the listing
+        keys = []
+        kwargs = {'Bucket': self.bucket_name, 'Prefix': prefix}
+        if max_keys:
+            kwargs['MaxKeys'] = max_keys
+        while True:
+            response = self.s3.list_objects_v2(**kwargs)
+            keys.extend(obj['Key'] for obj in response.get('Contents', []))
+            if max_keys or not response.get('IsTruncated'):
+                return keys
+            kwargs['ContinuationToken'] = response['NextContinuationToken']
+    
+    def _delete_keys(self, keys: list):
+        #delete_objects takes at most DELETE_BATCH_SIZE keys per call
+        for start in range(0, len(keys), DELETE_BATCH_SIZE):
+            response = self.s3.delete_objects(
+                Bucket=self.bucket_name,
+                Delete={'Objects': [{'Key': key} for key in keys[start:start + DELETE_BATCH_SIZE]],
+                        'Quiet': True}
+            )
+            if response.get('Errors'):
+                error = response['Errors'][0]
+                raise Exception(f"Failed to delete {error['Key']}: {error.get('Message', error.get('Code'))}")
+    
     def list_models(self) -> list:
         # List all model IDs in S3
         try:
@@ -202,12 +435,6 @@ class S3Client:     #Handles S3 operations for ML model artifacts.
             raise Exception(f"Failed to list models: {str(e)}")
     
     def model_exists(self, model_id: str) -> bool:
-        # Check if model exists in S3 
-        try:
-            model_key = f"models/{model_id}/model.pkl"
-            self.s3.head_object(Bucket=self.bucket_name, Key=model_key)
-            return True
-        except ClientError as e:
-            if e.response['Error']['Code'] == '404':
-                return False
-            raise
\ No newline at end of file
+        # Check if model exists in S3 (pointer, or a legacy artifact)
+        return (self._object_exists(f"models/{model_id}/model.ref")
+                or self._object_exists(f"models/{model_id}/model.pkl"))
\ No newline at end of file
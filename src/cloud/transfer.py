@@ -0,0 +1,160 @@
+import os
+import re
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Iterable, Optional, Tuple
+
+# Large-object transfers for S3: multipart uploads fed straight from a
+# serializer's chunks, and parallel ranged downloads written in place into a
+# preallocated buffer or file. Both keep at most `max_concurrency` parts in
+# flight, so peak memory stays near one copy of the artifact.
+
+MIN_PART_SIZE = 5 * 1024 ** 2  # S3's lower bound for every part but the last
+READ_CHUNK = 1024 ** 2
+
+
+def default_part_size() -> int:
+    return int(os.getenv('S3_MULTIPART_PART_SIZE', 8 * 1024 ** 2))
+
+
+def default_concurrency() -> int:
+    return int(os.getenv('S3_MAX_CONCURRENCY', 8))
+
+
+def iter_parts(chunks: Iterable, part_size: int):
+    #Regroup arbitrary byte chunks into parts of exactly part_size (the last may be shorter)
+    buffer = bytearray()
+    for chunk in chunks:
+        view = memoryview(chunk).cast('B')
+        while len(view):
+            take = part_size - len(buffer)
+            buffer += view[:take]
+            view = view[take:]
+            if len(buffer) == part_size:
+                yield bytes(buffer)
+                buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+def upload_stream(s3, bucket: str, key: str, chunks: Iterable,
+                  part_size: Optional[int] = None, max_concurrency: Optional[int] = None):
+    #Upload chunks as one object; a single put_object when they fit in one part.
+    #part_size is raised to MIN_PART_SIZE, since S3 rejects smaller parts
+    part_size = max(part_size or default_part_size(), MIN_PART_SIZE)
+    max_concurrency = max_concurrency or default_concurrency()
+
+    parts = iter_parts(chunks, part_size)
+    first = next(parts, b'')
+    second = next(parts, None)
+    if second is None:
+        s3.put_object(Bucket=bucket, Key=key, Body=first)
+        return
+
+    upload_id = s3.create_multipart_upload(Bucket=bucket, Key=key)['UploadId']
+
+    def upload_part(number, body):
+        response = s3.upload_part(Bucket=bucket, Key=key, UploadId=upload_id,
+                                  PartNumber=number, Body=body)
+        return {'PartNumber': number, 'ETag': response['ETag']}
+
+    try:
+        completed = []
+        with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+            pending = set()
+            for number, body in enumerate(_chain(first, second, parts), 1):
+                # Backpressure: only pull the next part once a slot frees up
+                if len(pending) >= max_concurrency:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    completed.extend(future.result() for future in done)
+                pending.add(pool.submit(upload_part, number, body))
+            completed.extend(future.result() for future in pending)
+
+        s3.complete_multipart_upload(
+            Bucket=bucket, Key=key, UploadId=upload_id,
+            MultipartUpload={'Parts': sorted(completed, key=lambda part: part['PartNumber'])}
+        )
+    except BaseException:
+        s3.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+        raise
+
+
+def _chain(first, second, rest):
+    yield first
+    yield second
+    yield from rest
+
+
+class BufferSink:
+    #Download target backed by one preallocated bytearray
+
+    def allocate(self, size: int):
+        self.buffer = bytearray(size)
+        self._view = memoryview(self.buffer)
+
+    def write(self, offset: int, data: bytes):
+        self._view[offset:offset + len(data)] = data
+
+
+class FileSink:
+    #Download target backed by an open file descriptor; parts land via pwrite,
+    #shifted by `offset` bytes to leave room for a caller's header
+
+    def __init__(self, fd: int, offset: int = 0):
+        self.fd = fd
+        self.offset = offset
+
+    def allocate(self, size: int):
+        os.ftruncate(self.fd, self.offset + size)
+
+    def write(self, offset: int, data: bytes):
+        offset += self.offset
+        view = memoryview(data)
+        while len(view):
+            written = os.pwrite(self.fd, view, offset)
+            view = view[written:]
+            offset += written
+
+
+def _total_size(response: dict) -> int:
+    # "bytes 0-8388607/123456789"; servers that ignore Range send the whole object
+    match = re.search(r'/(\d+)$', response.get('ContentRange') or '')
+    return int(match.group(1)) if match else int(response['ContentLength'])
+
+
+def _copy_body(body, sink, offset: int) -> int:
+    for chunk in iter(lambda: body.read(READ_CHUNK), b''):
+        sink.write(offset, chunk)
+        offset += len(chunk)
+    return offset
+
+
+def download(s3, bucket: str, key: str, sink, part_size: Optional[int] = None,
+             max_concurrency: Optional[int] = None, **conditions) -> Tuple[int, Optional[str]]:
+    #Fetch an object with parallel ranged GETs into sink; returns (size, etag)
+
+    # The first range doubles as the size probe, so small objects take one
+    # request. `conditions` (e.g. IfNoneMatch) apply to it; the remaining
+    # ranges are pinned to its ETag so a concurrent overwrite fails loudly
+    # instead of mixing versions.
+    part_size = part_size or default_part_size()
+    max_concurrency = max_concurrency or default_concurrency()
+
+    first = s3.get_object(Bucket=bucket, Key=key, Range=f'bytes=0-{part_size - 1}', **conditions)
+    size = _total_size(first)
+    etag = first.get('ETag')
+    sink.allocate(size)
+    end = _copy_body(first['Body'], sink, 0)
+    if end >= size:
+        return size, etag
+
+    def fetch(start):
+        stop = min(start + part_size, size)
+        kwargs = {'IfMatch': etag} if etag else {}
+        response = s3.get_object(Bucket=bucket, Key=key, Range=f'bytes={start}-{stop - 1}', **kwargs)
+        if _copy_body(response['Body'], sink, start) != stop:
+            raise IOError(f"Short read for s3://{bucket}/{key} at offset {start}")
+
+    starts = range(end, size, part_size)
+    with ThreadPoolExecutor(max_workers=min(max_concurrency, len(starts))) as pool:
+        list(pool.map(fetch, starts))
+    return size, etag
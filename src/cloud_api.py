@@ -1,13 +1,26 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request, stream_with_context
+import itertools
 import json
 import os
+import queue
+import threading
 import uuid
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime
 from src.data_processor import DataProcessor
-from src.cloud import DynamoDBClient, S3Client
+from src.dataset_cache import DatasetCache
+from src.standalone import StandalonePredictor, rows_to_matrix
+from src.batching import MicroBatcher
+from src.model_cache import ModelCache
+from src.jobs import JobQueue, process_context
+from src.cloud import DynamoDBClient, S3Client, ModelAlreadyExistsError, ModelNotFoundError
+from src.cloud.dynamodb_client import DEFAULT_PAGE_SIZE
 
 app = Flask(__name__)
 
+# Parsed training/prediction datasets, shared across requests
+dataset_cache = DatasetCache()
+
 # Initialize cloud clients lazily
 dynamodb = None
 s3 = None
@@ -25,9 +38,135 @@ def get_cloud_clients():
         # If cloud clients can't be initialized, raise a more descriptive error
         raise Exception(f"Failed to initialize cloud clients: {str(e)}")
 
-# In-memory cache for current model
-current_model = None
-current_model_id = None
+# Loaded models by ID, bounded by count and estimated bytes; a model's
+# micro-batcher is closed when the model leaves the cache
+model_cache = ModelCache(on_evict=lambda model_id: close_batcher(model_id))
+
+# Bounded pool for overlapping DynamoDB and S3 writes within one request
+io_pool = ThreadPoolExecutor(max_workers=int(os.getenv('CLOUD_IO_MAX_WORKERS', 16)),
+                             thread_name_prefix='cloud-io')
+
+# Background training jobs (POST /models with "async": true)
+jobs = JobQueue()
+
+# Bulk requests handle at most this many models
+MAX_BULK_MODELS = int(os.getenv('MAX_BULK_MODELS', 500))
+
+# IDs that would be shadowed by the /models/bulk routes
+RESERVED_MODEL_IDS = {'bulk'}
+
+# Per-model micro-batchers for POST /models/<model_id>/predict
+batchers = {}
+batchers_lock = threading.Lock()
+
+
+def load_model(model_id):
+    #Return the processor for model_id. On a cache miss, concurrent callers
+    #share one fetch from DynamoDB/S3 instead of each downloading the artifact
+    return model_cache.get_or_load(model_id, lambda: fetch_model(model_id))
+
+
+def fetch_model(model_id):
+    #Fetch and unpickle a model artifact from S3
+    dynamodb, s3 = get_cloud_clients()
+    
+    # Check if model exists in DynamoDB
+    if not dynamodb.get_model(model_id):
+        raise LookupError("Model not found")
+    
+    # Load model from S3
+    model = s3.download_model(model_id)
+    if not model:
+        raise LookupError("Model artifact not found in S3")
+    
+    # Create processor from the stored scaler and model
+    processor = DataProcessor(dataset_cache=dataset_cache)
+    processor.load_artifact(model)
+    return processor
+
+
+def train_new_model(data_path, cache=None, progress=None):
+    #Train a processor on data_path; returns it with its training metrics.
+    #Module-level so bulk creation and training jobs can run it in worker processes
+    progress = progress or (lambda fraction, message=None: None)
+    processor = DataProcessor(dataset_cache=cache)
+    progress(0.1, "Loading data")
+    ml_data = processor.load_data(data_path)
+    clean_data = processor.clean_data(ml_data)
+    X, y = processor.split_features_target(clean_data)
+    X_train, X_test, y_train, y_test = processor.prepare_data(X, y)
+    
+    progress(0.3, "Training model")
+    train_accuracy = processor.train_model(X_train, y_train)
+    progress(0.9, "Evaluating model")
+    test_accuracy = processor.evaluate_model(X_test, y_test)
+    return processor, {
+        "train_accuracy": train_accuracy,
+        "test_accuracy": test_accuracy,
+        "training_samples": len(X_train),
+        "test_samples": len(X_test),
+        "features": list(X.columns)
+    }
+
+
+def model_type_error(data):
+    #Error for a model_type the model_type index cannot store (its key is a
+    #non-empty string), or None
+    if 'model_type' in data and not (isinstance(data['model_type'], str) and data['model_type']):
+        return "model_type must be a non-empty string"
+    return None
+
+
+def model_metadata(data, data_path, metrics):
+    #Metadata stored for a newly trained model
+    return {
+        "model_type": data.get('model_type', 'RandomForest'),
+        **metrics,
+        "data_path": data_path,
+        **{k: v for k, v in data.items() if k not in ['model_id', 'data_path', 'async', 'priority']}
+    }
+
+
+def run_io(*calls):
+    #Run calls concurrently on the I/O pool. Waits for all of them, so nothing
+    #is still writing when the caller compensates, then raises the first error
+    futures = [io_pool.submit(call) for call in calls]
+    wait(futures)
+    return [future.result() for future in futures]
+
+
+def discard_model(dynamodb, s3, model_id):
+    #Best-effort removal of a model whose creation failed halfway
+    try:
+        dynamodb.delete_model(model_id)
+    except ModelNotFoundError:
+        pass
+    s3.delete_models([model_id])
+
+
+def discard_blob(s3, blob):
+    #Best-effort removal of the blob uploaded (by future `blob`) for a write that failed;
+    #a blob some model refers to is kept
+    try:
+        s3.discard_blob(blob.result())
+    except Exception:
+        pass
+
+
+def get_batcher(model_id):
+    #Micro-batcher that scores concurrent requests for model_id together
+    with batchers_lock:
+        if model_id not in batchers:
+            batchers[model_id] = MicroBatcher(lambda X: load_model(model_id).predict(X))
+        return batchers[model_id]
+
+
+def close_batcher(model_id):
+    #Stop the micro-batcher of a deleted or evicted model
+    with batchers_lock:
+        batcher = batchers.pop(model_id, None)
+    if batcher:
+        batcher.close()
 
 
 @app.route('/health', methods=['GET'])
@@ -38,10 +177,12 @@ def health_check():
         dynamodb, s3 = get_cloud_clients()
         dynamodb_status = "connected"
         s3_status = "connected"
+        metadata_cache = dynamodb.cache_stats()
     except Exception as e:
         # If cloud clients can't be initialized, mark as disconnected
         dynamodb_status = "disconnected"
         s3_status = "disconnected"
+        metadata_cache = None
 
     return jsonify({
         "status": "healthy",
@@ -49,10 +190,33 @@ def health_check():
         "services": {
             "dynamodb": dynamodb_status,
             "s3": s3_status
-        }
+        },
+        "dataset_cache": dataset_cache.stats(),
+        "model_cache": model_cache.stats(),
+        "metadata_cache": metadata_cache,
+        "jobs": jobs.stats()
     }), 200
 
 
+def stream_model_page(filters, page, models):
+    #Write a page of models as JSON while `models` (iterating `page`) is read from
+    #DynamoDB. The 200 is already sent, so a read that fails midway ends the body
+    #with an "error" member and no next_cursor instead of truncating it
+    yield '{"filters": %s, "results": [' % json.dumps(filters)
+    count = 0
+    try:
+        for model in models:
+            yield (', ' if count else '') + json.dumps(model)
+            count += 1
+    except Exception as e:
+        yield '], "count": %d, "error": %s}' % (count, json.dumps(f"Failed to query models: {e}"))
+        return
+    yield '], "count": %d, "next_cursor": %s' % (count, json.dumps(page.next_cursor))
+    if count == 0 and page.next_cursor is None:
+        yield ', "message": "No models found matching criteria"'
+    yield '}'
+
+
 @app.route('/models', methods=['GET'])
 def get_models():
     #Get models with optional query parameters
@@ -70,7 +234,8 @@ def get_models():
             }), 400
         
         # Check for incorrect parameters
-        valid_params = ['model_type', 'accuracy_threshold', 'created_after', 'model_id']
+        valid_params = ['model_type', 'accuracy_threshold', 'created_after', 'model_id',
+                        'limit', 'cursor', 'fields']
         invalid_params = [p for p in query_params if p not in valid_params]
         
         if invalid_params:
@@ -82,31 +247,51 @@ def get_models():
         
         # Query models
         if 'model_id' in query_params:
+            # Repeated (?model_id=a&model_id=b) or comma-separated IDs
+            model_ids = [model_id.strip() for value in request.args.getlist('model_id')
+                         for model_id in value.split(',') if model_id.strip()]
+            if not model_ids:
+                return jsonify({"error": "model_id must not be empty"}), 400
+            if len(model_ids) > 1:
+                models = dynamodb.get_models(model_ids)
+                return jsonify({
+                    "results": [model for model in models if model],
+                    "count": sum(1 for model in models if model),
+                    "missing": [model_id for model_id, model in zip(model_ids, models) if not model]
+                }), 200
+            
             # Get specific model
-            model = dynamodb.get_model(query_params['model_id'])
+            model = dynamodb.get_model(model_ids[0])
             if not model:
                 return jsonify({
                     "error": "Model not found",
-                    "model_id": query_params['model_id']
+                    "model_id": model_ids[0]
                 }), 404
             return jsonify(model), 200
         
-        # Query with filters
-        models = dynamodb.query_models(**query_params)
-        
-        if not models:
-            return jsonify({
-                "message": "No models found matching criteria",
-                "filters": query_params,
-                "results": []
-            }), 200
-        
-        return jsonify({
-            "filters": query_params,
-            "count": len(models),
-            "results": models
-        }), 200
+        # Query with filters, one page at a time
+        try:
+            limit = int(query_params.pop('limit', DEFAULT_PAGE_SIZE))
+        except ValueError:
+            return jsonify({"error": "limit must be an integer"}), 400
+        cursor = query_params.pop('cursor', None)
+        fields = query_params.pop('fields', None)
+        page = dynamodb.query_models_page(
+            query_params, limit=limit, cursor=cursor,
+            fields=[field.strip() for field in fields.split(',') if field.strip()] if fields else None
+        )
+        
+        # Read up to the first model before answering, so a query that fails
+        # outright is still a 500
+        models = iter(page)
+        first = next(models, None)
+        if first is not None:
+            models = itertools.chain([first], models)
+        return Response(stream_with_context(stream_model_page(query_params, page, models)),
+                        status=200, mimetype='application/json')
         
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({
             "error": "Failed to query models",
@@ -117,8 +302,6 @@ def get_models():
 @app.route('/models', methods=['POST'])
 def create_model():
     #Create and train a new model
-    global current_model, current_model_id
-    
     try:
         # Get cloud clients
         dynamodb, s3 = get_cloud_clients()
@@ -130,62 +313,54 @@ def create_model():
         
         # Generate model ID
         model_id = data.get('model_id', f"model_{uuid.uuid4().hex[:8]}")
-        
-        # Check if model already exists
-        existing_model = dynamodb.get_model(model_id)
-        if existing_model:
-            return jsonify({
-                "error": "Duplicate model ID",
-                "message": f"Model {model_id} already exists",
-                "existing_model": existing_model
-            }), 409
+        if model_id in RESERVED_MODEL_IDS:
+            return jsonify({"error": f"Model ID '{model_id}' is reserved"}), 400
+        if model_type_error(data):
+            return jsonify({"error": model_type_error(data)}), 400
         
         # Load and process data
-        processor = DataProcessor()
         data_path = data.get('data_path', 'data/iris_simple.csv')
         
         if not os.path.exists(data_path):
             return jsonify({"error": "Data file not found"}), 400
         
-        # Train model
-        ml_data = processor.load_data(data_path)
-        clean_data = processor.clean_data(ml_data)
-        X, y = processor.split_features_target(clean_data)
-        X_train, X_test, y_train, y_test = processor.prepare_data(X, y)
-        
-        train_accuracy = processor.train_model(X_train, y_train)
-        test_accuracy = processor.evaluate_model(X_test, y_test)
-        
-        # Prepare metadata
-        metadata = {
-            "model_type": data.get('model_type', 'RandomForest'),
-            "train_accuracy": train_accuracy,
-            "test_accuracy": test_accuracy,
-            "training_samples": len(X_train),
-            "test_samples": len(X_test),
-            "features": list(X.columns),
-            "data_path": data_path,
-            **{k: v for k, v in data.items() if k not in ['model_id', 'data_path']}
-        }
-        
-        # Store in DynamoDB
-        db_item = dynamodb.create_model(model_id, metadata)
-        
-        # Store in S3
-        s3_key = s3.upload_model(model_id, processor.model, metadata)
+        # Fail fast on a known duplicate before training; the conditional put still decides
+        existing = dynamodb.get_model(model_id)
+        if existing:
+            raise ModelAlreadyExistsError(model_id, existing)
+        
+        if data.get('async', False):
+            priority = data.get('priority', 0)
+            if not isinstance(priority, int):
+                return jsonify({"error": "priority must be an integer"}), 400
+            try:
+                job = jobs.submit(
+                    train_new_model, data_path, priority=priority, name=f"create {model_id}",
+                    on_success=lambda result: store_new_model(model_id, data, data_path, *result)
+                )
+            except queue.Full as e:
+                return jsonify({"error": "Job queue is full", "details": str(e)}), 503
+            return jsonify({
+                "message": "Training job queued",
+                "model_id": model_id,
+                "job_id": job.id,
+                "status_url": f"/jobs/{job.id}"
+            }), 202, {"Location": f"/jobs/{job.id}"}
         
-        # Update current model
-        current_model = processor
-        current_model_id = model_id
+        # Train model
+        processor, metrics = train_new_model(data_path, dataset_cache)
         
         return jsonify({
             "message": "Model created successfully",
-            "model_id": model_id,
-            "dynamodb_item": db_item,
-            "s3_key": s3_key,
-            "metadata": metadata
+            **store_new_model(model_id, data, data_path, processor, metrics)
         }), 201
         
+    except ModelAlreadyExistsError as e:
+        return jsonify({
+            "error": "Duplicate model ID",
+            "message": str(e),
+            "existing_model": e.existing
+        }), 409
     except ValueError as e:
         return jsonify({"error": str(e)}), 409
     except Exception as e:
@@ -195,64 +370,337 @@ def create_model():
         }), 500
 
 
+def store_new_model(model_id, data, data_path, processor, metrics):
+    #Persist a newly trained model to DynamoDB and S3 and start serving it
+    dynamodb, s3 = get_cloud_clients()
+    processor.dataset_cache = dataset_cache
+    
+    # Prepare metadata
+    metadata = model_metadata(data, data_path, metrics)
+    
+    # Upload the artifact (scaler and feature order included) while DynamoDB
+    # checks the ID. The blob is content-addressed and nothing points at it
+    # yet, so a rejected duplicate leaves no model-visible change in S3; the
+    # blob itself is deleted again on every failure path
+    pipeline = processor.export_pipeline()
+    blob = io_pool.submit(s3.put_blob, pipeline)
+    # NumPy-only export for predict-only serving processes (src/serving_api.py)
+    predictor_bytes = StandalonePredictor.from_processor(processor).to_bytes()
+    try:
+        # Store in DynamoDB; a conditional put rejects duplicate IDs atomically
+        db_item = dynamodb.create_model(model_id, metadata)
+    except Exception:
+        discard_blob(s3, blob)
+        raise
+    
+    try:
+        digest = blob.result()
+        s3_key, _ = run_io(lambda: s3.attach_model(model_id, digest, metadata, pipeline),
+                           lambda: s3.upload_predictor(model_id, predictor_bytes))
+    except Exception:
+        # No item may outlive its artifact
+        try:
+            discard_model(dynamodb, s3, model_id)
+        finally:
+            discard_blob(s3, blob)
+        raise
+    
+    # Serve predictions from the freshly trained model
+    model_cache.put(model_id, processor)
+    
+    return {
+        "model_id": model_id,
+        "dynamodb_item": db_item,
+        "s3_key": s3_key,
+        "metadata": metadata
+    }
+
+
+@app.route('/models/bulk', methods=['POST'])
+def create_models_bulk():
+    #Create and train many models; training runs in parallel processes and
+    #the DynamoDB items are written concurrently. Reports a result per model
+    try:
+        dynamodb, s3 = get_cloud_clients()
+        
+        data = request.json
+        specs = data.get('models') if isinstance(data, dict) else None
+        if not isinstance(specs, list) or not specs:
+            return jsonify({"error": "Provide a non-empty 'models' list"}), 400
+        if len(specs) > MAX_BULK_MODELS:
+            return jsonify({"error": f"At most {MAX_BULK_MODELS} models per bulk request"}), 400
+        
+        results = [None] * len(specs)
+        pending = {}  # model_id -> (position, spec, data_path)
+        for position, spec in enumerate(specs):
+            if not isinstance(spec, dict):
+                results[position] = {"status": "invalid", "error": "Model spec must be an object"}
+                continue
+            model_id = spec.get('model_id', f"model_{uuid.uuid4().hex[:8]}")
+            data_path = spec.get('data_path', 'data/iris_simple.csv')
+            if model_id in RESERVED_MODEL_IDS:
+                results[position] = {"model_id": model_id, "status": "invalid",
+                                     "error": "Model ID is reserved"}
+            elif model_type_error(spec):
+                results[position] = {"model_id": model_id, "status": "invalid",
+                                     "error": model_type_error(spec)}
+            elif model_id in pending:
+                results[position] = {"model_id": model_id, "status": "invalid",
+                                     "error": "Model ID repeated in request"}
+            elif not os.path.exists(data_path):
+                results[position] = {"model_id": model_id, "status": "invalid",
+                                     "error": "Data file not found"}
+            else:
+                pending[model_id] = (position, spec, data_path)
+        
+        # Skip training models that already exist (one batched read); the
+        # conditional writes below still catch IDs taken while training
+        ids = list(pending)
+        for model_id, existing in zip(ids, dynamodb.get_models(ids) if ids else []):
+            if existing:
+                position = pending.pop(model_id)[0]
+                results[position] = {"model_id": model_id, "status": "duplicate",
+                                     "existing_model": existing}
+        
+        trained = {}
+        for model_id, outcome in zip(pending, train_in_parallel([path for _, _, path in pending.values()])):
+            if isinstance(outcome, Exception):
+                results[pending[model_id][0]] = {"model_id": model_id, "status": "failed",
+                                                 "error": f"Training failed: {outcome}"}
+            else:
+                processor, metrics = outcome
+                processor.dataset_cache = dataset_cache
+                position, spec, data_path = pending[model_id]
+                trained[model_id] = (processor, model_metadata(spec, data_path, metrics))
+        
+        items = dynamodb.create_models({model_id: metadata for model_id, (_, metadata) in trained.items()}) \
+            if trained else {}
+        
+        # Artifacts and predictors of every created model upload concurrently
+        uploads = {}  # model_id -> (artifact future, predictor future)
+        for model_id, (processor, metadata) in trained.items():
+            position = pending[model_id][0]
+            if isinstance(items[model_id], ModelAlreadyExistsError):
+                results[position] = {"model_id": model_id, "status": "duplicate",
+                                     "existing_model": items[model_id].existing}
+                continue
+            if isinstance(items[model_id], Exception):
+                results[position] = {"model_id": model_id, "status": "failed", "error": str(items[model_id])}
+                continue
+            uploads[model_id] = (
+                io_pool.submit(s3.upload_model, model_id, processor.export_pipeline(), metadata),
+                io_pool.submit(s3.upload_predictor, model_id,
+                               StandalonePredictor.from_processor(processor).to_bytes())
+            )
+        wait([future for pair in uploads.values() for future in pair])
+        
+        failed = []
+        for model_id, (artifact, predictor) in uploads.items():
+            position = pending[model_id][0]
+            try:
+                s3_key = artifact.result()
+                predictor.result()
+            except Exception as e:
+                failed.append(model_id)
+                results[position] = {"model_id": model_id, "status": "failed", "error": str(e)}
+                continue
+            model_cache.put(model_id, trained[model_id][0])
+            results[position] = {"model_id": model_id, "status": "created", "s3_key": s3_key,
+                                 "dynamodb_item": items[model_id]}
+        
+        if failed:
+            # No item should point at a missing artifact
+            dynamodb.delete_models(failed)
+            s3.delete_models(failed)
+        
+        created = sum(1 for result in results if result["status"] == "created")
+        return jsonify({
+            "message": f"Created {created} of {len(specs)} models",
+            "created": created,
+            "results": results
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            "error": "Failed to create models",
+            "details": str(e)
+        }), 500
+
+
+def train_in_parallel(data_paths):
+    #Train one model per path across CPU cores; a failed fit yields its exception
+    if len(data_paths) <= 1:
+        return [_train_or_error(path) for path in data_paths]
+    with process_context().Pool(min(len(data_paths), os.cpu_count() or 1)) as pool:
+        return pool.map(_train_or_error, data_paths)
+
+
+def _train_or_error(data_path):
+    try:
+        return train_new_model(data_path)
+    except Exception as e:
+        return e
+
+
+@app.route('/models/bulk', methods=['DELETE'])
+def delete_models_bulk():
+    #Delete many models with batched DynamoDB and S3 deletes; reports a result per model
+    try:
+        dynamodb, s3 = get_cloud_clients()
+        
+        data = request.json
+        model_ids = data.get('model_ids') if isinstance(data, dict) else None
+        if not isinstance(model_ids, list) or not model_ids \
+                or not all(isinstance(model_id, str) for model_id in model_ids):
+            return jsonify({"error": "Provide a non-empty 'model_ids' list of strings"}), 400
+        if len(model_ids) > MAX_BULK_MODELS:
+            return jsonify({"error": f"At most {MAX_BULK_MODELS} models per bulk request"}), 400
+        
+        model_ids = list(dict.fromkeys(model_ids))
+        existing = [model_id for model_id, item in zip(model_ids, dynamodb.get_models(model_ids)) if item]
+        if existing:
+            dynamodb.delete_models(existing)
+            s3.delete_models(existing)
+        
+        for model_id in existing:
+            model_cache.invalidate(model_id)
+        
+        deleted = set(existing)
+        return jsonify({
+            "message": f"Deleted {len(deleted)} of {len(model_ids)} models",
+            "deleted": len(deleted),
+            "results": [{"model_id": model_id, "status": "deleted" if model_id in deleted else "not_found"}
+                        for model_id in model_ids]
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            "error": "Failed to delete models",
+            "details": str(e)
+        }), 500
+
+
 @app.route('/models/<model_id>', methods=['PUT'])
 def update_model(model_id):
     #Update existing model
-    global current_model, current_model_id
-    
     try:
         #Get cloud clients
         dynamodb, s3 = get_cloud_clients()
 
-        # Check if model exists
-        existing_model = dynamodb.get_model(model_id)
-        if not existing_model:
-            return jsonify({
-                "error": "Model not found",
-                "message": f"No model with ID {model_id}"
-            }), 404
-        
         # Parse request body
         data = request.json
         if not data:
             return jsonify({"error": "No JSON data provided"}), 400
+        if model_type_error(data):
+            return jsonify({"error": model_type_error(data)}), 400
         
         # If retraining is requested
         if data.get('retrain', False):
-            processor = DataProcessor()
-            data_path = data.get('data_path', existing_model.get('data_path', 'data/iris_simple.csv'))
+            n_new_estimators = data.get('n_new_estimators', 10)
+            if data.get('incremental', False) and (
+                    not isinstance(n_new_estimators, int) or isinstance(n_new_estimators, bool)
+                    or n_new_estimators < 1):
+                return jsonify({"error": "n_new_estimators must be a positive integer"}), 400
+            processor = DataProcessor(dataset_cache=dataset_cache)
+            data_path = data.get('data_path')
+            if data_path is None:
+                # Default to the model's training data, which needs its item
+                existing_model = dynamodb.get_model(model_id)
+                if not existing_model:
+                    raise ModelNotFoundError(model_id)
+                data_path = existing_model.get('data_path', 'data/iris_simple.csv')
             
             # Retrain model
             ml_data = processor.load_data(data_path)
             clean_data = processor.clean_data(ml_data)
             X, y = processor.split_features_target(clean_data)
-            X_train, X_test, y_train, y_test = processor.prepare_data(X, y)
             
-            train_accuracy = processor.train_model(X_train, y_train)
+            if data.get('incremental', False):
+                # Grow the stored forest on the new data instead of starting over
+                artifact = s3.download_model(model_id)
+                if not artifact:
+                    return jsonify({
+                        "error": "Model artifact not found in S3",
+                        "model_id": model_id
+                    }), 404
+                processor.load_artifact(artifact)
+                if processor.feature_names is None:
+                    # Legacy artifact without its scaler
+                    X_train, X_test, y_train, y_test = processor.prepare_data(X, y)
+                else:
+                    # Keep the stored scaler so old and new trees see the same scale
+                    X_train, X_test, y_train, y_test = processor.split_data(X, y)
+                    X_train, X_test = processor.transform(X_train), processor.transform(X_test)
+                try:
+                    train_accuracy = processor.train_incremental(X_train, y_train, n_new_estimators)
+                except ValueError as e:
+                    return jsonify({"error": str(e)}), 400
+            else:
+                X_train, X_test, y_train, y_test = processor.prepare_data(X, y)
+                train_accuracy = processor.train_model(X_train, y_train)
             test_accuracy = processor.evaluate_model(X_test, y_test)
             
             # Update metadata
             updates = {
                 "train_accuracy": train_accuracy,
                 "test_accuracy": test_accuracy,
+                "n_estimators": len(processor.model.estimators_),
+                "retrain_mode": "incremental" if data.get('incremental', False) else "full",
                 "last_trained": datetime.utcnow().isoformat()
             }
             
-            # Update S3 with new model
-            s3.update_model(model_id, processor.model, updates)
-            
-            # Update current model if it's the active one
-            if current_model_id == model_id:
-                current_model = processor
         else:
             # Just update metadata
             updates = {k: v for k, v in data.items() if k not in ['model_id', 'retrain']}
         
-        # Update DynamoDB
-        updated_item = dynamodb.update_model(model_id, updates)
-        
-        # Update S3 metadata
-        s3.update_model(model_id, metadata=updates)
+        if data.get('retrain', False):
+            # Upload the new artifact, and keep the current predictor for rollback,
+            # while DynamoDB runs the conditional update, which is the existence
+            # check; the model is repointed only after it
+            pipeline = processor.export_pipeline()
+            blob = io_pool.submit(s3.put_blob, pipeline)
+            old_predictor = io_pool.submit(s3.download_predictor, model_id)
+            predictor_bytes = StandalonePredictor.from_processor(processor).to_bytes()
+            try:
+                updated_item, previous = dynamodb.update_model(model_id, updates, return_previous=True)
+            except Exception:
+                discard_blob(s3, blob)
+                raise
+            finally:
+                wait([blob, old_predictor])
+            
+            try:
+                digest = blob.result()
+                previous_predictor = old_predictor.result()
+                # Each step is undone if a later one fails. The pointer switch
+                # comes last: s3.update_model undoes its own metadata write
+                s3.upload_predictor(model_id, predictor_bytes)
+                try:
+                    s3.update_model(model_id, pipeline, updates, digest)
+                except Exception:
+                    if previous_predictor is not None:
+                        s3.upload_predictor(model_id, previous_predictor)
+                    raise
+            except Exception:
+                try:
+                    dynamodb.restore_model(model_id, previous, [*updates, 'updated_at'])
+                finally:
+                    # Unless the model already pointed at it, nothing refers to the new blob
+                    discard_blob(s3, blob)
+                raise
+            
+            # Serve predictions from the retrained model
+            model_cache.put(model_id, processor)
+        else:
+            # DynamoDB first: it is the existence check, and a failure there
+            # leaves S3 untouched; if S3 then fails, DynamoDB is put back
+            updated_item, previous = dynamodb.update_model(model_id, updates, return_previous=True)
+            try:
+                s3.update_model(model_id, None, updates)
+            except Exception:
+                dynamodb.restore_model(model_id, previous, [*updates, 'updated_at'])
+                raise
+            model_cache.invalidate(model_id)
         
         return jsonify({
             "message": "Model updated successfully",
@@ -261,6 +709,11 @@ def update_model(model_id):
             "updated_item": updated_item
         }), 200
         
+    except ModelNotFoundError:
+        return jsonify({
+            "error": "Model not found",
+            "message": f"No model with ID {model_id}"
+        }), 404
     except ValueError as e:
         return jsonify({"error": str(e)}), 404
     except Exception as e:
@@ -273,36 +726,29 @@ def update_model(model_id):
 @app.route('/models/<model_id>', methods=['DELETE'])
 def delete_model(model_id):
     #Delete model from both DynamoDB and S3
-    global current_model, current_model_id
-    
     try:
         #Get cloud clients
         dynamodb, s3 = get_cloud_clients()
 
-        # Check if model exists
-        existing_model = dynamodb.get_model(model_id)
-        if not existing_model:
-            return jsonify({
-                "error": "Model not found",
-                "message": f"No model with ID {model_id}"
-            }), 404
-        
-        # Delete from DynamoDB
+        # Delete from DynamoDB; a conditional delete reports a missing model
         dynamodb.delete_model(model_id)
         
         # Delete from S3
         s3.delete_model(model_id)
         
-        # Clear current model if it's the one being deleted
-        if current_model_id == model_id:
-            current_model = None
-            current_model_id = None
+        # Drop the deleted model (and its micro-batcher) from memory
+        model_cache.invalidate(model_id)
         
         return jsonify({
             "message": "Model deleted successfully",
             "model_id": model_id
         }), 200
         
+    except ModelNotFoundError:
+        return jsonify({
+            "error": "Model not found",
+            "message": f"No model with ID {model_id}"
+        }), 404
     except ValueError as e:
         return jsonify({"error": str(e)}), 404
     except Exception as e:
@@ -315,53 +761,81 @@ def delete_model(model_id):
 @app.route('/models/<model_id>/predict', methods=['GET'])
 def predict(model_id):
     #Make predictions using a specific model
-    global current_model, current_model_id
-    
     try:
-        #Get cloud clients
-        dynamodb, s3 = get_cloud_clients()
-        
         # Load model if not current
-        if current_model_id != model_id:
-            # Check if model exists in DynamoDB
-            model_metadata = dynamodb.get_model(model_id)
-            if not model_metadata:
-                return jsonify({
-                    "error": "Model not found",
-                    "model_id": model_id
-                }), 404
-            
-            # Load model from S3
-            model = s3.download_model(model_id)
-            if not model:
-                return jsonify({
-                    "error": "Model artifact not found in S3",
-                    "model_id": model_id
-                }), 404
-            
-            # Create processor and set model
-            processor = DataProcessor()
-            processor.model = model
-            current_model = processor
-            current_model_id = model_id
+        try:
+            processor = load_model(model_id)
+        except LookupError as e:
+            return jsonify({
+                "error": str(e),
+                "model_id": model_id
+            }), 404
         
         # Make predictions on test data
         data_path = request.args.get('data_path', 'data/iris_simple.csv')
-        data = current_model.load_data(data_path)
-        clean_data = current_model.clean_data(data)
-        X, y = current_model.split_features_target(clean_data)
-        X_train, X_test, y_train, y_test = current_model.prepare_data(X, y)
-        
-        predictions = current_model.model.predict(X_test).tolist()
+        data = processor.load_data(data_path)
+        clean_data = processor.clean_data(data)
+        X, y = processor.split_features_target(clean_data)
+        if processor.feature_names is None:
+            # Legacy artifact stored without its scaler: fit one for this
+            # request's data on a processor of its own, since the cached one
+            # is shared by concurrent requests
+            legacy = processor
+            processor = DataProcessor(dataset_cache=dataset_cache)
+            processor.load_artifact(legacy.model)
+            processor.prepare_data(X, y)
+        X_train, X_test, y_train, y_test = processor.split_data(X, y)
+        
+        predictions = processor.predict(X_test).tolist()
         actual = y_test.tolist()
         
         return jsonify({
             "model_id": model_id,
             "predictions": predictions,
             "actual": actual,
-            "accuracy": current_model.model.score(X_test, y_test)
+            "accuracy": processor.score(X_test, y_test)
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            "error": "Prediction failed",
+            "details": str(e)
+        }), 500
+
+
+@app.route('/models/<model_id>/predict', methods=['POST'])
+def predict_instances(model_id):
+    #Predict caller-supplied feature rows, micro-batched with concurrent requests
+    try:
+        data = request.json
+        if not data or 'instances' not in data:
+            return jsonify({"error": "No instances provided"}), 400
+        
+        try:
+            processor = load_model(model_id)
+        except LookupError as e:
+            return jsonify({
+                "error": str(e),
+                "model_id": model_id
+            }), 404
+        
+        if processor.feature_names is None:
+            return jsonify({
+                "error": "Model has no stored scaler",
+                "message": "Retrain the model to predict on supplied rows"
+            }), 409
+        
+        X = rows_to_matrix(data['instances'], processor.feature_names)
+        predictions = get_batcher(model_id).predict(X).tolist()
+        
+        return jsonify({
+            "model_id": model_id,
+            "predictions": predictions,
+            "prediction_count": len(predictions)
         }), 200
         
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({
             "error": "Prediction failed",
@@ -369,6 +843,26 @@ def predict(model_id):
         }), 500
 
 
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    #Report a training job's status, progress and timings
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found", "job_id": job_id}), 404
+    return jsonify(job.to_dict()), 200
+
+
+@app.route('/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    #Cancel a queued or running training job
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found", "job_id": job_id}), 404
+    if not jobs.cancel(job_id):
+        return jsonify({"error": "Job already finished", "job": job.to_dict()}), 409
+    return jsonify({"message": "Job cancelled", "job": job.to_dict()}), 200
+
+
 @app.errorhandler(404)
 def not_found(error):
     #Handle 404 errors
@@ -378,9 +872,14 @@ def not_found(error):
             "GET /health",
             "GET /models",
             "POST /models",
+            "POST /models/bulk",
+            "DELETE /models/bulk",
             "PUT /models/<model_id>",
             "DELETE /models/<model_id>",
-            "GET /models/<model_id>/predict"
+            "GET /models/<model_id>/predict",
+            "POST /models/<model_id>/predict",
+            "GET /jobs/<job_id>",
+            "DELETE /jobs/<job_id>"
         ]
     }), 404
 
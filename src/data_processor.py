@@ -2,43 +2,277 @@
 
 import pandas as pd
 import numpy as np
+from sklearn.base import clone
 from sklearn.model_selection import train_test_split
+from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import StandardScaler
 from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score
+
+from src.forest import FlatForest
+from src.sweep import run_sweep
+
+# Batches up to this size are predicted with the compiled FlatForest, which
+# beats scikit-learn's per-tree dispatch on small inputs but not on large ones
+# (see scripts/benchmark_forest.py)
+FLAT_PREDICT_MAX_ROWS = 256
+
+
+class ChunkStream:
+    """Re-iterable stream of DataFrame chunks.
+
+    Each iteration re-reads the source, so a stream can be consumed more
+    than once without ever holding the full dataset in memory.
+    """
+    
+    def __init__(self, source, transform=None):
+        self.source = source
+        self.transform = transform
+    
+    def __iter__(self):
+        chunks = self.source() if callable(self.source) else self.source
+        for chunk in chunks:
+            yield chunk if self.transform is None else self.transform(chunk)
+    
+    def map(self, transform):
+        """Return a new stream applying `transform` to every chunk."""
+        return ChunkStream(self, transform)
+    
+    def zip(self, other):
+        """Iterate chunk pairs of this stream and `other`.
+
+        Two streams mapped from the same stream (such as the features and
+        target from split_features_target) read their source only once.
+        """
+        if isinstance(self.source, ChunkStream) and self.source is other.source \
+                and self.transform is not None and other.transform is not None:
+            for chunk in self.source:
+                yield self.transform(chunk), other.transform(chunk)
+        else:
+            yield from zip(self, other)
+
 
 class DataProcessor:
     """Handles data loading, cleaning, and basic ML operations."""
     
-    def __init__(self):
+    def __init__(self, dataset_cache=None):
         self.scaler = StandardScaler()
         self.model = RandomForestClassifier(n_estimators=10, random_state=42)
+        self.dataset_cache = dataset_cache
+        # Training column order; None until the scaler has been fitted
+        self.feature_names = None
+        self._flat_forest = None
+        self._flat_source = None
+    
+    def load_data(self, filepath, chunksize=None, dtype=None, usecols=None,
+                  target_col='target'):
+        """Load CSV data.
+
+        With `chunksize` set, returns a ChunkStream of DataFrames of at most
+        `chunksize` rows instead of one frame. Columns are read with `dtype`,
+        or with a compact schema inferred from the head of the file.
+        Whole-file loads go through `dataset_cache` when one is configured.
+        """
+        if chunksize is None:
+            if self.dataset_cache is not None:
+                return self.dataset_cache.load(filepath, dtype=dtype, usecols=usecols)
+            return pd.read_csv(filepath, dtype=dtype, usecols=usecols)
+        if dtype is None:
+            dtype = self.infer_schema(filepath, usecols=usecols, target_col=target_col)
+        return ChunkStream(lambda: pd.read_csv(
+            filepath, chunksize=chunksize, dtype=dtype, usecols=usecols
+        ))
     
-    def load_data(self, filepath):
-        """Load CSV data."""
-        return pd.read_csv(filepath)
+    def infer_schema(self, filepath, usecols=None, target_col='target', sample_rows=1000):
+        """Infer a compact dtype mapping from the first rows of a CSV.
+
+        Numeric features become float32 and integer targets nullable Int64.
+        The target is not narrowed further: a label beyond the sampled range
+        would wrap silently in a smaller type.
+        """
+        sample = pd.read_csv(filepath, nrows=sample_rows, usecols=usecols)
+        schema = {}
+        for col, dtype in sample.dtypes.items():
+            if col == target_col and pd.api.types.is_integer_dtype(dtype):
+                # Nullable dtype so rows with a missing target reach clean_data
+                schema[col] = 'Int64'
+            elif pd.api.types.is_numeric_dtype(dtype):
+                schema[col] = 'float32'
+        return schema
     
     def clean_data(self, data):
         """Remove missing values."""
+        if isinstance(data, ChunkStream):
+            return data.map(lambda chunk: chunk.dropna())
         return data.dropna()
     
     def split_features_target(self, data, target_col='target'):
         """Split data into features and target."""
+        if isinstance(data, ChunkStream):
+            return (data.map(lambda chunk: chunk.drop(columns=[target_col])),
+                    data.map(lambda chunk: chunk[target_col]))
         X = data.drop(columns=[target_col])
         y = data[target_col]
         return X, y
     
-    def prepare_data(self, X, y, test_size=0.3):
-        """Scale features and split data."""
+    def prepare_data(self, X, y, test_size=0.3, mmap_path=None):
+        """Scale features and split data.
+
+        ChunkStream inputs (see load_data) are scaled out of core and
+        returned as float32 NumPy arrays, backed by `mmap_path` if given.
+        """
+        if isinstance(X, ChunkStream):
+            return self._prepare_chunked(X, y, test_size, mmap_path)
         X_scaled = self.scaler.fit_transform(X)
+        self.feature_names = list(X.columns)
         # Convert back to DataFrame to preserve column names
         X_scaled_df = pd.DataFrame(X_scaled, columns=X.columns, index=X.index)
         return train_test_split(X_scaled_df, y, test_size=test_size, random_state=42)
     
+    def split_data(self, X, y, test_size=0.3):
+        """Split unscaled data into the same train/test rows as prepare_data."""
+        return train_test_split(X, y, test_size=test_size, random_state=42)
+    
+    def transform(self, X):
+        """Scale features with the already fitted scaler, in training column order.
+
+        Plain arrays are taken to already be in training column order.
+        """
+        X = X[self.feature_names] if isinstance(X, pd.DataFrame) else pd.DataFrame(
+            np.asarray(X), columns=self.feature_names)
+        return pd.DataFrame(self.scaler.transform(X), columns=self.feature_names, index=X.index)
+    
+    def compiled_model(self):
+        """FlatForest of the current model, recompiled when the model changes.
+
+        Refitting the same estimator in place does not change its identity, so
+        every method that fits or replaces the model also drops the cache.
+        """
+        source = (self.model, len(self.model.estimators_))
+        if self._flat_source is None or self._flat_source[0] is not source[0] \
+                or self._flat_source[1] != source[1]:
+            self._flat_forest = FlatForest.from_sklearn(self.model)
+            self._flat_source = source
+        return self._flat_forest
+    
+    def predict(self, X):
+        """Predict on unscaled features without refitting anything."""
+        X_scaled = self.transform(X)
+        if len(X_scaled) <= FLAT_PREDICT_MAX_ROWS and isinstance(self.model, RandomForestClassifier):
+            return self.compiled_model().predict(X_scaled.to_numpy())
+        return self.model.predict(X_scaled)
+    
+    def score(self, X, y):
+        """Accuracy on unscaled features."""
+        return accuracy_score(y, self.predict(X))
+    
+    def export_pipeline(self):
+        """Bundle the fitted scaler and model into one persistable artifact.
+
+        The pipeline's `feature_names_in_` records the training column order.
+        """
+        return Pipeline([('scaler', self.scaler), ('model', self.model)])
+    
+    def load_artifact(self, artifact):
+        """Restore state from an export_pipeline artifact.
+
+        Legacy artifacts holding only the estimator leave the scaler unfitted
+        (`feature_names` stays None).
+        """
+        if isinstance(artifact, Pipeline):
+            self.scaler = artifact.named_steps['scaler']
+            self.model = artifact.named_steps['model']
+            self.feature_names = list(artifact.feature_names_in_)
+        else:
+            self.model = artifact
+        self._reset_compiled()
+    
+    def _reset_compiled(self):
+        """Forget the FlatForest so the next flat predict recompiles it."""
+        self._flat_forest = None
+        self._flat_source = None
+    
+    def _prepare_chunked(self, X, y, test_size, mmap_path=None):
+        """Two-pass scaling of a chunk stream into one preallocated array.
+
+        Each pass reads the source once: pass 1 splits every chunk into
+        features and target, pass 2 only needs the features.
+        """
+        # Pass 1: running mean/variance; the target is small enough to keep
+        self.scaler = clone(self.scaler)
+        targets = []
+        for X_chunk, y_chunk in X.zip(y):
+            self.scaler.partial_fit(X_chunk)
+            targets.append(y_chunk.to_numpy(dtype=getattr(y_chunk.dtype, 'numpy_dtype', y_chunk.dtype)))
+        y_all = np.concatenate(targets)
+        n_rows = len(y_all)
+        self.feature_names = list(self.scaler.feature_names_in_)
+        
+        # Same split as the in-memory path, computed on row numbers. Train rows
+        # are placed first so both halves are views of one matrix.
+        train_idx, test_idx = train_test_split(np.arange(n_rows), test_size=test_size, random_state=42)
+        n_train = len(train_idx)
+        dest = np.empty(n_rows, dtype=np.int64)
+        dest[train_idx] = np.arange(n_train)
+        dest[test_idx] = np.arange(n_train, n_rows)
+        
+        shape = (n_rows, len(self.scaler.mean_))
+        if mmap_path is not None:
+            X_out = np.lib.format.open_memmap(mmap_path, mode='w+', dtype=np.float32, shape=shape)
+        else:
+            X_out = np.empty(shape, dtype=np.float32)
+        y_out = np.empty_like(y_all)
+        y_out[dest] = y_all
+        
+        # Pass 2: scale each chunk in place and scatter it to its final rows
+        start = 0
+        for X_chunk in X:
+            rows = dest[start:start + len(X_chunk)]
+            X_out[rows] = self.scaler.transform(X_chunk, copy=False)
+            start += len(X_chunk)
+        
+        return X_out[:n_train], X_out[n_train:], y_out[:n_train], y_out[n_train:]
+    
     def train_model(self, X_train, y_train):
         """Train a simple model."""
         self.model.fit(X_train, y_train)
+        self._reset_compiled()
+        return self.model.score(X_train, y_train)
+    
+    def train_incremental(self, X_train, y_train, n_new_estimators=10):
+        """Grow extra trees on new data only, keeping the already fitted ones."""
+        if not isinstance(n_new_estimators, (int, np.integer)) or isinstance(n_new_estimators, bool) \
+                or n_new_estimators < 1:
+            raise ValueError("n_new_estimators must be a positive integer")
+        if set(np.unique(y_train)) != set(self.model.classes_):
+            raise ValueError("Incremental training data must contain every class the model was trained on")
+        self.model.set_params(
+            warm_start=True,
+            n_estimators=len(self.model.estimators_) + n_new_estimators
+        )
+        self.model.fit(X_train, y_train)
+        self._reset_compiled()
         return self.model.score(X_train, y_train)
     
+    def sweep(self, X_train, y_train, X_val, y_val, param_grid, strategy='grid',
+              n_jobs=None, time_budget=None):
+        """Search `param_grid` in parallel and keep the best model.
+
+        Candidates are scored on the validation set; the winner, fitted on
+        the full training set, becomes `self.model`. That fit counts against
+        `time_budget` too. Returns the ranked leaderboard from `run_sweep`.
+        """
+        leaderboard, best_model = run_sweep(
+            X_train, y_train, X_val, y_val, param_grid,
+            base_params=self.model.get_params(), strategy=strategy,
+            n_jobs=n_jobs, time_budget=time_budget
+        )
+        if best_model is None:
+            raise TimeoutError("No sweep candidate finished within the time budget")
+        self.model = best_model
+        self._reset_compiled()
+        return leaderboard
+    
     def evaluate_model(self, X_test, y_test):
         """Evaluate model performance."""
         return self.model.score(X_test, y_test)
\ No newline at end of file
@@ -0,0 +1,155 @@
+"""On-disk columnar cache for CSV datasets.
+
+A CSV is parsed once and stored as one `.npy` file per column. Later loads
+memory-map those files instead of parsing text again.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+MANIFEST = 'manifest.json'
+
+
+class DatasetCache:
+    """Fingerprinted, size-bounded LRU cache of parsed CSV files."""
+
+    def __init__(self, cache_dir=None, max_bytes=None):
+        self.cache_dir = cache_dir or os.getenv(
+            'DATASET_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'ml-pipeline-datasets')
+        )
+        self.max_bytes = int(max_bytes if max_bytes is not None
+                             else os.getenv('DATASET_CACHE_MAX_BYTES', 1024 ** 3))
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> size in bytes, least recent first
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._scan()
+
+    def _scan(self):
+        """Pick up entries left by earlier processes, oldest use first."""
+        found = []
+        for key in os.listdir(self.cache_dir):
+            if key.startswith('.'):
+                continue
+            manifest_path = os.path.join(self.cache_dir, key, MANIFEST)
+            size = self._entry_size(manifest_path)
+            if size is not None:
+                found.append((os.path.getmtime(manifest_path), key, size))
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+
+    def _entry_size(self, manifest_path):
+        try:
+            with open(manifest_path) as f:
+                return json.load(f)['nbytes']
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def fingerprint(self, filepath, dtype=None):
+        """Cache key from path, size, mtime and the requested dtypes."""
+        st = os.stat(filepath)
+        raw = json.dumps([os.path.abspath(filepath), st.st_size, st.st_mtime_ns,
+                          dtype if isinstance(dtype, dict) else str(dtype)],
+                         sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode()).hexdigest()[:32]
+
+    def load(self, filepath, dtype=None, usecols=None):
+        """Return the CSV as a DataFrame backed by memory-mapped columns."""
+        key = self.fingerprint(filepath, dtype)
+        entry_dir = os.path.join(self.cache_dir, key)
+        manifest_path = os.path.join(entry_dir, MANIFEST)
+        # Entries published by other workers sharing the directory count as hits
+        size = self._entry_size(manifest_path)
+        if size is not None:
+            try:
+                os.utime(manifest_path)
+                data = self._read(entry_dir, usecols)
+            except OSError:
+                # Evicted by another process or thread since its size was read
+                pass
+            else:
+                with self._lock:
+                    self.hits += 1
+                    self._entries[key] = size
+                    self._entries.move_to_end(key)
+                return data
+        with self._lock:
+            self.misses += 1
+        size = self._store(pd.read_csv(filepath, dtype=dtype), entry_dir)
+        with self._lock:
+            self._entries[key] = size
+            self._entries.move_to_end(key)
+            self._evict()
+        return self._read(entry_dir, usecols)
+
+    def _store(self, data, entry_dir):
+        """Write one .npy per column, then publish the entry atomically."""
+        tmp_dir = tempfile.mkdtemp(dir=self.cache_dir, prefix='.tmp-')
+        columns = []
+        nbytes = 0
+        for i, (name, series) in enumerate(data.items()):
+            column = {'name': name, 'file': f'{i}.npy', 'dtype': str(series.dtype)}
+            if isinstance(series.dtype, np.dtype) and series.dtype != object:
+                values = series.to_numpy()
+            else:
+                # Strings and nullable dtypes are stored as text plus a null mask
+                mask = series.isna().to_numpy()
+                values = series.astype(str).to_numpy(dtype=str)
+                column['mask'] = f'{i}.mask.npy'
+                np.save(os.path.join(tmp_dir, column['mask']), mask)
+                nbytes += mask.nbytes
+            np.save(os.path.join(tmp_dir, column['file']), values)
+            nbytes += values.nbytes
+            columns.append(column)
+        with open(os.path.join(tmp_dir, MANIFEST), 'w') as f:
+            json.dump({'columns': columns, 'nbytes': nbytes}, f)
+        try:
+            os.rename(tmp_dir, entry_dir)
+        except OSError:
+            # Another worker published the same entry first
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        return nbytes
+
+    def _read(self, entry_dir, usecols=None):
+        with open(os.path.join(entry_dir, MANIFEST)) as f:
+            manifest = json.load(f)
+        columns = {}
+        for column in manifest['columns']:
+            if usecols is not None and column['name'] not in usecols:
+                continue
+            # Plain ndarray view over the mapping, not an np.memmap subclass
+            values = np.asarray(np.load(os.path.join(entry_dir, column['file']), mmap_mode='r'))
+            if 'mask' in column:
+                mask = np.load(os.path.join(entry_dir, column['mask']))
+                values = pd.Series(values.astype(object)).where(~mask).astype(column['dtype'])
+            columns[column['name']] = values
+        return pd.DataFrame(columns, copy=False)
+
+    def _evict(self):
+        """Drop least recently used entries until under the byte budget."""
+        while sum(self._entries.values()) > self.max_bytes and len(self._entries) > 1:
+            key, _ = self._entries.popitem(last=False)
+            shutil.rmtree(os.path.join(self.cache_dir, key), ignore_errors=True)
+            self.evictions += 1
+
+    def stats(self):
+        """Hit/miss counters and current usage."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': sum(self._entries.values()),
+                'max_bytes': self.max_bytes,
+            }
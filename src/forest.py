@@ -0,0 +1,127 @@
+"""Array-backed random forest for vectorized batch inference.
+
+Only NumPy is imported here, so serving processes can use a compiled forest
+without loading scikit-learn.
+"""
+
+import numpy as np
+
+# Upper bound on rows x trees traversed at once, to cap temporary memory
+BLOCK_CELLS = 1 << 20
+
+
+class FlatForest:
+    """A fitted random forest stored as contiguous node arrays.
+
+    Nodes of all trees share one set of arrays; `roots` holds each tree's
+    root index. Leaves point back to themselves, so traversal stops at the
+    first node whose left child is itself.
+    Predictions match RandomForestClassifier.predict/predict_proba.
+    """
+
+    ARRAYS = ('feature', 'threshold', 'left', 'right', 'missing_left', 'value', 'roots', 'classes')
+
+    def __init__(self, feature, threshold, left, right, missing_left, value, roots, classes, max_depth):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.missing_left = missing_left
+        self.value = value
+        self.roots = roots
+        self.classes = classes
+        self.max_depth = int(max_depth)
+
+    @classmethod
+    def from_sklearn(cls, forest):
+        """Compile a fitted RandomForestClassifier."""
+        if getattr(forest, 'n_outputs_', 1) != 1:
+            raise ValueError("Only single-output forests can be flattened")
+        features, thresholds, lefts, rights, missing, values, roots = [], [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            node_ids = np.arange(tree.node_count)
+            is_leaf = tree.children_left == -1
+            roots.append(offset)
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(tree.threshold)
+            lefts.append(np.where(is_leaf, node_ids, tree.children_left) + offset)
+            rights.append(np.where(is_leaf, node_ids, tree.children_right) + offset)
+            missing.append(np.asarray(getattr(tree, 'missing_go_to_left', np.zeros(tree.node_count)), dtype=bool))
+            # Same per-tree normalisation as DecisionTreeClassifier.predict_proba
+            proba = tree.value[:, 0, :]
+            normalizer = proba.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+            values.append(proba / normalizer)
+            offset += tree.node_count
+            max_depth = max(max_depth, tree.max_depth)
+        return cls(
+            feature=np.ascontiguousarray(np.concatenate(features), dtype=np.intp),
+            threshold=np.ascontiguousarray(np.concatenate(thresholds), dtype=np.float64),
+            left=np.ascontiguousarray(np.concatenate(lefts), dtype=np.intp),
+            right=np.ascontiguousarray(np.concatenate(rights), dtype=np.intp),
+            missing_left=np.concatenate(missing),
+            value=np.ascontiguousarray(np.concatenate(values), dtype=np.float64),
+            roots=np.asarray(roots, dtype=np.intp),
+            classes=np.asarray(forest.classes_),
+            max_depth=max_depth,
+        )
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    def _leaves(self, X):
+        """Leaf node index reached by every row in every tree."""
+        n_rows, n_features = X.shape
+        leaves = np.tile(self.roots, n_rows)
+        # State of the (row, tree) cells still walking: their slot in `leaves`,
+        # the offset of their row in the flattened X, and their current node
+        cells = np.arange(len(leaves))
+        row_offsets = np.repeat(np.arange(n_rows) * n_features, self.n_trees)
+        nodes = leaves.copy()
+        X_flat = X.ravel()
+        check_missing = bool(np.isnan(X_flat).any())
+        walking = self.left[nodes] != nodes
+        while True:
+            cells, row_offsets, nodes = cells[walking], row_offsets[walking], nodes[walking]
+            if not len(nodes):
+                return leaves.reshape(n_rows, self.n_trees)
+            x = X_flat[row_offsets + self.feature[nodes]]
+            go_left = x <= self.threshold[nodes]
+            if check_missing:
+                go_left |= np.isnan(x) & self.missing_left[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+            leaves[cells] = nodes
+            walking = self.left[nodes] != nodes
+
+    def predict_proba(self, X):
+        """Class probabilities averaged over trees."""
+        # Trees split on float32 features, as in scikit-learn
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        proba = np.zeros((len(X), len(self.classes)), dtype=np.float64)
+        block = max(BLOCK_CELLS // max(self.n_trees, 1), 1)
+        for start in range(0, len(X), block):
+            leaves = self._leaves(X[start:start + block])
+            # Accumulate tree by tree, in the same order scikit-learn sums them
+            for t in range(self.n_trees):
+                proba[start:start + block] += self.value[leaves[:, t]]
+        proba /= self.n_trees
+        return proba
+
+    def predict(self, X):
+        """Predicted class labels."""
+        return self.classes.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
+
+    def to_arrays(self):
+        """Plain dict of arrays, e.g. for np.savez."""
+        arrays = {name: getattr(self, name) for name in self.ARRAYS}
+        arrays['max_depth'] = np.asarray(self.max_depth)
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """Inverse of to_arrays."""
+        return cls(max_depth=int(arrays['max_depth']), **{name: arrays[name] for name in cls.ARRAYS})
@@ -0,0 +1,296 @@
+"""Background job queue for long-running work such as model training.
+
+Each job runs in its own worker process, at most `max_workers` at a time, so
+a fit never holds a request thread or the server's GIL and a running job can
+be cancelled by terminating its process. Queued jobs start highest priority
+first, then in submission order.
+"""
+
+import heapq
+import itertools
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+
+def _timestamp(seconds):
+    # Naive UTC, as the API has always reported it
+    return datetime.fromtimestamp(seconds, timezone.utc).replace(tzinfo=None).isoformat() if seconds else None
+
+
+def process_context():
+    """Multiprocessing context for worker processes started by a server.
+
+    Forking a process that runs request and dispatcher threads can copy a
+    lock another thread holds into the child, which then deadlocks on it.
+    The fork server (spawn where there is none) starts workers from a clean
+    single-threaded process instead, so job functions must be picklable.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+def _run_in_worker(conn, fn, args, kwargs):
+    """Worker process entry point: run fn, streaming progress back over conn."""
+    def progress(fraction, message=None):
+        conn.send(('progress', float(fraction), message))
+
+    try:
+        conn.send(('result', fn(*args, progress=progress, **kwargs)))
+    except BaseException as e:
+        conn.send(('error', f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+class Job:
+    """State of one submitted job, as reported by GET /jobs/<id>."""
+
+    def __init__(self, fn, args, kwargs, priority=0, name=None, on_success=None):
+        self.id = uuid.uuid4().hex
+        self.name = name or getattr(fn, '__name__', 'job')
+        self.priority = priority
+        self.status = QUEUED
+        self.progress = 0.0
+        self.message = None
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.on_success = on_success
+        self.process = None
+        # Set while on_success runs; the job can no longer be cancelled
+        self.finalizing = False
+
+    def to_dict(self):
+        now = time.time()
+        queued_until = self.started_at or self.finished_at or now
+        data = {
+            "job_id": self.id,
+            "name": self.name,
+            "status": self.status,
+            "priority": self.priority,
+            "progress": self.progress,
+            "message": self.message,
+            "submitted_at": _timestamp(self.submitted_at),
+            "started_at": _timestamp(self.started_at),
+            "finished_at": _timestamp(self.finished_at),
+            "queued_seconds": queued_until - self.submitted_at,
+            "run_seconds": (self.finished_at or now) - self.started_at if self.started_at else None
+        }
+        if self.status == SUCCEEDED:
+            data["result"] = self.result
+        if self.status == FAILED:
+            data["error"] = self.error
+        return data
+
+
+class JobQueue:
+    """Priority queue of jobs run in a bounded set of worker processes.
+
+    `fn` must be picklable (a module-level function) and accept a `progress`
+    keyword: a callable taking a fraction in [0, 1] and an optional message.
+    Its return value is sent back to this process, where `on_success`, if
+    given, turns it into the job's result; that is where side effects such as
+    publishing a trained model belong. `max_workers` and `max_queued` default
+    to the JOB_MAX_WORKERS and JOB_MAX_QUEUED environment variables.
+    """
+
+    def __init__(self, max_workers=None, max_queued=None, max_history=None):
+        self.max_workers = int(max_workers or os.getenv('JOB_MAX_WORKERS', os.cpu_count() or 1))
+        self.max_queued = int(max_queued or os.getenv('JOB_MAX_QUEUED', 100))
+        self.max_history = int(max_history or os.getenv('JOB_MAX_HISTORY', 1000))
+        self._jobs = OrderedDict()  # job id -> Job, oldest first
+        self._heap = []  # (-priority, seq, job)
+        self._seq = itertools.count()
+        self._running = 0
+        self._queued = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._dispatcher = None
+
+    def submit(self, fn, *args, priority=0, name=None, on_success=None, **kwargs):
+        """Queue fn(*args, **kwargs); raises queue.Full when max_queued jobs are waiting."""
+        job = Job(fn, args, kwargs, priority=priority, name=name, on_success=on_success)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Job queue is shut down")
+            if self._queued >= self.max_queued:
+                raise queue.Full(f"{self._queued} jobs already queued")
+            self._jobs[job.id] = job
+            heapq.heappush(self._heap, (-priority, next(self._seq), job))
+            self._queued += 1
+            self._forget_finished()
+            if self._dispatcher is None:
+                self._dispatcher = threading.Thread(target=self._dispatch, daemon=True)
+                self._dispatcher.start()
+            self._cond.notify_all()
+        return job
+
+    def get(self, job_id):
+        with self._cond:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """Cancel a queued or running job; False if it has finished or is finishing."""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None or job.status in FINISHED or job.finalizing:
+                return False
+            if job.status == QUEUED:
+                # Left in the heap; the dispatcher skips it
+                self._queued -= 1
+            elif job.process is not None:
+                job.process.terminate()
+            job.status = CANCELLED
+            job.finished_at = time.time()
+            self._cond.notify_all()
+            return True
+
+    def wait(self, job_id, timeout=None):
+        """Block until a job finishes; returns the job."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            job = self._jobs[job_id]
+            while job.status not in FINISHED:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError(f"Job {job_id} still {job.status}")
+                self._cond.wait(remaining)
+            return job
+
+    def stats(self):
+        with self._cond:
+            counts = {status: 0 for status in (QUEUED, RUNNING) + FINISHED}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+            return {"max_workers": self.max_workers, "max_queued": self.max_queued, **counts}
+
+    def shutdown(self):
+        """Cancel everything still queued or running."""
+        with self._cond:
+            self._closed = True
+            job_ids = [job.id for job in self._jobs.values() if job.status not in FINISHED]
+            self._cond.notify_all()
+        for job_id in job_ids:
+            self.cancel(job_id)
+
+    def _forget_finished(self):
+        # Drop the oldest finished jobs once history exceeds max_history
+        excess = len(self._jobs) - self.max_history
+        for job_id in [job.id for job in self._jobs.values() if job.status in FINISHED][:max(excess, 0)]:
+            del self._jobs[job_id]
+
+    def _dispatch(self):
+        while True:
+            with self._cond:
+                while not self._closed and (not self._heap or self._running >= self.max_workers):
+                    self._cond.wait()
+                if self._closed:
+                    return
+                job = heapq.heappop(self._heap)[2]
+                if job.status != QUEUED:
+                    continue
+                self._queued -= 1
+                self._running += 1
+                job.status = RUNNING
+                job.started_at = time.time()
+            # Started outside the lock: under forkserver/spawn this pickles the
+            # arguments and waits for the launch
+            context = process_context()
+            parent_conn, child_conn = context.Pipe(duplex=False)
+            process = context.Process(
+                target=_run_in_worker, args=(child_conn, job.fn, job.args, job.kwargs), daemon=True
+            )
+            try:
+                process.start()
+            except Exception as e:
+                # e.g. unpicklable arguments; the job fails, the dispatcher carries on
+                parent_conn.close()
+                child_conn.close()
+                self._finish_unstarted(job, f"Failed to start worker: {type(e).__name__}: {e}")
+                continue
+            # Only the child may hold the write end, or recv() never sees EOF
+            child_conn.close()
+            with self._cond:
+                job.process = process
+                if job.status == CANCELLED:
+                    # Cancelled while starting; cancel() had no process to stop
+                    process.terminate()
+            threading.Thread(target=self._monitor, args=(job, parent_conn), daemon=True).start()
+
+    def _finish_unstarted(self, job, error):
+        with self._cond:
+            if job.status != CANCELLED:
+                self._finish(job, FAILED, error=error)
+            self._running -= 1
+            job.fn = job.args = job.kwargs = job.on_success = None
+            self._cond.notify_all()
+
+    def _monitor(self, job, conn):
+        outcome = None
+        try:
+            while True:
+                try:
+                    kind, *payload = conn.recv()
+                except (EOFError, OSError):
+                    break
+                if kind == 'progress':
+                    job.progress, job.message = payload
+                else:
+                    outcome = (kind, payload[0])
+        finally:
+            conn.close()
+            job.process.join()
+
+        with self._cond:
+            cancelled = job.status == CANCELLED
+            job.finalizing = not cancelled and outcome is not None and outcome[0] == 'result'
+        try:
+            if cancelled:
+                return
+            if outcome is None:
+                self._finish(job, FAILED, error=f"Worker exited with code {job.process.exitcode}")
+            elif outcome[0] == 'error':
+                self._finish(job, FAILED, error=outcome[1])
+            else:
+                try:
+                    result = job.on_success(outcome[1]) if job.on_success else outcome[1]
+                except Exception as e:
+                    self._finish(job, FAILED, error=f"{type(e).__name__}: {e}")
+                else:
+                    self._finish(job, SUCCEEDED, result=result)
+        finally:
+            with self._cond:
+                self._running -= 1
+                job.process = None
+                job.fn = job.args = job.kwargs = job.on_success = None
+                self._cond.notify_all()
+
+    def _finish(self, job, status, result=None, error=None):
+        with self._cond:
+            job.status = status
+            job.result = result
+            job.error = error
+            job.finalizing = False
+            if status == SUCCEEDED:
+                job.progress = 1.0
+            job.finished_at = time.time()
+            self._cond.notify_all()
@@ -0,0 +1,210 @@
+"""Bounded in-memory cache of loaded models.
+
+Entries are evicted least recently used first once either the entry count or
+the estimated memory footprint exceeds its limit. Concurrent misses for the
+same key share a single load.
+"""
+
+import os
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import numpy as np
+
+
+def estimate_nbytes(obj, _seen=None):
+    """Rough in-memory size of a model: NumPy buffers plus Python objects."""
+    seen = set() if _seen is None else _seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        children = list(obj.keys()) + list(obj.values())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        children = obj
+    elif hasattr(obj, '__dict__'):
+        children = [vars(obj)]
+    elif type(obj).__module__ != 'builtins':
+        # Extension types such as sklearn's Tree expose their arrays via __getstate__
+        state = obj.__getstate__() if hasattr(obj, '__getstate__') else None
+        children = [state] if isinstance(state, dict) else []
+    else:
+        children = []
+    return size + sum(estimate_nbytes(child, seen) for child in children)
+
+
+class SingleFlight:
+    """Collapses concurrent calls for the same key into one execution.
+
+    The first caller runs the function; callers arriving while it is in
+    flight wait for and share its result or exception.
+    """
+
+    def __init__(self):
+        self.coalesced = 0
+        self._lock = threading.Lock()
+        self._calls = {}  # key -> Future of the in-flight call
+
+    def do(self, key, fn):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+            else:
+                self.coalesced += 1
+        if not leader:
+            return future.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    def in_flight(self, key):
+        """Whether a call for key is running."""
+        with self._lock:
+            return key in self._calls
+
+
+class ModelCache:
+    """Thread-safe LRU cache keyed by model ID, bounded by count and bytes.
+
+    `on_evict`, if given, is called outside the lock with the key of every
+    entry evicted or cleared, and of every invalidated key (cached or not), so
+    per-model resources can be released along with the model. Replacing an
+    entry with put() does not call it.
+    """
+
+    def __init__(self, max_entries=None, max_bytes=None, on_evict=None):
+        self.max_entries = int(max_entries if max_entries is not None
+                               else os.getenv('MODEL_CACHE_MAX_ENTRIES', 8))
+        self.max_bytes = int(max_bytes if max_bytes is not None
+                             else os.getenv('MODEL_CACHE_MAX_BYTES', 512 * 1024 ** 2))
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (value, nbytes), least recent first
+        self._bytes = 0
+        # Bumped on every put/invalidate so loads that started earlier never
+        # overwrite a newer entry; only kept for keys with a load in flight
+        self._generations = {}
+        self._flights = SingleFlight()
+        self.on_evict = on_evict
+
+    def get(self, key):
+        """Cached value for key, or None."""
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key][0]
+            self.misses += 1
+            return None
+
+    def get_or_load(self, key, loader):
+        """Cached value, or the result of loader() run once for all concurrent callers.
+
+        A None result is returned but not cached.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+        try:
+            return self._flights.do(key, lambda: self._load(key, loader))
+        finally:
+            with self._lock:
+                if not self._flights.in_flight(key):
+                    self._generations.pop(key, None)
+
+    def _load(self, key, loader):
+        with self._lock:
+            # A flight that finished just before this one started may have filled it
+            if key in self._entries:
+                return self._entries[key][0]
+            generation = self._generations.get(key, 0)
+        value = loader()
+        if value is not None:
+            self.put(key, value, generation=generation)
+        return value
+
+    def put(self, key, value, nbytes=None, generation=None):
+        """Insert or replace an entry, evicting others to stay within bounds.
+
+        With `generation`, the put is skipped if the key was put or
+        invalidated since that generation was read.
+        """
+        nbytes = estimate_nbytes(value) if nbytes is None else nbytes
+        evicted = []
+        with self._lock:
+            if generation is not None and self._generations.get(key, 0) != generation:
+                return
+            self._bump_generation(key)
+            self._discard(key)
+            self._entries[key] = (value, nbytes)
+            self._bytes += nbytes
+            while len(self._entries) > 1 and (len(self._entries) > self.max_entries
+                                              or self._bytes > self.max_bytes):
+                oldest = next(iter(self._entries))
+                self._discard(oldest)
+                self.evictions += 1
+                evicted.append(oldest)
+        self._notify_evicted(evicted)
+
+    def invalidate(self, key):
+        """Drop key if cached, and discard any load of it still in flight."""
+        with self._lock:
+            self._bump_generation(key)
+            self._discard(key)
+        self._notify_evicted([key])
+
+    def clear(self):
+        with self._lock:
+            evicted = list(self._entries)
+            self._entries.clear()
+            self._bytes = 0
+        self._notify_evicted(evicted)
+
+    def _bump_generation(self, key):
+        # With no load in flight there is nothing to fence off, so the
+        # counter is dropped instead; a load starting later reads it afresh
+        if self._flights.in_flight(key):
+            self._generations[key] = self._generations.get(key, 0) + 1
+        else:
+            self._generations.pop(key, None)
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def _notify_evicted(self, keys):
+        if self.on_evict is not None:
+            for key in keys:
+                self.on_evict(key)
+
+    def stats(self):
+        """Hit/miss/eviction counters and current usage."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'coalesced_loads': self._flights.coalesced,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+            }
@@ -0,0 +1,144 @@
+from flask import Flask, jsonify, request
+import os
+import threading
+import time
+from src.standalone import StandalonePredictor
+from src.batching import MicroBatcher
+from src.model_cache import ModelCache
+from src.cloud.s3_client import S3Client
+
+# Predict-only server: loads the NumPy predictor artifacts written at
+# POST /models time and never imports pandas or scikit-learn.
+
+app = Flask(__name__)
+
+# Initialize S3 client lazily
+s3 = None
+
+# Loaded predictors (bounded LRU) and their micro-batchers by model ID; a
+# batcher is closed when its predictor leaves the cache
+predictors = ModelCache(on_evict=lambda model_id: close_batcher(model_id))
+batchers = {}
+batchers_lock = threading.Lock()
+
+# A cached predictor is checked against the ETag of predictor.npz once this
+# many seconds have passed since it was loaded or last checked, so a retrained
+# model is picked up within that window
+PREDICTOR_REVALIDATE_SECONDS = float(os.getenv('PREDICTOR_REVALIDATE_SECONDS', 10))
+
+
+class CachedPredictor:
+    #A loaded predictor with the ETag of the artifact it was parsed from
+
+    def __init__(self, predictor, etag):
+        self.predictor = predictor
+        self.etag = etag
+        self.checked_at = time.monotonic()
+
+
+def get_s3_client():
+    #Get or initialize the S3 client
+    global s3
+    try:
+        if s3 is None:
+            s3 = S3Client()
+        return s3
+    except Exception as e:
+        raise Exception(f"Failed to initialize S3 client: {str(e)}")
+
+
+def get_predictor(model_id):
+    #Load a model's standalone predictor, or None if it has none
+    cached = predictors.get_or_load(model_id, lambda: fetch_predictor(model_id))
+    if cached is None:
+        return None
+    if time.monotonic() - cached.checked_at >= PREDICTOR_REVALIDATE_SECONDS:
+        # Concurrent requests keep using this entry while one of them checks
+        cached.checked_at = time.monotonic()
+        if get_s3_client().predictor_etag(model_id) != cached.etag:
+            predictors.invalidate(model_id)
+            return get_predictor(model_id)
+    return cached.predictor
+
+
+def fetch_predictor(model_id):
+    #Download and parse a predictor artifact; concurrent misses share one call
+    predictor_bytes, etag = get_s3_client().download_predictor(model_id, return_etag=True)
+    if predictor_bytes is None:
+        return None
+    return CachedPredictor(StandalonePredictor.from_bytes(predictor_bytes), etag)
+
+
+def get_batcher(model_id):
+    #Micro-batcher that scores concurrent requests for model_id together
+    with batchers_lock:
+        if model_id not in batchers:
+            batchers[model_id] = MicroBatcher(lambda X: get_predictor(model_id).predict(X))
+        return batchers[model_id]
+
+
+def close_batcher(model_id):
+    #Stop the micro-batcher of an evicted or invalidated predictor
+    with batchers_lock:
+        batcher = batchers.pop(model_id, None)
+    if batcher:
+        batcher.close()
+
+
+@app.route('/health', methods=['GET'])
+def health_check():
+    #Health check endpoint
+    return jsonify({
+        "status": "healthy",
+        "message": "Predict-only ML API is running",
+        "model_cache": predictors.stats()
+    }), 200
+
+
+@app.route('/models/<model_id>/predict', methods=['POST'])
+def predict(model_id):
+    #Predict caller-supplied rows with a model's standalone predictor
+    try:
+        data = request.json
+        if not data or 'instances' not in data:
+            return jsonify({"error": "No instances provided"}), 400
+
+        predictor = get_predictor(model_id)
+        if predictor is None:
+            return jsonify({
+                "error": "Predictor artifact not found in S3",
+                "model_id": model_id
+            }), 404
+
+        X = predictor.to_matrix(data['instances'])
+        predictions = get_batcher(model_id).predict(X).tolist()
+
+        return jsonify({
+            "model_id": model_id,
+            "predictions": predictions,
+            "prediction_count": len(predictions)
+        }), 200
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({
+            "error": "Prediction failed",
+            "details": str(e)
+        }), 500
+
+
+@app.errorhandler(404)
+def not_found(error):
+    #Handle 404 errors
+    return jsonify({
+        "error": "Endpoint not found",
+        "available_endpoints": [
+            "GET /health",
+            "POST /models/<model_id>/predict"
+        ]
+    }), 404
+
+
+if __name__ == '__main__':
+    app.run(host='0.0.0.0', port=int(os.getenv('PORT', 5002)))
@@ -0,0 +1,84 @@
+"""Standalone predictor artifact that loads with NumPy only.
+
+Holds the fitted scaler parameters and the forest as plain arrays in one
+`.npz` file, so predict-only processes never import pandas or scikit-learn.
+"""
+
+import io
+
+import numpy as np
+
+from src.forest import FlatForest
+
+FORMAT_VERSION = 1
+
+
+class StandalonePredictor:
+    """Standard scaling followed by a FlatForest."""
+
+    def __init__(self, feature_names, mean, scale, forest):
+        self.feature_names = list(feature_names)
+        self.mean = mean
+        self.scale = scale
+        self.forest = forest
+
+    @classmethod
+    def from_processor(cls, processor):
+        """Export a trained DataProcessor (fitted scaler and random forest)."""
+        n_features = len(processor.feature_names)
+        scaler = processor.scaler
+        mean = scaler.mean_ if scaler.mean_ is not None else np.zeros(n_features)
+        scale = scaler.scale_ if scaler.scale_ is not None else np.ones(n_features)
+        return cls(processor.feature_names, mean, scale, FlatForest.from_sklearn(processor.model))
+
+    def to_bytes(self):
+        """Serialize to an uncompressed .npz."""
+        buffer = io.BytesIO()
+        np.savez(
+            buffer,
+            format_version=np.asarray(FORMAT_VERSION),
+            feature_names=np.asarray(self.feature_names, dtype=str),
+            mean=self.mean,
+            scale=self.scale,
+            **{f'forest_{name}': array for name, array in self.forest.to_arrays().items()}
+        )
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Load an artifact written by to_bytes."""
+        with np.load(io.BytesIO(data), allow_pickle=False) as arrays:
+            if int(arrays['format_version']) != FORMAT_VERSION:
+                raise ValueError(f"Unsupported predictor format version: {int(arrays['format_version'])}")
+            forest = FlatForest.from_arrays(
+                {name[len('forest_'):]: arrays[name] for name in arrays.files if name.startswith('forest_')}
+            )
+            return cls(arrays['feature_names'].tolist(), arrays['mean'], arrays['scale'], forest)
+
+    def to_matrix(self, instances):
+        """Feature matrix from rows given as lists (training order) or dicts."""
+        return rows_to_matrix(instances, self.feature_names)
+
+    def predict(self, X):
+        """Scale like StandardScaler.transform, then predict."""
+        X = np.array(X, dtype=np.float64)
+        X -= self.mean
+        X /= self.scale
+        return self.forest.predict(X)
+
+
+def rows_to_matrix(instances, feature_names):
+    """Float matrix in `feature_names` order from JSON rows (lists or dicts)."""
+    if not instances:
+        raise ValueError("No instances provided")
+    if isinstance(instances[0], dict):
+        try:
+            instances = [[row[name] for name in feature_names] for row in instances]
+        except KeyError as e:
+            raise ValueError(f"Missing feature: {e.args[0]}")
+        except TypeError:
+            raise ValueError("Instances must be all dicts or all lists")
+    X = np.array(instances, dtype=np.float64).reshape(len(instances), -1)
+    if X.shape[1] != len(feature_names):
+        raise ValueError(f"Expected {len(feature_names)} features, got {X.shape[1]}")
+    return X
@@ -0,0 +1,196 @@
+"""Parallel hyperparameter sweeps for DataProcessor models.
+
+Candidate fits run in a process pool. The training and validation arrays are
+written once to memory-mapped .npy files that every worker maps read-only,
+so they are never pickled per task.
+"""
+
+import math
+import multiprocessing
+import os
+import pickle
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import ParameterGrid
+
+from src.jobs import process_context
+
+ARRAY_NAMES = ('X_train', 'y_train', 'X_val', 'y_val')
+
+# Worker-side read-only views of the shared arrays, set by _attach
+_shared = {}
+
+
+def _attach(paths, feature_names=None):
+    """Pool initializer: map the shared arrays once per worker process."""
+    for name, path in paths.items():
+        _shared[name] = np.load(path, mmap_mode='r')
+    _shared['feature_names'] = feature_names
+
+
+def _features(X):
+    """X as a DataFrame when the caller's features had column names.
+
+    Models are then fitted with feature names, like DataProcessor.train_model,
+    and predicting on DataFrames later raises no feature-name warning.
+    """
+    names = _shared['feature_names']
+    return X if names is None else pd.DataFrame(X, columns=names, copy=False)
+
+
+def _fit_candidate(base_params, params, n_samples, seed, model_path=None):
+    """Fit one candidate on (a subsample of) the shared training data.
+
+    A fit on the full training set is pickled to `model_path` so the winner
+    can be kept without fitting it again.
+    """
+    X_train, y_train = _shared['X_train'], _shared['y_train']
+    if n_samples < len(X_train):
+        rows = np.sort(np.random.default_rng(seed).choice(len(X_train), n_samples, replace=False))
+        X_train, y_train = X_train[rows], y_train[rows]
+        model_path = None
+
+    start = time.perf_counter()
+    model = RandomForestClassifier(**{**base_params, **params})
+    model.fit(_features(X_train), y_train)
+    fit_time = time.perf_counter() - start
+    if model_path is not None:
+        with open(model_path, 'wb') as f:
+            pickle.dump(model, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return {
+        'params': params,
+        'score': float(model.score(_features(_shared['X_val']), _shared['y_val'])),
+        'fit_time': fit_time,
+        'n_samples': int(len(X_train)),
+        'status': 'completed',
+        'model_path': model_path,
+    }
+
+
+def _refit(base_params, params):
+    """Fit the winning candidate on the full shared training set."""
+    model = RandomForestClassifier(**{**base_params, **params})
+    model.fit(_features(_shared['X_train']), _shared['y_train'])
+    return model
+
+
+def _run_round(pool, base_params, candidates, n_samples, deadline, model_dir, round_index):
+    """Fit all candidates in parallel; drop the ones the deadline cuts off."""
+    pending = [(params, pool.apply_async(_fit_candidate, (
+                    base_params, params, n_samples, i,
+                    os.path.join(model_dir, f'{round_index}-{i}.pkl'))))
+               for i, params in enumerate(candidates)]
+    results = []
+    for params, async_result in pending:
+        timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+        try:
+            results.append(async_result.get(timeout))
+        except multiprocessing.TimeoutError:
+            results.append({'params': params, 'score': None, 'fit_time': None,
+                            'n_samples': n_samples, 'status': 'timed_out', 'model_path': None})
+    return results
+
+
+def _best_model(pool, base_params, best, deadline):
+    """The winner fitted on the full training set, refitted within the deadline if need be."""
+    if best['model_path'] is not None:
+        with open(best['model_path'], 'rb') as f:
+            return pickle.load(f)
+    timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+    try:
+        return pool.apply_async(_refit, (base_params, best['params'])).get(timeout)
+    except multiprocessing.TimeoutError:
+        raise TimeoutError("The time budget ran out before the best candidate "
+                           "was refitted on the full training set") from None
+
+
+def run_sweep(X_train, y_train, X_val, y_val, param_grid, base_params=None,
+              strategy='grid', n_jobs=None, time_budget=None, factor=3):
+    """Evaluate a parameter grid; return the leaderboard, best first, and the best model.
+
+    `strategy='grid'` fits every candidate on the full training set.
+    `strategy='halving'` runs successive halving: every candidate starts on a
+    small subsample and only the best 1/`factor` move on to a `factor` times
+    larger sample. Fits still running when `time_budget` seconds have passed
+    are abandoned and reported as timed out.
+
+    The best model is the winner's own fit when it saw the full training set,
+    and otherwise a refit that must also finish within `time_budget`
+    (TimeoutError if it does not). It is None if no candidate completed.
+    """
+    if strategy not in ('grid', 'halving'):
+        raise ValueError(f"Unknown sweep strategy: {strategy}")
+    if n_jobs is not None and (not isinstance(n_jobs, (int, np.integer)) or isinstance(n_jobs, bool)
+                               or n_jobs < 1):
+        raise ValueError("n_jobs must be a positive integer")
+    if time_budget is not None and (not isinstance(time_budget, (int, float, np.number))
+                                    or isinstance(time_budget, bool) or not time_budget > 0):
+        raise ValueError("time_budget must be a positive number of seconds")
+    try:
+        candidates = list(ParameterGrid(param_grid))
+    except TypeError as e:
+        # e.g. a bare value instead of a list of values; checked before any pool starts
+        raise ValueError(str(e)) from e
+    if not candidates:
+        raise ValueError("Parameter grid is empty")
+    base_params = dict(base_params or {})
+    feature_names = list(X_train.columns) if isinstance(X_train, pd.DataFrame) else None
+    n_jobs = n_jobs if n_jobs is not None else os.cpu_count() or 1
+    deadline = None if time_budget is None else time.monotonic() + time_budget
+
+    n_total = len(X_train)
+    if strategy == 'halving':
+        n_rounds = math.ceil(math.log(len(candidates), factor)) if len(candidates) > 1 else 0
+        n_samples = max(n_total // factor ** n_rounds, 1)
+    else:
+        n_samples = n_total
+
+    with tempfile.TemporaryDirectory(prefix='sweep-') as tmp_dir:
+        paths = {}
+        for name, array in zip(ARRAY_NAMES, (X_train, y_train, X_val, y_val)):
+            paths[name] = os.path.join(tmp_dir, f'{name}.npy')
+            np.save(paths[name], np.ascontiguousarray(array))
+
+        # Not forked: the API calls this from a request thread
+        pool = process_context().Pool(min(n_jobs, len(candidates)), initializer=_attach,
+                                      initargs=(paths, feature_names))
+        try:
+            finished = []
+            round_index = 0
+            while True:
+                results = _run_round(pool, base_params, candidates, n_samples, deadline,
+                                     tmp_dir, round_index)
+                completed = sorted((r for r in results if r['status'] == 'completed'),
+                                   key=lambda r: r['score'], reverse=True)
+                keep = math.ceil(len(candidates) / factor)
+                if strategy == 'grid' or len(completed) <= 1 or n_samples >= n_total \
+                        or (deadline is not None and time.monotonic() >= deadline):
+                    finished.extend(results)
+                    break
+                # Candidates eliminated this round keep their last result
+                finished.extend(completed[keep:])
+                finished.extend(r for r in results if r['status'] != 'completed')
+                candidates = [r['params'] for r in completed[:keep]]
+                n_samples = min(n_samples * factor, n_total)
+                round_index += 1
+
+            # Rank by how far a candidate got, then by validation score
+            finished.sort(key=lambda r: (r['status'] == 'completed', r['n_samples'],
+                                         r['score'] if r['score'] is not None else -1), reverse=True)
+            best_model = None
+            if finished[0]['status'] == 'completed':
+                best_model = _best_model(pool, base_params, finished[0], deadline)
+        finally:
+            # terminate() also stops fits still running past the budget
+            pool.terminate()
+            pool.join()
+
+    for rank, result in enumerate(finished, start=1):
+        result.pop('model_path')
+        result['rank'] = rank
+    return finished, best_model
+
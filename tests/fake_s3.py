@@ -0,0 +1,124 @@
+"""In-memory stand-in for the boto3 S3 client calls used by src.cloud."""
+
+import hashlib
+import io
+import re
+import threading
+from botocore.exceptions import ClientError
+
+
+def _error(code, status, operation):
+    return ClientError({'Error': {'Code': code},
+                        'ResponseMetadata': {'HTTPStatusCode': status}}, operation)
+
+
+class FakeS3:
+    #Objects, ETags, conditional and ranged GETs, and multipart uploads;
+    #`calls` records only requests that returned an object or succeeded
+
+    def __init__(self):
+        self.objects = {}
+        self.uploads = {}
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def _record(self, name, **kwargs):
+        with self._lock:
+            self.calls.append((name, kwargs))
+
+    def count(self, name, prefix=''):
+        return sum(1 for call, kwargs in self.calls
+                   if call == name and kwargs.get('Key', '').startswith(prefix))
+
+    def head_bucket(self, Bucket):
+        return {}
+
+    def etag(self, key):
+        return '"%s"' % hashlib.md5(self.objects[key]).hexdigest()
+
+    def put(self, key, body):
+        self.objects[key] = bytes(body)
+
+    def put_object(self, Bucket, Key, Body, **kwargs):
+        self._record('put_object', Key=Key)
+        self.put(Key, Body if isinstance(Body, (bytes, bytearray)) else Body.encode())
+        return {'ETag': self.etag(Key)}
+
+    def _check(self, Key, IfNoneMatch, IfMatch, operation):
+        if Key not in self.objects:
+            raise _error('NoSuchKey' if operation == 'GetObject' else '404', 404, operation)
+        if IfNoneMatch is not None and IfNoneMatch == self.etag(Key):
+            raise _error('304', 304, operation)
+        if IfMatch is not None and IfMatch != self.etag(Key):
+            raise _error('PreconditionFailed', 412, operation)
+
+    def head_object(self, Bucket, Key, IfNoneMatch=None, IfMatch=None):
+        self._check(Key, IfNoneMatch, IfMatch, 'HeadObject')
+        self._record('head_object', Key=Key)
+        return {'ContentLength': len(self.objects[Key]), 'ETag': self.etag(Key)}
+
+    def get_object(self, Bucket, Key, Range=None, IfNoneMatch=None, IfMatch=None):
+        self._check(Key, IfNoneMatch, IfMatch, 'GetObject')
+        self._record('get_object', Key=Key, Range=Range)
+        body = self.objects[Key]
+        response = {'ETag': self.etag(Key), 'ContentLength': len(body)}
+        if Range:
+            start, stop = map(int, re.match(r'bytes=(\d+)-(\d+)', Range).groups())
+            stop = min(stop, len(body) - 1)
+            response['ContentRange'] = f'bytes {start}-{stop}/{len(body)}'
+            body = body[start:stop + 1]
+            response['ContentLength'] = len(body)
+        response['Body'] = io.BytesIO(body)
+        return response
+
+    def delete_object(self, Bucket, Key):
+        self._record('delete_object', Key=Key)
+        self.objects.pop(Key, None)
+        return {}
+
+    def delete_objects(self, Bucket, Delete):
+        self._record('delete_objects', Keys=[obj['Key'] for obj in Delete['Objects']])
+        for obj in Delete['Objects']:
+            self.objects.pop(obj['Key'], None)
+        return {'Deleted': Delete['Objects']}
+
+    def list_objects_v2(self, Bucket, Prefix='', Delimiter=None, MaxKeys=1000, ContinuationToken=None):
+        self._record('list_objects_v2', Prefix=Prefix)
+        keys = sorted(key for key in self.objects if key.startswith(Prefix))
+        response = {'KeyCount': 0}
+        if Delimiter:
+            prefixes = sorted({Prefix + key[len(Prefix):].split(Delimiter)[0] + Delimiter
+                               for key in keys if Delimiter in key[len(Prefix):]})
+            if prefixes:
+                response['CommonPrefixes'] = [{'Prefix': prefix} for prefix in prefixes]
+            keys = [key for key in keys if Delimiter not in key[len(Prefix):]]
+        start = int(ContinuationToken or 0)
+        page = keys[start:start + MaxKeys]
+        if page:
+            response['Contents'] = [{'Key': key, 'Size': len(self.objects[key])} for key in page]
+            response['KeyCount'] = len(page)
+        if start + MaxKeys < len(keys):
+            response['IsTruncated'] = True
+            response['NextContinuationToken'] = str(start + MaxKeys)
+        return response
+
+    def create_multipart_upload(self, Bucket, Key):
+        self._record('create_multipart_upload', Key=Key)
+        upload_id = f'upload-{len(self.uploads)}'
+        self.uploads[upload_id] = {}
+        return {'UploadId': upload_id}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        self._record('upload_part', Key=Key, PartNumber=PartNumber)
+        with self._lock:
+            self.uploads[UploadId][PartNumber] = bytes(Body)
+        return {'ETag': '"%s"' % hashlib.md5(Body).hexdigest()}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        self._record('complete_multipart_upload', Key=Key)
+        parts = self.uploads.pop(UploadId)
+        self.put(Key, b''.join(parts[part['PartNumber']] for part in MultipartUpload['Parts']))
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self._record('abort_multipart_upload', Key=Key)
+        self.uploads.pop(UploadId, None)
@@ -10,7 +10,7 @@ import os
 # Add the src directory to the path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from src.api import app, model_trained, processor
+from src.api import app
 
 @pytest.fixture
 def client():
@@ -24,9 +24,7 @@ class TestAPIEndpoints:
     def setup_method(self):
         """Reset API state before each test"""
         import src.api
-        src.api.model_trained = False
-        src.api.last_training_data = None
-        src.api.processor = src.api.DataProcessor()
+        src.api.snapshot = src.api.initial_snapshot()
     
 
     def test_health_check_get(self, client):
@@ -54,6 +52,32 @@ class TestAPIEndpoints:
         assert 0 <= data['train_accuracy'] <= 1
         assert 0 <= data['test_accuracy'] <= 1
     
+    def test_train_model_async(self, client):
+        """Test POST /train with async queues a job that publishes the model"""
+        import src.api
+        response = client.post('/train',
+                             json={'data_path': 'data/iris_simple.csv', 'async': True, 'priority': 1},
+                             content_type='application/json')
+        
+        assert response.status_code == 202
+        data = json.loads(response.data)
+        assert response.headers['Location'] == data['status_url'] == f"/jobs/{data['job_id']}"
+        
+        src.api.jobs.wait(data['job_id'], timeout=60)
+        job = json.loads(client.get(data['status_url']).data)
+        assert job['status'] == 'succeeded'
+        assert job['progress'] == 1.0
+        assert job['result']['training_samples'] > 0
+        assert client.get('/predict').status_code == 200
+        
+        # Finished jobs cannot be cancelled
+        assert client.delete(data['status_url']).status_code == 409
+    
+    def test_unknown_job(self, client):
+        """Test GET and DELETE /jobs/<job_id> for a job that does not exist"""
+        assert client.get('/jobs/unknown').status_code == 404
+        assert client.delete('/jobs/unknown').status_code == 404
+    
     def test_train_model_post_missing_file(self, client):
         """Test POST /train with missing data file"""
         response = client.post('/train',
@@ -117,6 +141,115 @@ class TestAPIEndpoints:
         data = json.loads(response.data)
         assert 'error' in data
     
+    def test_sweep_model_post(self, client):
+        """Test POST /model/sweep keeps the best candidate as the active model"""
+        response = client.post('/model/sweep',
+                             json={
+                                 'param_grid': {'n_estimators': [5, 10], 'max_depth': [2, None]},
+                                 'n_jobs': 2
+                             },
+                             content_type='application/json')
+        
+        assert response.status_code == 201
+        data = json.loads(response.data)
+        assert len(data['leaderboard']) == 4
+        assert data['leaderboard'][0]['rank'] == 1
+        assert data['best_params'] == data['leaderboard'][0]['params']
+        
+        predict_response = client.get('/predict')
+        assert predict_response.status_code == 200
+    
+    def test_sweep_model_post_without_grid(self, client):
+        """Test POST /model/sweep without a parameter grid"""
+        response = client.post('/model/sweep',
+                             json={'strategy': 'grid'},
+                             content_type='application/json')
+        
+        assert response.status_code == 400
+        data = json.loads(response.data)
+        assert 'error' in data
+    
+    def test_sweep_model_post_with_bare_grid_value(self, client):
+        """Test POST /model/sweep with a grid value that is not a list"""
+        response = client.post('/model/sweep',
+                             json={'param_grid': {'n_estimators': 5}},
+                             content_type='application/json')
+        
+        assert response.status_code == 400
+        data = json.loads(response.data)
+        assert 'error' in data
+    
+    @pytest.mark.parametrize('options', [
+        {'n_jobs': 0}, {'n_jobs': -1}, {'n_jobs': 1.5},
+        {'time_budget': '10'}, {'time_budget': 0}, {'time_budget': True}
+    ])
+    def test_sweep_model_post_with_bad_options(self, client, options):
+        """Test POST /model/sweep with an invalid n_jobs or time_budget"""
+        response = client.post('/model/sweep',
+                             json={'param_grid': {'n_estimators': [5]}, **options},
+                             content_type='application/json')
+        
+        assert response.status_code == 400
+        data = json.loads(response.data)
+        assert 'error' in data
+    
+    def test_responses_report_model_version(self, client):
+        """Test every publish bumps the version reported by responses"""
+        train = json.loads(client.post('/train', json={'data_path': 'data/iris_simple.csv'}).data)
+        predict = json.loads(client.get('/predict').data)
+        assert predict['model_version'] == train['model_version'] == 1
+        
+        config = json.loads(client.put('/model', json={'n_estimators': 5}).data)
+        assert config['model_version'] == 2
+        
+        reset = client.delete('/model')
+        assert reset.headers['X-Model-Version'] == '3'
+        assert json.loads(client.get('/health').data)['model_version'] == 3
+    
+    def test_published_snapshot_is_not_modified(self, client):
+        """Test a snapshot a request already holds survives later publishes"""
+        import src.api
+        client.post('/train', json={'data_path': 'data/iris_simple.csv'})
+        held = src.api.snapshot
+        
+        client.put('/model', json={'n_estimators': 5})
+        
+        assert held.trained and held.model_params['n_estimators'] == 10
+        assert held.processor.model.n_estimators == 10
+        assert not src.api.snapshot.trained
+        assert src.api.snapshot.model_params['n_estimators'] == 5
+        assert client.get('/predict').status_code == 400
+        
+        # The next training uses the published configuration
+        client.post('/train', json={'data_path': 'data/iris_simple.csv'})
+        assert src.api.snapshot.processor.model.n_estimators == 5
+    
+    def test_predictions_during_retraining(self, client):
+        """Test predictions keep succeeding, each from one consistent snapshot"""
+        import threading
+        import src.api
+        client.post('/train', json={'data_path': 'data/iris_simple.csv'})
+        published = {1: src.api.snapshot.training_data}
+        results = []
+        
+        def predict():
+            with app.test_client() as reader:
+                for _ in range(5):
+                    response = reader.get('/predict')
+                    results.append((response.status_code, json.loads(response.data)))
+        
+        readers = [threading.Thread(target=predict) for _ in range(4)]
+        for reader in readers:
+            reader.start()
+        for _ in range(3):
+            data = json.loads(client.post('/train', json={'data_path': 'data/iris_simple.csv'}).data)
+            published[data['model_version']] = src.api.snapshot.training_data
+        for reader in readers:
+            reader.join()
+        
+        assert all(status == 200 for status, _ in results)
+        assert all(data['model_info'] == published[data['model_version']] for _, data in results)
+    
     def test_reset_model_delete(self, client):
         """Test DELETE /model endpoint"""
         response = client.delete('/model')
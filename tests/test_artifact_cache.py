@@ -0,0 +1,96 @@
+"""Tests for DiskArtifactCache."""
+
+import os
+import pickle
+import pytest
+from botocore.exceptions import ClientError
+from src.cloud.artifact_cache import DiskArtifactCache
+from tests.fake_s3 import FakeS3
+
+
+class TestDiskArtifactCache:
+
+    def setup_method(self):
+        self.s3 = FakeS3()
+        self.s3.put('models/a/model.pkl', pickle.dumps({'weights': list(range(100))}))
+
+    def test_unchanged_object_is_not_downloaded_again(self, tmp_path):
+        """Test a 304 revalidation serves the mapped local copy."""
+        cache = DiskArtifactCache(str(tmp_path))
+
+        first = pickle.loads(cache.get(self.s3, 'bucket', 'models/a/model.pkl'))
+        second = pickle.loads(cache.get(self.s3, 'bucket', 'models/a/model.pkl'))
+
+        assert first == second == {'weights': list(range(100))}
+        assert self.s3.count('get_object') == 1
+        assert cache.stats()['hits'] == 1
+        assert cache.stats()['misses'] == 1
+
+    def test_cache_is_shared_between_instances(self, tmp_path):
+        """Test a second worker process reuses the first one's download."""
+        DiskArtifactCache(str(tmp_path)).get(self.s3, 'bucket', 'models/a/model.pkl')
+
+        other = DiskArtifactCache(str(tmp_path))
+        other.get(self.s3, 'bucket', 'models/a/model.pkl')
+
+        assert self.s3.count('get_object') == 1
+        assert other.stats()['hits'] == 1
+
+    def test_changed_object_is_refetched(self, tmp_path):
+        """Test a new ETag replaces the cached copy."""
+        cache = DiskArtifactCache(str(tmp_path))
+        cache.get(self.s3, 'bucket', 'models/a/model.pkl')
+
+        self.s3.put('models/a/model.pkl', pickle.dumps('retrained'))
+
+        assert pickle.loads(cache.get(self.s3, 'bucket', 'models/a/model.pkl')) == 'retrained'
+        assert self.s3.count('get_object') == 2
+
+    def test_evicts_least_recently_used_past_budget(self, tmp_path):
+        """Test the byte budget drops the oldest entries first."""
+        for key in ('models/b/model.pkl', 'models/c/model.pkl'):
+            self.s3.put(key, b'x' * 1000)
+        self.s3.put('models/a/model.pkl', b'x' * 1000)
+        cache = DiskArtifactCache(str(tmp_path), max_bytes=3000)
+
+        cache.get(self.s3, 'bucket', 'models/a/model.pkl')
+        cache.get(self.s3, 'bucket', 'models/b/model.pkl')
+        os.utime(cache._path('models/a/model.pkl'), (0, 0))
+        os.utime(cache._path('models/b/model.pkl'), (1, 1))
+        cache.get(self.s3, 'bucket', 'models/c/model.pkl')
+
+        assert not os.path.exists(cache._path('models/a/model.pkl'))
+        assert os.path.exists(cache._path('models/b/model.pkl'))
+        assert cache.stats()['evictions'] == 1
+
+    def test_deleted_object_drops_entry(self, tmp_path):
+        """Test NoSuchKey propagates and removes the stale local copy."""
+        cache = DiskArtifactCache(str(tmp_path))
+        cache.get(self.s3, 'bucket', 'models/a/model.pkl')
+        del self.s3.objects['models/a/model.pkl']
+
+        with pytest.raises(ClientError, match='NoSuchKey'):
+            cache.get(self.s3, 'bucket', 'models/a/model.pkl')
+        assert not os.path.exists(cache._path('models/a/model.pkl'))
+
+    def test_overlapping_refreshes_keep_bytes_and_etag_together(self, tmp_path):
+        """Test a slow stale download finishing last is still revalidated as stale."""
+        cache = DiskArtifactCache(str(tmp_path))
+        get_object = self.s3.get_object
+        calls = []
+
+        def racing_get_object(**kwargs):
+            response = get_object(**kwargs)
+            if not calls:
+                # Another worker refreshes to a newer version mid-download
+                calls.append(kwargs)
+                self.s3.put('models/a/model.pkl', pickle.dumps('retrained'))
+                assert pickle.loads(DiskArtifactCache(str(tmp_path)).get(
+                    self.s3, 'bucket', 'models/a/model.pkl')) == 'retrained'
+            return response
+
+        self.s3.get_object = racing_get_object
+        assert pickle.loads(cache.get(self.s3, 'bucket', 'models/a/model.pkl')) == {'weights': list(range(100))}
+
+        assert pickle.loads(cache.get(self.s3, 'bucket', 'models/a/model.pkl')) == 'retrained'
+        assert os.listdir(tmp_path) == [os.path.basename(cache._path('models/a/model.pkl'))]
@@ -0,0 +1,89 @@
+"""Tests for the versioned model artifact format."""
+
+import mmap
+import pickle
+import numpy as np
+import pandas as pd
+import pytest
+from src.cloud import artifact_format
+from src.data_processor import DataProcessor
+
+
+class TestArtifactFormat:
+
+    def setup_method(self):
+        self.arrays = {
+            'large': np.arange(1 << 16, dtype=np.float64),
+            'small': np.arange(10, dtype=np.int32)
+        }
+
+    @pytest.mark.parametrize('compression', ['none', 'zlib:1', 'lzma:6'])
+    def test_round_trip(self, compression):
+        """Test every codec loads back the same arrays."""
+        data = artifact_format.dumps(self.arrays, compression, mmap_min_bytes=1024)
+        loaded = artifact_format.loads(data)
+
+        np.testing.assert_array_equal(loaded['large'], self.arrays['large'])
+        np.testing.assert_array_equal(loaded['small'], self.arrays['small'])
+        assert artifact_format.read_header(data)['compression'] == compression.split(':')[0]
+
+    def test_large_arrays_are_aligned_views(self, tmp_path):
+        """Test out-of-band arrays load as views of a memory-mapped file."""
+        path = tmp_path / 'model.bin'
+        with open(path, 'wb') as f:
+            artifact_format.dump(self.arrays, f, 'zlib', mmap_min_bytes=1024)
+
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        header = artifact_format.read_header(mapped)
+        loaded = artifact_format.loads(mapped)
+
+        assert len(header['buffers']) == 1
+        assert all(offset % artifact_format.ALIGNMENT == 0 for offset, _ in header['buffers'])
+        assert not loaded['large'].flags.owndata
+        assert not loaded['large'].flags.writeable
+        np.testing.assert_array_equal(loaded['large'], self.arrays['large'])
+
+    def test_checksum_mismatch_is_rejected(self):
+        """Test a corrupted artifact fails to load."""
+        data = bytearray(artifact_format.dumps(self.arrays, 'none', mmap_min_bytes=1024))
+        data[-1] ^= 0xFF
+
+        with pytest.raises(ValueError, match='checksum'):
+            artifact_format.loads(bytes(data))
+
+    def test_legacy_pickle_still_loads(self):
+        """Test artifacts written before the format existed."""
+        assert artifact_format.loads(pickle.dumps(self.arrays['small'])).tolist() == list(range(10))
+
+    def test_pickle_stream_spills_to_disk(self, monkeypatch):
+        """Test a pickle stream larger than the spool is streamed back in chunks."""
+        monkeypatch.setattr(artifact_format, 'SPOOL_MAX_BYTES', 1024)
+        monkeypatch.setattr(artifact_format, 'READ_CHUNK', 4096)
+
+        chunks = list(artifact_format.iter_chunks(self.arrays, 'none', mmap_min_bytes=1 << 30))
+        loaded = artifact_format.loads(b''.join(chunks))
+
+        assert max(len(chunk) for chunk in chunks) <= 4096
+        np.testing.assert_array_equal(loaded['large'], self.arrays['large'])
+
+    def test_unknown_compression_is_rejected(self):
+        """Test an invalid codec name."""
+        with pytest.raises(ValueError):
+            artifact_format.dumps(self.arrays, 'brotli')
+
+    def test_pipeline_artifact_predicts_after_reload(self):
+        """Test a compressed pipeline artifact scores like the original."""
+        rng = np.random.default_rng(0)
+        X = pd.DataFrame(rng.normal(size=(200, 3)), columns=['a', 'b', 'c'])
+        y = (X['a'] > 0).astype(int)
+        processor = DataProcessor()
+        X_train, X_test, y_train, y_test = processor.prepare_data(X, y)
+        processor.train_model(X_train, y_train)
+        restored = DataProcessor()
+        restored.load_artifact(
+            artifact_format.loads(artifact_format.dumps(processor.export_pipeline(), 'lzma:1'))
+        )
+
+        assert restored.feature_names == ['a', 'b', 'c']
+        np.testing.assert_array_equal(restored.model.predict(X_test), processor.model.predict(X_test))
@@ -0,0 +1,62 @@
+"""Tests for MicroBatcher."""
+
+import threading
+import numpy as np
+from src.batching import MicroBatcher
+
+class TestMicroBatcher:
+    
+    def test_concurrent_requests_share_a_batch(self):
+        """Test requests arriving within max_wait are scored in one call."""
+        calls = []
+        release = threading.Event()
+        
+        def predict_fn(X):
+            calls.append(len(X))
+            release.wait(1)
+            return X[:, 0] * 2
+        
+        batcher = MicroBatcher(predict_fn, max_batch_size=100, max_wait_ms=200)
+        futures = [batcher.submit(np.array([[float(i)]])) for i in range(5)]
+        release.set()
+        
+        results = [future.result(2).tolist() for future in futures]
+        
+        assert results == [[0.0], [2.0], [4.0], [6.0], [8.0]]
+        assert calls == [5]
+        assert batcher.stats()['batches'] == 1
+        batcher.close()
+    
+    def test_max_batch_size_splits_batches(self):
+        """Test a full batch is flushed without waiting."""
+        calls = []
+        batcher = MicroBatcher(lambda X: calls.append(len(X)) or X, max_batch_size=2, max_wait_ms=200)
+        
+        futures = [batcher.submit(np.zeros((1, 1))) for _ in range(4)]
+        for future in futures:
+            future.result(2)
+        
+        assert calls == [2, 2]
+        batcher.close()
+    
+    def test_errors_reach_every_request(self):
+        """Test a failing predict call fails all requests in the batch."""
+        def predict_fn(X):
+            raise RuntimeError("boom")
+        
+        batcher = MicroBatcher(predict_fn, max_wait_ms=0)
+        
+        try:
+            batcher.predict(np.zeros((1, 1)), timeout=2)
+            assert False, "expected RuntimeError"
+        except RuntimeError as e:
+            assert str(e) == "boom"
+        batcher.close()
+    
+    def test_closed_batcher_still_answers(self):
+        """Test a request submitted after close() is scored on the calling thread."""
+        batcher = MicroBatcher(lambda X: X[:, 0] + 1, max_wait_ms=0)
+        batcher.close()
+        batcher.close()
+        
+        assert batcher.predict(np.array([[1.0], [2.0]]), timeout=2).tolist() == [2.0, 3.0]
@@ -10,7 +10,8 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 # Import with proper error handling
 try:
     from src.cloud_api import app
-    from src.cloud import DynamoDBClient, S3Client
+    from src.cloud import DynamoDBClient, S3Client, ModelAlreadyExistsError, ModelNotFoundError
+    from src.cloud.dynamodb_client import ModelPage
 except Exception as e:
     # If running without LocalStack, skip these tests
     if "Connection refused" in str(e) or "Could not connect" in str(e):
@@ -48,6 +49,8 @@ def cloud_clients():
             return _mock_created_models.get(model_id)
         
         def mock_create_model(model_id, metadata):
+            if model_id in _mock_created_models:
+                raise ModelAlreadyExistsError(model_id, _mock_created_models[model_id])
             model_data = {
                 'model_id': model_id,
                 'created_at': '2023-01-01T00:00:00',
@@ -57,29 +60,54 @@ def cloud_clients():
             _mock_created_models[model_id] = model_data
             return model_data
         
-        def mock_update_model(model_id, updates):
+        def mock_update_model(model_id, updates, return_previous=False):
             if model_id in _mock_created_models:
+                previous = dict(_mock_created_models[model_id])
                 _mock_created_models[model_id].update(updates)
                 _mock_created_models[model_id]['updated_at'] = '2023-01-01T00:00:00'
+                if return_previous:
+                    return dict(_mock_created_models[model_id]), previous
                 return _mock_created_models[model_id]
             else:
-                raise ValueError(f"Model {model_id} not found")
+                raise ModelNotFoundError(model_id)
+        
+        def mock_restore_model(model_id, previous, keys):
+            _mock_created_models[model_id] = dict(previous)
+            return True
         
         def mock_delete_model(model_id):
             if model_id in _mock_created_models:
                 del _mock_created_models[model_id]
                 return True
             else:
-                raise ValueError(f"Model {model_id} not found")
+                raise ModelNotFoundError(model_id)
         
         mock_dynamodb.get_model.side_effect = mock_get_model
+        mock_dynamodb.get_models.side_effect = lambda model_ids: [mock_get_model(model_id) for model_id in model_ids]
         mock_dynamodb.create_model.side_effect = mock_create_model
         mock_dynamodb.update_model.side_effect = mock_update_model
+        mock_dynamodb.restore_model.side_effect = mock_restore_model
         mock_dynamodb.delete_model.side_effect = mock_delete_model
+        def mock_create_models(metadata_by_id):
+            outcomes = {}
+            for model_id, metadata in metadata_by_id.items():
+                try:
+                    outcomes[model_id] = mock_create_model(model_id, metadata)
+                except Exception as e:
+                    outcomes[model_id] = e
+            return outcomes
+        
+        mock_dynamodb.create_models.side_effect = mock_create_models
+        mock_dynamodb.delete_models.side_effect = lambda model_ids: all(
+            _mock_created_models.pop(model_id, None) or True for model_id in model_ids
+        )
         mock_dynamodb.list_models.return_value = []
         mock_dynamodb.query_models.return_value = []
+        mock_dynamodb.query_models_page.return_value = ModelPage([])
+        mock_dynamodb.cache_stats.return_value = {'hits': 0, 'misses': 0, 'hit_ratio': 0.0}
         
         # Mock S3 methods
+        blobs = {}
         def mock_upload_model(model_id, model_object, metadata=None):
             _mock_uploaded_models[model_id] = model_object
             if metadata:
@@ -95,8 +123,17 @@ def cloud_clients():
         def mock_model_exists(model_id):
             return model_id in _mock_uploaded_models
         
-        def mock_update_model(model_id, model_object=None, metadata=None):
+        def mock_put_blob(model_object):
+            blobs[str(id(model_object))] = model_object
+            return str(id(model_object))
+        
+        def mock_attach_model(model_id, digest, metadata=None, model_object=None):
+            return mock_upload_model(model_id, blobs[digest], metadata)
+        
+        def mock_update_model(model_id, model_object=None, metadata=None, digest=None):
             if model_id in _mock_uploaded_models:
+                if digest:
+                    model_object = blobs[digest]
                 if model_object:
                     _mock_uploaded_models[model_id] = model_object
                 if metadata:
@@ -115,10 +152,16 @@ def cloud_clients():
                 raise ValueError(f"Model {model_id} not found")
         
         mock_s3.upload_model.side_effect = mock_upload_model
+        mock_s3.put_blob.side_effect = mock_put_blob
+        mock_s3.attach_model.side_effect = mock_attach_model
         mock_s3.download_model.side_effect = mock_download_model
         mock_s3.get_model_metadata.side_effect = mock_get_model_metadata
         mock_s3.update_model.side_effect = mock_update_model
         mock_s3.delete_model.side_effect = mock_delete_model
+        mock_s3.delete_models.side_effect = lambda model_ids: [
+            model_id for model_id in model_ids
+            if _mock_uploaded_models.pop(model_id, None) is not None
+        ]
         mock_s3.list_models.return_value = []
         mock_s3.model_exists.side_effect = mock_model_exists
         
@@ -160,6 +203,8 @@ def mock_cloud_clients(monkeypatch):
         return _mock_created_models.get(model_id)
     
     def mock_create_model(model_id, metadata):
+        if model_id in _mock_created_models:
+            raise ModelAlreadyExistsError(model_id, _mock_created_models[model_id])
         model_data = {
             'model_id': model_id,
             'created_at': '2023-01-01T00:00:00',
@@ -169,29 +214,54 @@ def mock_cloud_clients(monkeypatch):
         _mock_created_models[model_id] = model_data
         return model_data
     
-    def mock_update_model(model_id, updates):
+    def mock_update_model(model_id, updates, return_previous=False):
         if model_id in _mock_created_models:
+            previous = dict(_mock_created_models[model_id])
             _mock_created_models[model_id].update(updates)
             _mock_created_models[model_id]['updated_at'] = '2023-01-01T00:00:00'
+            if return_previous:
+                return dict(_mock_created_models[model_id]), previous
             return _mock_created_models[model_id]
         else:
-            raise ValueError(f"Model {model_id} not found")
+            raise ModelNotFoundError(model_id)
+    
+    def mock_restore_model(model_id, previous, keys):
+        _mock_created_models[model_id] = dict(previous)
+        return True
     
     def mock_delete_model(model_id):
         if model_id in _mock_created_models:
             del _mock_created_models[model_id]
             return True
         else:
-            raise ValueError(f"Model {model_id} not found")
+            raise ModelNotFoundError(model_id)
     
     mock_dynamodb.get_model.side_effect = mock_get_model
+    mock_dynamodb.get_models.side_effect = lambda model_ids: [mock_get_model(model_id) for model_id in model_ids]
     mock_dynamodb.create_model.side_effect = mock_create_model
     mock_dynamodb.update_model.side_effect = mock_update_model
+    mock_dynamodb.restore_model.side_effect = mock_restore_model
     mock_dynamodb.delete_model.side_effect = mock_delete_model
+    def mock_create_models(metadata_by_id):
+        outcomes = {}
+        for model_id, metadata in metadata_by_id.items():
+            try:
+                outcomes[model_id] = mock_create_model(model_id, metadata)
+            except Exception as e:
+                outcomes[model_id] = e
+        return outcomes
+    
+    mock_dynamodb.create_models.side_effect = mock_create_models
+    mock_dynamodb.delete_models.side_effect = lambda model_ids: all(
+        _mock_created_models.pop(model_id, None) or True for model_id in model_ids
+    )
     mock_dynamodb.list_models.return_value = []
     mock_dynamodb.query_models.return_value = []
+    mock_dynamodb.query_models_page.return_value = ModelPage([])
+    mock_dynamodb.cache_stats.return_value = {'hits': 0, 'misses': 0, 'hit_ratio': 0.0}
     
     # Mock S3 methods
+    blobs = {}
     def mock_upload_model(model_id, model_object, metadata=None):
         _mock_uploaded_models[model_id] = model_object
         if metadata:
@@ -207,8 +277,17 @@ def mock_cloud_clients(monkeypatch):
     def mock_model_exists(model_id):
         return model_id in _mock_uploaded_models
     
-    def mock_update_model(model_id, model_object=None, metadata=None):
+    def mock_put_blob(model_object):
+        blobs[str(id(model_object))] = model_object
+        return str(id(model_object))
+    
+    def mock_attach_model(model_id, digest, metadata=None, model_object=None):
+        return mock_upload_model(model_id, blobs[digest], metadata)
+    
+    def mock_update_model(model_id, model_object=None, metadata=None, digest=None):
         if model_id in _mock_uploaded_models:
+            if digest:
+                model_object = blobs[digest]
             if model_object:
                 _mock_uploaded_models[model_id] = model_object
             if metadata:
@@ -227,13 +306,23 @@ def mock_cloud_clients(monkeypatch):
             raise ValueError(f"Model {model_id} not found")
     
     mock_s3.upload_model.side_effect = mock_upload_model
+    mock_s3.put_blob.side_effect = mock_put_blob
+    mock_s3.attach_model.side_effect = mock_attach_model
     mock_s3.download_model.side_effect = mock_download_model
     mock_s3.get_model_metadata.side_effect = mock_get_model_metadata
     mock_s3.update_model.side_effect = mock_update_model
     mock_s3.delete_model.side_effect = mock_delete_model
+    mock_s3.delete_models.side_effect = lambda model_ids: [
+        model_id for model_id in model_ids
+        if _mock_uploaded_models.pop(model_id, None) is not None
+    ]
     mock_s3.list_models.return_value = []
     mock_s3.model_exists.side_effect = mock_model_exists
     
+    # Start every test with no models loaded in memory
+    import src.cloud_api
+    src.cloud_api.model_cache.clear()
+    
     # Patch the cloud client classes for the API endpoints
     monkeypatch.setattr('src.cloud_api.DynamoDBClient', lambda *args, **kwargs: mock_dynamodb)
     monkeypatch.setattr('src.cloud_api.S3Client', lambda *args, **kwargs: mock_s3)
@@ -278,6 +367,7 @@ class TestCloudAPIEndpoints:
         # Check that services are either connected or disconnected (depending on LocalStack availability)
         assert data['services']['dynamodb'] in ['connected', 'disconnected']
         assert data['services']['s3'] in ['connected', 'disconnected']
+        assert 'metadata_cache' in data
     
     def test_get_models_with_parameters(self, client, cloud_clients):
         #Test GET /models with appropriate parameters returns expected JSON
@@ -303,6 +393,32 @@ class TestCloudAPIEndpoints:
         assert data['model_id'] == model_id
         assert data['model_type'] == 'RandomForest'
     
+    def test_get_many_models_by_id(self, client):
+        #Test GET /models with several model_id values returns them in request order
+        for model_id in ['test_batch_a', 'test_batch_b']:
+            client.post('/models', json={
+                'model_id': model_id,
+                'model_type': 'RandomForest',
+                'data_path': 'data/iris_simple.csv'
+            })
+        
+        response = client.get('/models?model_id=test_batch_b&model_id=missing_model,test_batch_a')
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert [model['model_id'] for model in data['results']] == ['test_batch_b', 'test_batch_a']
+        assert data['count'] == 2
+        assert data['missing'] == ['missing_model']
+    
+    def test_get_model_by_id_ignores_empty_entries(self, client):
+        #Test a trailing comma still finds the one model, and no ID at all is rejected
+        client.post('/models', json={'model_id': 'test_single_a', 'data_path': 'data/iris_simple.csv'})
+        
+        response = client.get('/models?model_id=test_single_a,')
+        assert response.status_code == 200
+        assert json.loads(response.data)['model_id'] == 'test_single_a'
+        assert client.get('/models?model_id=').status_code == 400
+        assert client.get('/models?model_id=,').status_code == 400
+    
     def test_get_models_no_results(self, client):
         #Test GET /models that finds no results
         response = client.get('/models?model_type=NonExistent')
@@ -331,6 +447,68 @@ class TestCloudAPIEndpoints:
         assert 'invalid_param' in data['invalid_parameters']
         assert 'another_bad' in data['invalid_parameters']
     
+    def test_get_models_malformed_filter_value(self, client, monkeypatch):
+        #Test GET /models rejects filter values DynamoDB cannot compare
+        import src.cloud_api
+        dynamodb, _ = src.cloud_api.get_cloud_clients()
+        if hasattr(dynamodb.query_models_page, 'side_effect'):
+            # The real client raises this while building the filter
+            monkeypatch.setattr(dynamodb.query_models_page, 'side_effect', ValueError("Invalid number: high"))
+        
+        response = client.get('/models?accuracy_threshold=high')
+        assert response.status_code == 400
+        assert json.loads(response.data)['error'] == 'Invalid number: high'
+    
+    def test_get_models_streams_page_with_cursor(self, client, monkeypatch):
+        #Test GET /models returns one page plus the cursor for the next
+        import src.cloud_api
+        dynamodb, _ = src.cloud_api.get_cloud_clients()
+        if not hasattr(dynamodb.query_models_page, 'return_value'):
+            pytest.skip("Needs the mocked DynamoDB client")
+        page = ModelPage([{'model_id': 'a'}, {'model_id': 'b'}], next_cursor='abc')
+        monkeypatch.setattr(dynamodb.query_models_page, 'return_value', page)
+        
+        response = client.get('/models?model_type=RandomForest&limit=2&fields=model_type,test_accuracy')
+        assert response.status_code == 200
+        assert response.is_streamed
+        data = json.loads(response.data)
+        assert data['results'] == [{'model_id': 'a'}, {'model_id': 'b'}]
+        assert data['count'] == 2
+        assert data['next_cursor'] == 'abc'
+        assert data['filters'] == {'model_type': 'RandomForest'}
+        _, kwargs = dynamodb.query_models_page.call_args
+        assert kwargs == {'limit': 2, 'cursor': None, 'fields': ['model_type', 'test_accuracy']}
+    
+    def test_get_models_read_failures(self, client, monkeypatch):
+        #Test a query failing up front is a 500 and one failing midway ends with an error member
+        import src.cloud_api
+        dynamodb, _ = src.cloud_api.get_cloud_clients()
+        if not hasattr(dynamodb.query_models_page, 'return_value'):
+            pytest.skip("Needs the mocked DynamoDB client")
+        
+        def read(models):
+            yield from models
+            raise Exception("throttled")
+        
+        monkeypatch.setattr(dynamodb.query_models_page, 'return_value', ModelPage(read([])))
+        response = client.get('/models?model_type=RandomForest')
+        assert response.status_code == 500
+        assert 'throttled' in json.loads(response.data)['details']
+        
+        monkeypatch.setattr(dynamodb.query_models_page, 'return_value',
+                            ModelPage(read([{'model_id': 'a'}]), next_cursor='abc'))
+        response = client.get('/models?model_type=RandomForest')
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data['results'] == [{'model_id': 'a'}]
+        assert 'throttled' in data['error']
+        assert 'next_cursor' not in data
+    
+    def test_get_models_invalid_limit(self, client):
+        #Test GET /models rejects a non-numeric limit
+        response = client.get('/models?model_type=RandomForest&limit=many')
+        assert response.status_code == 400
+    
     def test_post_model_creates_in_both_stores(self, client, cloud_clients):
         #Test POST /models creates item in DynamoDB and S3
         dynamodb, s3 = cloud_clients
@@ -385,6 +563,18 @@ class TestCloudAPIEndpoints:
         assert 'error' in data
         assert 'Duplicate model ID' in data['error']
     
+    def test_duplicate_model_is_rejected_before_training(self, client, monkeypatch):
+        #Test a known duplicate ID returns 409 without training a model
+        client.post('/models', json={'model_id': 'test_model_pretrain', 'data_path': 'data/iris_simple.csv'})
+        
+        def train_new_model(*args, **kwargs):
+            raise AssertionError("trained a duplicate")
+        
+        monkeypatch.setattr('src.cloud_api.train_new_model', train_new_model)
+        response = client.post('/models', json={'model_id': 'test_model_pretrain',
+                                                'data_path': 'data/iris_simple.csv'})
+        assert response.status_code == 409
+    
     def test_put_existing_model_updates_both_stores(self, client, cloud_clients):
         #Test PUT /models/<id> updates both DynamoDB and S3
         dynamodb, s3 = cloud_clients
@@ -418,6 +608,37 @@ class TestCloudAPIEndpoints:
         s3_metadata = s3.get_model_metadata(model_id)
         assert s3_metadata['version'] == '2.0'
     
+    def test_put_incremental_retrain(self, client, cloud_clients):
+        #Test PUT /models/<id> with incremental retrain grows the stored forest
+        dynamodb, s3 = cloud_clients
+        model_id = 'test_model_incremental'
+        
+        client.post('/models', json={
+            'model_id': model_id,
+            'data_path': 'data/iris_simple.csv'
+        })
+        
+        response = client.put(f'/models/{model_id}', json={
+            'retrain': True,
+            'incremental': True,
+            'n_new_estimators': 5
+        })
+        
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data['updates']['retrain_mode'] == 'incremental'
+        assert data['updates']['n_estimators'] == 15
+        assert len(s3.download_model(model_id).named_steps['model'].estimators_) == 15
+        
+        for n_new_estimators in (0, -1, '5', 2.5):
+            response = client.put(f'/models/{model_id}', json={
+                'retrain': True,
+                'incremental': True,
+                'n_new_estimators': n_new_estimators
+            })
+            assert response.status_code == 400
+        assert len(s3.download_model(model_id).named_steps['model'].estimators_) == 15
+    
     def test_put_nonexistent_model(self, client):
         #Test PUT request with no valid target
         response = client.put('/models/nonexistent_model', json={
@@ -429,6 +650,90 @@ class TestCloudAPIEndpoints:
         assert 'error' in data
         assert 'Model not found' in data['error']
     
+    def test_failed_s3_write_rolls_back_dynamodb(self, client, monkeypatch):
+        #Test a create or update whose S3 side fails leaves DynamoDB as it was
+        import src.cloud_api
+        dynamodb, s3 = src.cloud_api.get_cloud_clients()
+        if not hasattr(s3.upload_predictor, 'side_effect'):
+            pytest.skip("Needs the mocked S3 client")
+        model_id = 'test_model_rollback'
+        client.post('/models', json={'model_id': model_id, 'data_path': 'data/iris_simple.csv'})
+        monkeypatch.setattr(s3.upload_predictor, 'side_effect', Exception("S3 unavailable"))
+        
+        response = client.put(f'/models/{model_id}', json={'retrain': True})
+        assert response.status_code == 500
+        assert 'retrain_mode' not in dynamodb.get_model(model_id)
+        
+        response = client.post('/models', json={'model_id': 'test_model_rollback_2',
+                                                'data_path': 'data/iris_simple.csv'})
+        assert response.status_code == 500
+        assert dynamodb.get_model('test_model_rollback_2') is None
+    
+    def test_failed_writes_discard_their_blob(self, client, monkeypatch):
+        #Test a blob uploaded for a rejected create or update is not left behind
+        import src.cloud_api
+        dynamodb, s3 = src.cloud_api.get_cloud_clients()
+        if not hasattr(s3.upload_predictor, 'side_effect'):
+            pytest.skip("Needs the mocked S3 client")
+        client.post('/models', json={'model_id': 'test_model_blob', 'data_path': 'data/iris_simple.csv'})
+        s3.discard_blob.reset_mock()
+        
+        # Duplicate ID: rejected by the conditional write after the upload started
+        monkeypatch.setattr(dynamodb.get_model, 'side_effect', lambda model_id: None)
+        assert client.post('/models', json={'model_id': 'test_model_blob',
+                                            'data_path': 'data/iris_simple.csv'}).status_code == 409
+        # Model deleted after the existence check: rejected by the conditional update
+        monkeypatch.setattr(dynamodb.get_model, 'side_effect', lambda model_id: {'model_id': model_id})
+        assert client.put('/models/test_model_missing', json={'retrain': True}).status_code == 404
+        # Failed predictor upload after DynamoDB accepted the write
+        monkeypatch.undo()
+        monkeypatch.setattr(s3.upload_predictor, 'side_effect', Exception("S3 unavailable"))
+        assert client.put('/models/test_model_blob', json={'retrain': True}).status_code == 500
+        
+        assert s3.discard_blob.call_count == 3
+    
+    def test_failed_retrain_leaves_s3_as_it_was(self, client, monkeypatch):
+        #Test a failure in either S3 write of a retrain undoes the other S3 writes
+        import src.cloud_api
+        dynamodb, s3 = src.cloud_api.get_cloud_clients()
+        if not hasattr(s3.upload_predictor, 'side_effect'):
+            pytest.skip("Needs the mocked S3 client")
+        model_id = 'test_model_retrain_rollback'
+        client.post('/models', json={'model_id': model_id, 'data_path': 'data/iris_simple.csv'})
+        artifact = s3.download_model(model_id)
+        monkeypatch.setattr(s3.download_predictor, 'side_effect', lambda model_id: b'old predictor')
+        
+        # The predictor upload fails: the model is never repointed
+        monkeypatch.setattr(s3.upload_predictor, 'side_effect', Exception("S3 unavailable"))
+        s3.update_model.reset_mock()
+        assert client.put(f'/models/{model_id}', json={'retrain': True}).status_code == 500
+        s3.update_model.assert_not_called()
+        assert s3.download_model(model_id) is artifact
+        
+        # The pointer switch fails: the previous predictor is put back
+        monkeypatch.setattr(s3.upload_predictor, 'side_effect', None)
+        monkeypatch.setattr(s3.update_model, 'side_effect', Exception("S3 unavailable"))
+        s3.upload_predictor.reset_mock()
+        assert client.put(f'/models/{model_id}', json={'retrain': True}).status_code == 500
+        assert [call.args for call in s3.upload_predictor.call_args_list][-1] == (model_id, b'old predictor')
+        assert s3.download_model(model_id) is artifact
+        assert 'retrain_mode' not in dynamodb.get_model(model_id)
+    
+    def test_failed_metadata_update_does_not_touch_s3(self, client, monkeypatch):
+        #Test a metadata-only update writes S3 only after DynamoDB succeeded
+        import src.cloud_api
+        dynamodb, s3 = src.cloud_api.get_cloud_clients()
+        if not hasattr(s3.update_model, 'side_effect'):
+            pytest.skip("Needs the mocked S3 client")
+        model_id = 'test_model_metadata_rollback'
+        client.post('/models', json={'model_id': model_id, 'data_path': 'data/iris_simple.csv'})
+        monkeypatch.setattr(dynamodb.update_model, 'side_effect', Exception("DynamoDB unavailable"))
+        s3.update_model.reset_mock()
+        
+        assert client.put(f'/models/{model_id}', json={'description': 'new'}).status_code == 500
+        s3.update_model.assert_not_called()
+        assert 'description' not in s3.get_model_metadata(model_id)
+    
     def test_delete_model_removes_from_both_stores(self, client, cloud_clients):
         #Test DELETE removes from both DynamoDB and S3
         dynamodb, s3 = cloud_clients
@@ -463,6 +768,122 @@ class TestCloudAPIEndpoints:
         assert 'error' in data
         assert 'Model not found' in data['error']
     
+    def test_create_model_async(self, client, cloud_clients):
+        #Test POST /models with async returns 202 and the job stores the model
+        import src.cloud_api
+        dynamodb, s3 = cloud_clients
+        response = client.post('/models', json={
+            'model_id': 'test_model_async',
+            'data_path': 'data/iris_simple.csv',
+            'async': True
+        })
+        assert response.status_code == 202
+        data = json.loads(response.data)
+        assert data['model_id'] == 'test_model_async'
+        
+        src.cloud_api.jobs.wait(data['job_id'], timeout=60)
+        job = json.loads(client.get(f"/jobs/{data['job_id']}").data)
+        assert job['status'] == 'succeeded'
+        assert job['result']['model_id'] == 'test_model_async'
+        assert 'async' not in dynamodb.get_model('test_model_async')
+        assert s3.model_exists('test_model_async') is True
+        
+        # The ID is now taken
+        response = client.post('/models', json={'model_id': 'test_model_async', 'async': True})
+        assert response.status_code == 409
+    
+    def test_bulk_create_and_delete(self, client, cloud_clients):
+        #Test bulk endpoints report a result per model, in request order
+        dynamodb, s3 = cloud_clients
+        client.post('/models', json={'model_id': 'test_bulk_existing', 'data_path': 'data/iris_simple.csv'})
+        
+        response = client.post('/models/bulk', json={'models': [
+            {'model_id': 'test_bulk_1', 'data_path': 'data/iris_simple.csv'},
+            {'model_id': 'test_bulk_existing', 'data_path': 'data/iris_simple.csv'},
+            {'model_id': 'test_bulk_2', 'data_path': 'missing.csv'},
+            {'model_id': 'test_bulk_3', 'data_path': 'data/iris_simple.csv', 'model_type': 'RandomForest'}
+        ]})
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert [result['status'] for result in data['results']] == ['created', 'duplicate', 'invalid', 'created']
+        assert data['created'] == 2
+        assert dynamodb.get_model('test_bulk_3')['test_accuracy'] > 0
+        assert s3.model_exists('test_bulk_1') is True
+        
+        response = client.delete('/models/bulk', json={
+            'model_ids': ['test_bulk_1', 'test_bulk_3', 'nonexistent_model']
+        })
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert [result['status'] for result in data['results']] == ['deleted', 'deleted', 'not_found']
+        assert dynamodb.get_model('test_bulk_1') is None
+        assert s3.model_exists('test_bulk_3') is False
+    
+    def test_bulk_uploads_run_on_the_io_pool(self, client, monkeypatch):
+        #Test bulk artifact uploads run concurrently on the I/O pool, not the request thread
+        import threading
+        import src.cloud_api
+        dynamodb, s3 = src.cloud_api.get_cloud_clients()
+        if not hasattr(s3.upload_model, 'side_effect'):
+            pytest.skip("Needs the mocked S3 client")
+        threads = []
+        upload_model = s3.upload_model.side_effect
+        
+        def record_thread(*args, **kwargs):
+            threads.append(threading.current_thread().name)
+            return upload_model(*args, **kwargs)
+        
+        monkeypatch.setattr(s3.upload_model, 'side_effect', record_thread)
+        response = client.post('/models/bulk', json={'models': [
+            {'model_id': f'test_bulk_io_{i}', 'data_path': 'data/iris_simple.csv'} for i in range(3)
+        ]})
+        
+        assert json.loads(response.data)['created'] == 3
+        assert len(threads) == 3 and all(name.startswith('cloud-io') for name in threads)
+    
+    def test_non_string_model_type_is_rejected(self, client):
+        #Test model_type, a key of the model_type index, must be a string
+        client.post('/models', json={'model_id': 'test_model_typed', 'data_path': 'data/iris_simple.csv'})
+        
+        assert client.post('/models', json={'model_id': 'test_model_untyped', 'model_type': 5}).status_code == 400
+        assert client.put('/models/test_model_typed', json={'model_type': ['a']}).status_code == 400
+        response = client.post('/models/bulk', json={'models': [{'model_id': 'test_bulk_typed', 'model_type': ''}]})
+        assert json.loads(response.data)['results'][0]['status'] == 'invalid'
+    
+    def test_bulk_requests_need_a_list(self, client):
+        #Test bulk endpoints reject bodies without a list of models
+        assert client.post('/models/bulk', json={'models': []}).status_code == 400
+        assert client.delete('/models/bulk', json={'model_ids': 'test_model_1'}).status_code == 400
+    
+    def test_bulk_is_not_a_model_id(self, client):
+        #Test the ID the bulk routes would shadow is rejected
+        assert client.post('/models', json={'model_id': 'bulk'}).status_code == 400
+        
+        response = client.post('/models/bulk', json={'models': [{'model_id': 'bulk'}]})
+        assert json.loads(response.data)['results'][0]['status'] == 'invalid'
+    
+    def test_bulk_create_keeps_model_created_while_training(self, client, cloud_clients, monkeypatch):
+        #Test an ID taken after the pre-check is reported as a duplicate, not overwritten
+        import src.cloud_api
+        dynamodb, s3 = cloud_clients
+        train_in_parallel = src.cloud_api.train_in_parallel
+        
+        def train_while_racing(data_paths):
+            dynamodb.create_model('test_bulk_race', {'model_type': 'Other'})
+            return train_in_parallel(data_paths)
+        
+        monkeypatch.setattr('src.cloud_api.train_in_parallel', train_while_racing)
+        response = client.post('/models/bulk', json={'models': [
+            {'model_id': 'test_bulk_race', 'data_path': 'data/iris_simple.csv'},
+            {'model_id': 'test_bulk_fresh', 'data_path': 'data/iris_simple.csv'}
+        ]})
+        
+        data = json.loads(response.data)
+        assert [result['status'] for result in data['results']] == ['duplicate', 'created']
+        assert data['results'][0]['existing_model']['model_type'] == 'Other'
+        assert dynamodb.get_model('test_bulk_race')['model_type'] == 'Other'
+        assert s3.model_exists('test_bulk_race') is False
+    
     def test_predict_with_model(self, client):
         #Test predictions using a stored model
         model_id = 'test_model_6'
@@ -485,6 +906,87 @@ class TestCloudAPIEndpoints:
         assert len(data['predictions']) > 0
         assert 0 <= data['accuracy'] <= 1
     
+    def test_predict_legacy_model_leaves_cached_processor_alone(self, client, monkeypatch):
+        #Test a legacy artifact's scaler is fitted per request, not on the shared processor
+        import src.cloud_api
+        dynamodb, s3 = src.cloud_api.get_cloud_clients()
+        if not hasattr(s3.download_model, 'side_effect'):
+            pytest.skip("Needs the mocked S3 client")
+        model_id = 'test_model_legacy'
+        client.post('/models', json={'model_id': model_id, 'data_path': 'data/iris_simple.csv'})
+        estimator = s3.download_model(model_id).named_steps['model']
+        monkeypatch.setattr(s3.download_model, 'side_effect', lambda model_id: estimator)
+        src.cloud_api.model_cache.clear()
+        
+        response = client.get(f'/models/{model_id}/predict')
+        
+        assert response.status_code == 200
+        cached = src.cloud_api.load_model(model_id)
+        assert cached.feature_names is None
+        assert not hasattr(cached.scaler, 'mean_')
+    
+    def test_predict_supplied_instances(self, client):
+        #Test POST /models/<id>/predict scores caller-supplied rows
+        model_id = 'test_model_rows'
+        client.post('/models', json={
+            'model_id': model_id,
+            'data_path': 'data/iris_simple.csv'
+        })
+        
+        response = client.post(f'/models/{model_id}/predict', json={
+            'instances': [
+                {'sepal_length': 5.1, 'sepal_width': 3.5, 'petal_length': 1.4, 'petal_width': 0.2},
+                {'sepal_length': 6.3, 'sepal_width': 3.3, 'petal_length': 6.0, 'petal_width': 2.5}
+            ]
+        })
+        
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data['prediction_count'] == 2
+        assert all(p in [0, 1, 2] for p in data['predictions'])
+        
+        # Rows may also be lists in training feature order
+        response = client.post(f'/models/{model_id}/predict', json={
+            'instances': [[5.1, 3.5, 1.4, 0.2], [6.3, 3.3, 6.0, 2.5]]
+        })
+        assert json.loads(response.data)['predictions'] == data['predictions']
+    
+    def test_predict_supplied_instances_invalid(self, client):
+        #Test POST /models/<id>/predict with malformed rows and unknown models
+        model_id = 'test_model_rows_invalid'
+        client.post('/models', json={
+            'model_id': model_id,
+            'data_path': 'data/iris_simple.csv'
+        })
+        
+        response = client.post(f'/models/{model_id}/predict', json={'instances': [[1.0, 2.0]]})
+        assert response.status_code == 400
+        
+        response = client.post('/models/nonexistent_model/predict', json={'instances': [[1, 2, 3, 4]]})
+        assert response.status_code == 404
+    
+    def test_predict_alternating_models_uses_cache(self, client):
+        #Test predictions for two models do not reload either from S3
+        import src.cloud_api
+        for model_id in ['test_model_cache_a', 'test_model_cache_b']:
+            client.post('/models', json={
+                'model_id': model_id,
+                'data_path': 'data/iris_simple.csv'
+            })
+        downloads = src.cloud_api.s3.download_model.call_count
+        
+        for model_id in ['test_model_cache_a', 'test_model_cache_b'] * 2:
+            response = client.get(f'/models/{model_id}/predict')
+            assert response.status_code == 200
+        
+        assert src.cloud_api.s3.download_model.call_count == downloads
+        stats = json.loads(client.get('/health').data)['model_cache']
+        assert stats['hits'] >= 4
+        
+        # Deleting a model drops it from the cache
+        client.delete('/models/test_model_cache_a')
+        assert src.cloud_api.model_cache.get('test_model_cache_a') is None
+    
     def test_full_workflow(self, client, cloud_clients):
         #Test complete workflow with data consistency
         dynamodb, s3 = cloud_clients
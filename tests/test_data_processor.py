@@ -3,7 +3,7 @@
 import pytest
 import pandas as pd
 import numpy as np
-from src.data_processor import DataProcessor
+from src.data_processor import ChunkStream, DataProcessor
 
 class TestDataProcessor:
     
@@ -66,3 +66,171 @@ class TestDataProcessor:
         
         assert 0 <= train_acc <= 1
         assert 0 <= test_acc <= 1
+
+    def test_load_data_chunked(self, tmp_path):
+        """Test chunked loading applies a compact schema and stays re-iterable."""
+        path = tmp_path / 'data.csv'
+        dirty_data = self.sample_data.copy()
+        dirty_data.loc[0, 'feature1'] = np.nan
+        dirty_data.to_csv(path, index=False)
+        
+        stream = self.processor.load_data(path, chunksize=2)
+        X, y = self.processor.split_features_target(self.processor.clean_data(stream))
+        
+        X_chunks = list(X)
+        assert [len(chunk) for chunk in X_chunks] == [1, 2, 1]
+        assert all(dtype == np.float32 for dtype in X_chunks[0].dtypes)
+        assert str(next(iter(y)).dtype) == 'Int64'
+        # A second pass re-reads the file
+        assert sum(len(chunk) for chunk in y) == 4
+    
+    def test_chunked_target_beyond_sample_is_kept(self, tmp_path):
+        """Test a label outside the sampled range is not wrapped."""
+        path = tmp_path / 'data.csv'
+        pd.DataFrame({'feature1': [1.0, 2.0], 'target': [0, 300]}).to_csv(path, index=False)
+        
+        schema = self.processor.infer_schema(path, sample_rows=1)
+        stream = self.processor.load_data(path, chunksize=1, dtype=schema)
+        _, y = self.processor.split_features_target(stream)
+        
+        assert schema['target'] == 'Int64'
+        assert [int(value) for chunk in y for value in chunk] == [0, 300]
+    
+    def test_prepare_data_chunked_matches_in_memory(self, tmp_path):
+        """Test out-of-core scaling gives the same split as the in-memory path."""
+        path = tmp_path / 'data.csv'
+        self.sample_data.to_csv(path, index=False)
+        
+        X, y = self.processor.split_features_target(self.sample_data)
+        expected = DataProcessor().prepare_data(X, y)
+        
+        stream = self.processor.load_data(path, chunksize=2)
+        X_stream, y_stream = self.processor.split_features_target(stream)
+        X_train, X_test, y_train, y_test = self.processor.prepare_data(
+            X_stream, y_stream, mmap_path=str(tmp_path / 'scaled.npy'))
+        
+        assert X_train.dtype == np.float32
+        np.testing.assert_allclose(X_train, expected[0].to_numpy(), rtol=1e-5)
+        np.testing.assert_allclose(X_test, expected[1].to_numpy(), rtol=1e-5)
+        np.testing.assert_array_equal(y_train, expected[2].to_numpy())
+        np.testing.assert_array_equal(y_test, expected[3].to_numpy())
+        # Both halves are views of the one scaled matrix
+        assert X_train.base is X_test.base
+    
+    def test_prepare_data_chunked_reads_once_per_pass(self):
+        """Test the features and target of a chunk come from a single read."""
+        reads = []
+        
+        def source():
+            reads.append(1)
+            return (self.sample_data.iloc[i:i + 2] for i in range(0, len(self.sample_data), 2))
+        
+        X_stream, y_stream = self.processor.split_features_target(ChunkStream(source))
+        X_train, X_test, y_train, y_test = self.processor.prepare_data(X_stream, y_stream)
+        
+        assert len(reads) == 2
+        assert len(X_train) + len(X_test) == len(self.sample_data)
+    
+    def test_train_incremental(self):
+        """Test warm-start training keeps existing trees and adds new ones."""
+        X, y = self.processor.split_features_target(self.sample_data)
+        self.processor.train_model(X, y)
+        first_trees = list(self.processor.model.estimators_)
+        
+        accuracy = self.processor.train_incremental(X, y, n_new_estimators=5)
+        
+        assert 0 <= accuracy <= 1
+        assert len(self.processor.model.estimators_) == 15
+        assert self.processor.model.estimators_[:10] == first_trees
+    
+    def test_train_incremental_missing_class(self):
+        """Test incremental training rejects data without every known class."""
+        X, y = self.processor.split_features_target(self.sample_data)
+        self.processor.train_model(X, y)
+        
+        with pytest.raises(ValueError):
+            self.processor.train_incremental(X[y == 1], y[y == 1])
+    
+    @pytest.mark.parametrize('n_new_estimators', [0, -3, 2.5, '5', True])
+    def test_train_incremental_rejects_bad_tree_counts(self, n_new_estimators):
+        """Test the number of new trees must be a positive integer."""
+        X, y = self.processor.split_features_target(self.sample_data)
+        self.processor.train_model(X, y)
+        
+        with pytest.raises(ValueError):
+            self.processor.train_incremental(X, y, n_new_estimators=n_new_estimators)
+        assert len(self.processor.model.estimators_) == 10
+    
+    def test_sweep_halving(self):
+        """Test successive halving ranks candidates and keeps the best model."""
+        X, y = self.processor.split_features_target(self.sample_data)
+        X_train, X_test, y_train, y_test = self.processor.prepare_data(X, y)
+        
+        leaderboard = self.processor.sweep(
+            X_train, y_train, X_test, y_test,
+            param_grid={'n_estimators': [3, 5, 7], 'max_depth': [1, 2]},
+            strategy='halving', n_jobs=2
+        )
+        
+        assert len(leaderboard) == 6
+        assert [r['rank'] for r in leaderboard] == list(range(1, 7))
+        best = leaderboard[0]['params']
+        assert self.processor.model.n_estimators == best['n_estimators']
+        assert self.processor.model.max_depth == best['max_depth']
+    
+    def test_sweep_grid_keeps_winning_fit(self):
+        """Test a grid sweep keeps the winner's full-data fit as the model."""
+        X, y = self.processor.split_features_target(self.sample_data)
+        X_train, X_test, y_train, y_test = self.processor.prepare_data(X, y)
+        
+        leaderboard = self.processor.sweep(
+            X_train, y_train, X_test, y_test,
+            param_grid={'n_estimators': [3, 5]}, n_jobs=2
+        )
+        
+        assert 'model_path' not in leaderboard[0]
+        assert len(self.processor.model.estimators_) == leaderboard[0]['params']['n_estimators']
+        assert self.processor.model.score(X_test, y_test) == leaderboard[0]['score']
+    
+    def test_export_pipeline_predicts_without_refit(self):
+        """Test a restored pipeline predicts with the training-time scaler."""
+        X, y = self.processor.split_features_target(self.sample_data)
+        X_train, X_test, y_train, y_test = self.processor.prepare_data(X, y)
+        self.processor.train_model(X_train, y_train)
+        expected = self.processor.model.predict(X_test)
+        
+        restored = DataProcessor()
+        restored.load_artifact(self.processor.export_pipeline())
+        raw_train, raw_test, _, _ = restored.split_data(X, y)
+        
+        assert restored.feature_names == ['feature1', 'feature2']
+        # Columns are reordered to the training order before scaling
+        np.testing.assert_array_equal(restored.predict(raw_test[['feature2', 'feature1']]), expected)
+        np.testing.assert_allclose(restored.scaler.mean_, self.processor.scaler.mean_)
+    
+    def test_predict_recompiles_after_incremental_training(self):
+        """Test the compiled forest follows the model when trees are added."""
+        X, y = self.processor.split_features_target(self.sample_data)
+        self.processor.prepare_data(X, y)
+        X_scaled = self.processor.transform(X)
+        self.processor.train_model(X_scaled, y)
+        self.processor.predict(X)
+        
+        self.processor.train_incremental(X_scaled, y, n_new_estimators=5)
+        
+        assert self.processor.compiled_model().n_trees == 15
+        np.testing.assert_array_equal(self.processor.predict(X), self.processor.model.predict(X_scaled))
+    
+    def test_predict_follows_refit_of_same_model(self):
+        """Test refitting the same estimator in place recompiles the flat forest."""
+        X, y = self.processor.split_features_target(self.sample_data)
+        self.processor.prepare_data(X, y)
+        X_scaled = self.processor.transform(X)
+        self.processor.train_model(X_scaled, y)
+        self.processor.predict(X)
+        
+        flipped = 1 - y
+        self.processor.train_model(X_scaled, flipped)
+        
+        np.testing.assert_array_equal(self.processor.predict(X), self.processor.model.predict(X_scaled))
+        np.testing.assert_array_equal(self.processor.predict(X), flipped)
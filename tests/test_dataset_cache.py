@@ -0,0 +1,85 @@
+"""Tests for DatasetCache."""
+
+import os
+import shutil
+import pandas as pd
+import numpy as np
+from src.data_processor import DataProcessor
+from src.dataset_cache import DatasetCache
+
+class TestDatasetCache:
+    
+    def setup_method(self):
+        self.sample_data = pd.DataFrame({
+            'feature1': [1.5, 2.5, np.nan, 4.5],
+            'label': ['a', None, 'b', 'c'],
+            'target': [0, 1, 1, 0]
+        })
+    
+    def test_hit_after_miss_returns_same_frame(self, tmp_path):
+        """Test the second load is served from the columnar copy."""
+        path = tmp_path / 'data.csv'
+        self.sample_data.to_csv(path, index=False)
+        cache = DatasetCache(cache_dir=str(tmp_path / 'cache'))
+        
+        first = cache.load(path)
+        second = cache.load(path)
+        
+        pd.testing.assert_frame_equal(first, pd.read_csv(path))
+        pd.testing.assert_frame_equal(second, pd.read_csv(path))
+        assert cache.stats()['misses'] == 1
+        assert cache.stats()['hits'] == 1
+    
+    def test_modified_file_is_reparsed(self, tmp_path):
+        """Test the fingerprint changes with file contents."""
+        path = tmp_path / 'data.csv'
+        self.sample_data.to_csv(path, index=False)
+        cache = DatasetCache(cache_dir=str(tmp_path / 'cache'))
+        cache.load(path)
+        
+        self.sample_data.head(2).to_csv(path, index=False)
+        os.utime(path, ns=(0, 0))
+        
+        assert len(cache.load(path)) == 2
+        assert cache.stats()['misses'] == 2
+    
+    def test_lru_eviction(self, tmp_path):
+        """Test entries beyond the byte budget are evicted oldest first."""
+        cache = DatasetCache(cache_dir=str(tmp_path / 'cache'), max_bytes=1)
+        for name in ['a.csv', 'b.csv']:
+            self.sample_data.to_csv(tmp_path / name, index=False)
+            cache.load(tmp_path / name)
+        
+        stats = cache.stats()
+        assert stats['entries'] == 1
+        assert stats['evictions'] == 1
+    
+    def test_processor_uses_cache(self, tmp_path):
+        """Test DataProcessor.load_data reads through the cache."""
+        cache = DatasetCache(cache_dir=str(tmp_path / 'cache'))
+        processor = DataProcessor(dataset_cache=cache)
+        
+        processor.load_data('data/iris_simple.csv')
+        data = processor.load_data('data/iris_simple.csv', usecols=['target'])
+        
+        assert list(data.columns) == ['target']
+        assert cache.stats()['hits'] == 1
+    
+    def test_entry_evicted_during_hit_is_a_miss(self, tmp_path, monkeypatch):
+        """Test an entry removed right after its size was read is parsed again."""
+        path = tmp_path / 'data.csv'
+        self.sample_data.to_csv(path, index=False)
+        cache = DatasetCache(cache_dir=str(tmp_path / 'cache'))
+        cache.load(path)
+        entry_size = cache._entry_size
+        
+        def size_then_evict(manifest_path):
+            size = entry_size(manifest_path)
+            shutil.rmtree(os.path.dirname(manifest_path))
+            return size
+        
+        monkeypatch.setattr(cache, '_entry_size', size_then_evict)
+        
+        pd.testing.assert_frame_equal(cache.load(path), pd.read_csv(path))
+        assert cache.stats()['misses'] == 2
+        assert cache.stats()['hits'] == 0
@@ -0,0 +1,443 @@
+"""Tests for DynamoDBClient query planning against a mocked table."""
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+from unittest.mock import MagicMock
+import pytest
+from boto3.dynamodb.conditions import Attr, Key
+from botocore.exceptions import ClientError
+from src.cloud.dynamodb_client import (
+    BACKFILL_TAG,
+    CREATED_BUCKET_INDEX,
+    MODEL_TYPE_INDEX,
+    DynamoDBClient,
+    ModelAlreadyExistsError,
+    ModelNotFoundError,
+    build_filter_expression
+)
+
+
+class TestDynamoDBClient:
+    
+    @pytest.fixture(autouse=True)
+    def mock_resource(self, monkeypatch):
+        self.resource = MagicMock()
+        self.table = self.resource.Table.return_value
+        monkeypatch.setattr('src.cloud.dynamodb_client.boto3.resource',
+                            lambda *args, **kwargs: self.resource)
+    
+    def test_range_filters_use_typed_comparisons(self):
+        """Test accuracy and date filters become >= / > conditions."""
+        expression = build_filter_expression({
+            'accuracy_threshold': '0.85',
+            'created_after': '2024-01-01T00:00:00+02:00'
+        })
+        
+        assert expression == (Attr('test_accuracy').gte(Decimal('0.85'))
+                              & Attr('created_at').gt('2023-12-31T22:00:00'))
+    
+    def test_created_after_accepts_z_suffix(self):
+        """Test a trailing Z is read as UTC, as in the README example."""
+        assert build_filter_expression({'created_after': '2024-01-01T00:00:00Z'}) == \
+            Attr('created_at').gt('2024-01-01T00:00:00')
+    
+    def test_other_filters_are_equality(self):
+        """Test unknown keys fall back to an equality match."""
+        assert build_filter_expression({'model_type': 'RandomForest'}) == Attr('model_type').eq('RandomForest')
+        assert build_filter_expression({}) is None
+    
+    @pytest.mark.parametrize('filters', [{'accuracy_threshold': 'high'},
+                                         {'accuracy_threshold': 'nan'},
+                                         {'created_after': 'yesterday'}])
+    def test_malformed_values_raise_value_error(self, filters):
+        """Test bad filter values are rejected before querying."""
+        with pytest.raises(ValueError):
+            DynamoDBClient().query_models(**filters)
+    
+    def test_query_follows_every_page(self):
+        """Test results past the first scan page are not dropped."""
+        self.table.scan.side_effect = [
+            {'Items': [{'model_id': 'a', 'test_accuracy': Decimal('0.9')}], 'LastEvaluatedKey': {'model_id': 'a'}},
+            {'Items': [], 'LastEvaluatedKey': {'model_id': 'b'}},
+            {'Items': [{'model_id': 'c', 'test_accuracy': Decimal('0.95')}]}
+        ]
+        
+        models = DynamoDBClient().query_models(accuracy_threshold=0.85)
+        
+        assert [m['model_id'] for m in models] == ['a', 'c']
+        assert models[0]['test_accuracy'] == 0.9
+        calls = self.table.scan.call_args_list
+        assert 'ExclusiveStartKey' not in calls[0].kwargs
+        assert calls[2].kwargs['ExclusiveStartKey'] == {'model_id': 'b'}
+        assert all(call.kwargs['FilterExpression'] == Attr('test_accuracy').gte(Decimal('0.85'))
+                   for call in calls)
+    
+    def _activate_indexes(self, *names, backfilled=True):
+        self.table.global_secondary_indexes = [{'IndexName': name, 'IndexStatus': 'ACTIVE'} for name in names]
+        self.resource.meta.client.list_tags_of_resource.return_value = {
+            'Tags': [BACKFILL_TAG] if backfilled else []}
+    
+    def test_model_type_filter_queries_index(self):
+        """Test model_type (and created_after) become a key condition on the type index."""
+        self._activate_indexes(MODEL_TYPE_INDEX, CREATED_BUCKET_INDEX)
+        self.table.query.return_value = {'Items': [{'model_id': 'a'}]}
+        
+        models = DynamoDBClient().query_models(model_type='RandomForest', created_after='2024-01-01',
+                                               accuracy_threshold='0.8')
+        
+        assert [m['model_id'] for m in models] == ['a']
+        self.table.scan.assert_not_called()
+        request = self.table.query.call_args.kwargs
+        assert request['IndexName'] == MODEL_TYPE_INDEX
+        assert request['KeyConditionExpression'] == (Key('model_type').eq('RandomForest')
+                                                     & Key('created_at').gt('2024-01-01T00:00:00'))
+        assert request['FilterExpression'] == Attr('test_accuracy').gte(Decimal('0.8'))
+    
+    def test_created_after_queries_each_month_bucket(self):
+        """Test a recent created_after queries one bucket per month up to now."""
+        self._activate_indexes(MODEL_TYPE_INDEX, CREATED_BUCKET_INDEX)
+        self.table.query.return_value = {'Items': []}
+        start = (datetime.utcnow() - timedelta(days=40)).replace(day=15)
+        
+        DynamoDBClient().query_models(created_after=start.isoformat())
+        
+        months = sorted({(start + timedelta(days=day)).strftime('%Y-%m')
+                         for day in range((datetime.utcnow() - start).days + 1)})
+        assert [call.kwargs['KeyConditionExpression'] for call in self.table.query.call_args_list] == [
+            Key('created_bucket').eq(month) & Key('created_at').gt(start.isoformat()) for month in months
+        ]
+        self.table.scan.assert_not_called()
+    
+    def test_scans_without_usable_index(self):
+        """Test old date ranges and indexes still building fall back to a scan."""
+        self.table.global_secondary_indexes = [{'IndexName': MODEL_TYPE_INDEX, 'IndexStatus': 'CREATING'}]
+        self.table.scan.return_value = {'Items': []}
+        client = DynamoDBClient()
+        
+        client.query_models(model_type='RandomForest')
+        client.active_indexes = {CREATED_BUCKET_INDEX}
+        client.query_models(created_after='2001-01-01')
+        
+        assert self.table.scan.call_count == 2
+        self.table.query.assert_not_called()
+    
+    def test_created_after_scans_until_backfill_is_recorded(self):
+        """Test the bucket index is only queried once the table carries the backfill tag."""
+        self._activate_indexes(MODEL_TYPE_INDEX, CREATED_BUCKET_INDEX, backfilled=False)
+        self.table.scan.return_value = {'Items': []}
+        client = DynamoDBClient()
+        recent = datetime.utcnow().isoformat()
+        
+        client.query_models(created_after=recent)
+        self.table.query.assert_not_called()
+        
+        client.mark_backfill_complete()
+        self.table.query.return_value = {'Items': []}
+        client.query_models(created_after=recent)
+        
+        assert self.resource.meta.client.tag_resource.call_args.kwargs['Tags'] == [BACKFILL_TAG]
+        assert self.table.scan.call_count == 1
+        assert self.table.query.called
+    
+    def test_unreadable_tags_fall_back_to_scan(self):
+        """Test an AccessDenied on the tags leaves construction working."""
+        self._activate_indexes(MODEL_TYPE_INDEX, CREATED_BUCKET_INDEX)
+        self.resource.meta.client.list_tags_of_resource.side_effect = ClientError(
+            {'Error': {'Code': 'AccessDeniedException'}}, 'ListTagsOfResource')
+        
+        assert not DynamoDBClient().created_bucket_backfilled
+    
+    def test_existing_table_gets_one_missing_index(self):
+        """Test the migration requests one GSI per run and skips while one builds."""
+        self._activate_indexes(MODEL_TYPE_INDEX)
+        client = DynamoDBClient()
+        self.resource.meta.client.update_table.assert_not_called()
+        
+        assert client.create_missing_index() == CREATED_BUCKET_INDEX
+        update = self.resource.meta.client.update_table.call_args.kwargs
+        assert [u['Create']['IndexName'] for u in update['GlobalSecondaryIndexUpdates']] == [CREATED_BUCKET_INDEX]
+        
+        self.resource.meta.client.update_table.reset_mock()
+        self.table.global_secondary_indexes = [{'IndexName': MODEL_TYPE_INDEX, 'IndexStatus': 'CREATING'}]
+        assert DynamoDBClient().create_missing_index() is None
+        self.resource.meta.client.update_table.assert_not_called()
+    
+    def test_backfill_sets_created_bucket(self):
+        """Test legacy items get the month bucket the index needs."""
+        self.table.scan.return_value = {'Items': [{'model_id': 'old', 'created_at': '2023-05-02T10:00:00'}]}
+        
+        assert DynamoDBClient().backfill_created_buckets() == 1
+        update = self.table.update_item.call_args.kwargs
+        assert update['Key'] == {'model_id': 'old'}
+        assert update['ExpressionAttributeValues'] == {':bucket': '2023-05'}
+    
+    def test_create_model_writes_created_bucket(self):
+        """Test new items carry their month bucket."""
+        self.table.get_item.return_value = {}
+        
+        item = DynamoDBClient().create_model('m1', {'model_type': 'RandomForest'})
+        
+        assert item['created_bucket'] == item['created_at'][:7]
+    
+    def test_page_stops_at_limit_and_resumes_from_cursor(self):
+        """Test a page reads only until limit items, and its cursor continues there."""
+        self.table.scan.side_effect = [
+            {'Items': [{'model_id': 'a'}], 'LastEvaluatedKey': {'model_id': 'a'}},
+            {'Items': [{'model_id': 'b'}], 'LastEvaluatedKey': {'model_id': 'b'}},
+            {'Items': [{'model_id': 'c'}]}
+        ]
+        client = DynamoDBClient()
+        
+        first = client.query_models_page({'model_type': 'RandomForest'}, limit=2)
+        assert [m['model_id'] for m in first] == ['a', 'b']
+        assert [call.kwargs['Limit'] for call in self.table.scan.call_args_list] == [2, 1]
+        assert first.next_cursor is not None
+        
+        second = client.query_models_page({'model_type': 'RandomForest'}, limit=2, cursor=first.next_cursor)
+        assert [m['model_id'] for m in second] == ['c']
+        assert self.table.scan.call_args.kwargs['ExclusiveStartKey'] == {'model_id': 'b'}
+        assert second.next_cursor is None
+    
+    def test_page_reads_lazily(self):
+        """Test nothing is read from DynamoDB until the page is iterated."""
+        DynamoDBClient().query_models_page({'model_type': 'RandomForest'})
+        
+        self.table.scan.assert_not_called()
+    
+    def test_cursor_from_other_query_is_rejected(self):
+        """Test cursors are bound to the filters that issued them."""
+        self.table.scan.return_value = {'Items': [{'model_id': 'a'}], 'LastEvaluatedKey': {'model_id': 'a'}}
+        client = DynamoDBClient()
+        page = client.query_models_page({'model_type': 'RandomForest'}, limit=1)
+        list(page)
+        
+        with pytest.raises(ValueError, match='does not match'):
+            client.query_models_page({'model_type': 'SVM'}, cursor=page.next_cursor)
+        with pytest.raises(ValueError, match='Invalid cursor'):
+            client.query_models_page({'model_type': 'RandomForest'}, cursor='not-a-cursor')
+    
+    def test_fields_become_projection(self):
+        """Test requested fields are projected through attribute-name placeholders."""
+        self.table.scan.return_value = {'Items': []}
+        
+        list(DynamoDBClient().query_models_page({'model_type': 'RandomForest'}, fields=['name', 'test_accuracy']))
+        
+        request = self.table.scan.call_args.kwargs
+        assert request['ProjectionExpression'] == '#f0, #f1, #f2'
+        assert request['ExpressionAttributeNames'] == {'#f0': 'model_id', '#f1': 'name', '#f2': 'test_accuracy'}
+    
+    @pytest.mark.parametrize('kwargs', [{'limit': 0}, {'limit': 5000}, {'fields': ['bad-name']}])
+    def test_invalid_page_arguments(self, kwargs):
+        """Test out-of-range limits and malformed field names."""
+        with pytest.raises(ValueError):
+            DynamoDBClient().query_models_page({'model_type': 'RandomForest'}, **kwargs)
+    
+    def _condition_failed(self, item=None):
+        response = {'Error': {'Code': 'ConditionalCheckFailedException'}}
+        if item:
+            response['Item'] = item
+        return ClientError(response, 'PutItem')
+    
+    def test_create_is_one_conditional_put(self):
+        """Test create_model writes without a prior read, guarded by attribute_not_exists."""
+        DynamoDBClient().create_model('m1', {'model_type': 'RandomForest'})
+        
+        self.table.get_item.assert_not_called()
+        assert self.table.put_item.call_args.kwargs['ConditionExpression'] == Attr('model_id').not_exists()
+    
+    def test_create_duplicate_raises_with_existing_item(self):
+        """Test a failed condition reports the item that is already there."""
+        self.table.put_item.side_effect = self._condition_failed(
+            {'model_id': {'S': 'm1'}, 'test_accuracy': {'N': '0.9'}}
+        )
+        
+        with pytest.raises(ModelAlreadyExistsError) as excinfo:
+            DynamoDBClient().create_model('m1', {'model_type': 'RandomForest'})
+        assert excinfo.value.existing == {'model_id': 'm1', 'test_accuracy': 0.9}
+    
+    @pytest.mark.parametrize('operation', ['update_model', 'delete_model'])
+    def test_missing_model_raises_not_found(self, operation):
+        """Test update and delete rely on attribute_exists instead of a read."""
+        getattr(self.table, operation.replace('model', 'item')).side_effect = self._condition_failed()
+        client = DynamoDBClient()
+        
+        with pytest.raises(ModelNotFoundError):
+            if operation == 'update_model':
+                client.update_model('missing', {'notes': 'x'})
+            else:
+                client.delete_model('missing')
+        self.table.get_item.assert_not_called()
+    
+    def test_get_model_is_read_through(self):
+        """Test repeated reads are served from the cache until the TTL expires."""
+        self.table.get_item.return_value = {'Item': {'model_id': 'm1', 'test_accuracy': Decimal('0.9')}}
+        client = DynamoDBClient(cache_ttl=60)
+        
+        first = client.get_model('m1')
+        first['test_accuracy'] = 0.1
+        assert client.get_model('m1') == {'model_id': 'm1', 'test_accuracy': 0.9}
+        assert self.table.get_item.call_count == 1
+        
+        client.cache_ttl = 0
+        client.invalidate('m1')
+        client.get_model('m1')
+        client.get_model('m1')
+        assert self.table.get_item.call_count == 3
+        stats = client.cache_stats()
+        assert stats['hits'] == 1 and stats['misses'] == 3 and stats['expirations'] == 1
+        assert stats['hit_ratio'] == pytest.approx(1 / 4)
+    
+    def test_missing_model_is_negatively_cached(self):
+        """Test a missing ID is remembered for the negative TTL."""
+        self.table.get_item.return_value = {}
+        client = DynamoDBClient(negative_cache_ttl=60)
+        
+        assert client.get_model('missing') is None
+        assert client.get_model('missing') is None
+        assert self.table.get_item.call_count == 1
+        assert client.cache_stats()['negative_hits'] == 1
+    
+    @pytest.mark.parametrize('operation', ['create_model', 'update_model', 'delete_model'])
+    def test_writes_invalidate_cached_item(self, operation):
+        """Test every write drops the cached item, including failed conditional writes."""
+        self.table.get_item.return_value = {}
+        self.table.update_item.return_value = {'Attributes': {'model_id': 'm1'}}
+        client = DynamoDBClient(negative_cache_ttl=60)
+        client.get_model('m1')
+        
+        if operation == 'create_model':
+            client.create_model('m1', {'model_type': 'RandomForest'})
+        elif operation == 'update_model':
+            client.update_model('m1', {'notes': 'x'})
+        else:
+            client.delete_model('m1')
+        client.get_model('m1')
+        
+        assert self.table.get_item.call_count == 2
+        assert client.cache_stats()['invalidations'] == 1
+    
+    def test_read_racing_a_write_is_not_cached(self):
+        """Test a read that started before an invalidation does not repopulate the cache."""
+        client = DynamoDBClient(cache_ttl=60)
+        
+        def stale_read(**kwargs):
+            client.invalidate('m1')
+            return {'Item': {'model_id': 'm1', 'version': 'old'}}
+        self.table.get_item.side_effect = stale_read
+        client.get_model('m1')
+        
+        assert client.cache_stats()['entries'] == 0
+    
+    def test_read_bookkeeping_is_pruned(self):
+        """Test finished or failed reads leave no per-ID generation behind."""
+        client = DynamoDBClient(cache_ttl=60, cache_max_entries=0)
+        
+        def stale_read(**kwargs):
+            client.invalidate('m1')
+            return {'Item': {'model_id': 'm1'}}
+        self.table.get_item.side_effect = stale_read
+        client.get_model('m1')
+        self.resource.batch_get_item.side_effect = Exception('throttled')
+        with pytest.raises(Exception):
+            client.get_models(['m2', 'm3'])
+        client.invalidate('m4')
+        
+        assert client._generations == {} and client._reads_in_flight == {}
+        assert client.cache_max_entries == 0
+    
+    def test_get_models_batches_and_keeps_order(self):
+        """Test get_models reads 100 keys per batch_get_item and returns input order."""
+        ids = [f'm{i}' for i in range(150)]
+        self.resource.batch_get_item.side_effect = lambda RequestItems: {'Responses': {'ml-models': [
+            {'model_id': key['model_id']} for key in reversed(RequestItems['ml-models']['Keys'])
+            if key['model_id'] != 'm7'
+        ]}}
+        
+        models = DynamoDBClient().get_models(ids + ['m3'])
+        
+        assert [len(call.kwargs['RequestItems']['ml-models']['Keys'])
+                for call in self.resource.batch_get_item.call_args_list] == [100, 50]
+        assert [model and model['model_id'] for model in models] == \
+            [None if model_id == 'm7' else model_id for model_id in ids + ['m3']]
+    
+    def test_get_models_retries_unprocessed_keys(self, monkeypatch):
+        """Test throttled keys are requested again after a backoff."""
+        sleeps = []
+        monkeypatch.setattr('src.cloud.dynamodb_client.time.sleep', sleeps.append)
+        self.resource.batch_get_item.side_effect = [
+            {'Responses': {'ml-models': [{'model_id': 'a'}]},
+             'UnprocessedKeys': {'ml-models': {'Keys': [{'model_id': 'b'}]}}},
+            {'Responses': {'ml-models': [{'model_id': 'b'}]}}
+        ]
+        
+        models = DynamoDBClient().get_models(['a', 'b'])
+        
+        assert [model['model_id'] for model in models] == ['a', 'b']
+        assert self.resource.batch_get_item.call_args.kwargs['RequestItems'] == \
+            {'ml-models': {'Keys': [{'model_id': 'b'}]}}
+        assert len(sleeps) == 1
+    
+    def test_get_models_uses_cache(self):
+        """Test IDs already cached by get_model are not requested again."""
+        self.table.get_item.return_value = {'Item': {'model_id': 'a'}}
+        self.resource.batch_get_item.return_value = {'Responses': {'ml-models': [{'model_id': 'b'}]}}
+        client = DynamoDBClient(cache_ttl=60)
+        client.get_model('a')
+        
+        assert [model['model_id'] for model in client.get_models(['a', 'b'])] == ['a', 'b']
+        assert self.resource.batch_get_item.call_args.kwargs['RequestItems'] == \
+            {'ml-models': {'Keys': [{'model_id': 'b'}]}}
+    
+    def test_bulk_create_is_conditional_per_model(self):
+        """Test create_models never overwrites an existing ID and reports it per model."""
+        def put_item(Item, **kwargs):
+            assert kwargs['ConditionExpression'] == Attr('model_id').not_exists()
+            if Item['model_id'] == 'taken':
+                raise ClientError({'Error': {'Code': 'ConditionalCheckFailedException'},
+                                   'Item': {'model_id': {'S': 'taken'}}}, 'PutItem')
+        self.table.put_item.side_effect = put_item
+        
+        outcomes = DynamoDBClient().create_models({'a': {'test_accuracy': 0.5}, 'taken': {}, 'b': {}})
+        
+        assert list(outcomes) == ['a', 'taken', 'b']
+        assert outcomes['a']['test_accuracy'] == Decimal('0.5')
+        assert isinstance(outcomes['taken'], ModelAlreadyExistsError)
+        assert outcomes['taken'].existing == {'model_id': 'taken'}
+        self.table.batch_writer.assert_not_called()
+    
+    def test_bulk_writes_invalidate_the_cache(self):
+        """Test create_models and delete_models drop cached lookups; deletes are batched."""
+        batch = self.table.batch_writer.return_value.__enter__.return_value
+        self.table.get_item.return_value = {}
+        client = DynamoDBClient(negative_cache_ttl=60)
+        client.get_model('a')
+        
+        client.create_models({'a': {}, 'b': {}})
+        assert client.cache_stats()['entries'] == 0
+        client.get_model('a')
+        client.delete_models(['a', 'a', 'c'])
+        
+        assert [call.kwargs['Key'] for call in batch.delete_item.call_args_list] == \
+            [{'model_id': 'a'}, {'model_id': 'c'}]
+        assert client.cache_stats()['entries'] == 0
+    
+    def test_update_can_be_undone(self):
+        """Test return_previous hands back the old item and restore_model writes it back."""
+        self.table.update_item.return_value = {'Attributes': {
+            'model_id': 'm1', 'test_accuracy': Decimal('0.8'), 'updated_at': 't0'
+        }}
+        client = DynamoDBClient()
+        
+        updated, previous = client.update_model('m1', {'test_accuracy': 0.9, 'retrain_mode': 'full'},
+                                                return_previous=True)
+        assert self.table.update_item.call_args.kwargs['ReturnValues'] == 'ALL_OLD'
+        assert updated['test_accuracy'] == 0.9 and updated['retrain_mode'] == 'full'
+        assert previous['test_accuracy'] == 0.8
+        
+        client.restore_model('m1', previous, ['test_accuracy', 'retrain_mode', 'updated_at'])
+        kwargs = self.table.update_item.call_args.kwargs
+        assert kwargs['UpdateExpression'] == 'SET #a0 = :a0, #a2 = :a2 REMOVE #a1'
+        assert kwargs['ExpressionAttributeNames'] == {
+            '#a0': 'test_accuracy', '#a1': 'retrain_mode', '#a2': 'updated_at'
+        }
+        assert kwargs['ExpressionAttributeValues'] == {':a0': Decimal('0.8'), ':a2': 't0'}
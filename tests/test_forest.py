@@ -0,0 +1,32 @@
+"""Tests for FlatForest."""
+
+import numpy as np
+from sklearn.datasets import make_classification
+from sklearn.ensemble import RandomForestClassifier
+from src.forest import FlatForest
+
+class TestFlatForest:
+    
+    def setup_method(self):
+        X, y = make_classification(n_samples=300, n_features=6, n_informative=4,
+                                   n_classes=3, random_state=0)
+        self.X = X
+        self.forest = RandomForestClassifier(n_estimators=15, random_state=0).fit(X, y)
+        self.flat = FlatForest.from_sklearn(self.forest)
+    
+    def test_matches_sklearn(self):
+        """Test probabilities and labels are identical to scikit-learn."""
+        X_new = np.random.default_rng(1).normal(size=(500, 6))
+        
+        np.testing.assert_array_equal(self.flat.predict_proba(X_new), self.forest.predict_proba(X_new))
+        np.testing.assert_array_equal(self.flat.predict(X_new), self.forest.predict(X_new))
+    
+    def test_single_row(self):
+        """Test a one-row batch."""
+        np.testing.assert_array_equal(self.flat.predict(self.X[:1]), self.forest.predict(self.X[:1]))
+    
+    def test_arrays_round_trip(self):
+        """Test a forest rebuilt from its arrays predicts the same."""
+        restored = FlatForest.from_arrays(self.flat.to_arrays())
+        
+        np.testing.assert_array_equal(restored.predict_proba(self.X), self.flat.predict_proba(self.X))
@@ -0,0 +1,124 @@
+"""Tests for the background job queue."""
+
+import queue
+import time
+import pytest
+from datetime import datetime
+from src.jobs import CANCELLED, FAILED, QUEUED, SUCCEEDED, JobQueue, _timestamp, process_context
+
+
+def add(a, b, progress):
+    progress(0.5, "Adding")
+    return a + b
+
+
+def fail(progress):
+    raise ValueError("bad input")
+
+
+def sleep(seconds, progress):
+    time.sleep(seconds)
+    return seconds
+
+
+def append_line(path, line, progress):
+    with open(path, 'a') as f:
+        f.write(line + '\n')
+
+
+class TestJobQueue:
+    
+    def setup_method(self):
+        self.jobs = JobQueue(max_workers=1, max_queued=3)
+    
+    def teardown_method(self):
+        self.jobs.shutdown()
+    
+    def test_job_result_and_timings(self):
+        """Test a job runs in a worker and reports its result and timings."""
+        job = self.jobs.submit(add, 2, 3)
+        
+        self.jobs.wait(job.id, timeout=30)
+        data = job.to_dict()
+        assert data['status'] == SUCCEEDED
+        assert data['result'] == 5
+        assert data['progress'] == 1.0
+        assert data['message'] == "Adding"
+        assert data['run_seconds'] >= 0 and data['started_at'] and data['finished_at']
+    
+    def test_on_success_turns_result_into_job_result(self):
+        """Test on_success runs in this process with the worker's return value."""
+        seen = []
+        job = self.jobs.submit(add, 1, 1, on_success=lambda result: seen.append(result) or {'sum': result})
+        
+        self.jobs.wait(job.id, timeout=30)
+        assert seen == [2]
+        assert job.result == {'sum': 2}
+    
+    def test_failed_job_reports_error(self):
+        """Test exceptions in the worker and in on_success fail the job."""
+        failed = self.jobs.submit(fail)
+        rejected = self.jobs.submit(add, 1, 1, on_success=lambda result: 1 / 0)
+        
+        assert self.jobs.wait(failed.id, timeout=30).to_dict()['error'] == "ValueError: bad input"
+        assert self.jobs.wait(rejected.id, timeout=30).status == FAILED
+        assert 'ZeroDivisionError' in rejected.error
+    
+    def test_higher_priority_starts_first(self, tmp_path):
+        """Test queued jobs start by priority, then submission order."""
+        path = str(tmp_path / 'order.txt')
+        self.jobs.submit(sleep, 0.5)
+        low = self.jobs.submit(append_line, path, 'low')
+        high = self.jobs.submit(append_line, path, 'high', priority=5)
+        
+        self.jobs.wait(low.id, timeout=30)
+        self.jobs.wait(high.id, timeout=30)
+        with open(path) as f:
+            assert f.read().split() == ['high', 'low']
+    
+    def test_cancel_queued_and_running_jobs(self):
+        """Test cancelling skips a queued job and terminates a running one."""
+        running = self.jobs.submit(sleep, 60)
+        queued = self.jobs.submit(add, 1, 2)
+        while running.status == QUEUED:
+            time.sleep(0.01)
+        
+        assert self.jobs.cancel(queued.id)
+        assert self.jobs.cancel(running.id)
+        start = time.monotonic()
+        self.jobs.wait(running.id, timeout=30)
+        assert running.status == CANCELLED and queued.status == CANCELLED
+        assert time.monotonic() - start < 10
+        assert not self.jobs.cancel(running.id)
+        
+        # The worker slot is free again
+        assert self.jobs.wait(self.jobs.submit(add, 1, 2).id, timeout=30).result == 3
+    
+    def test_full_queue_rejects_submissions(self):
+        """Test at most max_queued jobs wait at once."""
+        self.jobs.submit(sleep, 60)
+        while self.jobs.stats()['running'] == 0:
+            time.sleep(0.01)
+        for _ in range(3):
+            self.jobs.submit(add, 1, 2)
+        
+        with pytest.raises(queue.Full):
+            self.jobs.submit(add, 1, 2)
+    
+    def test_failed_worker_start_fails_only_that_job(self):
+        """Test a job whose worker cannot start fails and frees its slot."""
+        broken = self.jobs.submit(add, lambda: None, 1)
+        
+        assert self.jobs.wait(broken.id, timeout=30).status == FAILED
+        assert 'Failed to start worker' in broken.error
+        assert self.jobs.wait(self.jobs.submit(add, 1, 2).id, timeout=30).result == 3
+    
+    def test_workers_are_not_forked_from_the_server(self):
+        """Test workers start from a fork server or are spawned, never forked directly."""
+        assert process_context().get_start_method() in ('forkserver', 'spawn')
+    
+    def test_timestamps_are_naive_utc(self):
+        """Test job times are reported in UTC without an offset."""
+        assert _timestamp(86400) == '1970-01-02T00:00:00'
+        assert _timestamp(None) is None
+        assert abs(datetime.fromisoformat(_timestamp(time.time())) - datetime.utcnow()).total_seconds() < 5
@@ -0,0 +1,115 @@
+"""Tests for ModelCache."""
+
+import numpy as np
+from src.model_cache import ModelCache, estimate_nbytes
+
+class TestModelCache:
+    
+    def test_lru_eviction_by_count(self):
+        """Test the least recently used entry goes first."""
+        cache = ModelCache(max_entries=2, max_bytes=10 ** 9)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')
+        cache.put('c', 3)
+        
+        assert cache.get('a') == 1
+        assert cache.get('b') is None
+        assert cache.stats()['evictions'] == 1
+    
+    def test_eviction_by_bytes(self):
+        """Test the byte budget bounds the cache."""
+        cache = ModelCache(max_entries=10, max_bytes=1500)
+        cache.put('a', np.zeros(100))
+        cache.put('b', np.zeros(100))
+        
+        stats = cache.stats()
+        assert stats['entries'] == 1
+        assert stats['bytes'] == 800
+    
+    def test_on_evict_reports_keys_that_leave(self):
+        """Test the eviction hook fires for evictions and invalidations, not replacements."""
+        evicted = []
+        cache = ModelCache(max_entries=2, max_bytes=10 ** 9, on_evict=evicted.append)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.put('a', 3)
+        cache.put('c', 4)
+        cache.invalidate('a')
+        
+        assert evicted == ['b', 'a']
+    
+    def test_invalidate_and_stats(self):
+        """Test invalidation and hit/miss counters."""
+        cache = ModelCache(max_entries=2, max_bytes=10 ** 9)
+        cache.put('a', 1, nbytes=10)
+        cache.get('a')
+        cache.invalidate('a')
+        cache.get('a')
+        
+        stats = cache.stats()
+        assert (stats['hits'], stats['misses'], stats['entries'], stats['bytes']) == (1, 1, 0, 0)
+    
+    def test_estimate_counts_shared_arrays_once(self):
+        """Test the size estimate sums nested arrays without double counting."""
+        array = np.zeros(1000)
+        
+        assert estimate_nbytes({'x': array, 'y': [array]}) < 2 * array.nbytes
+        assert estimate_nbytes({'x': array}) >= array.nbytes
+    
+    def test_concurrent_misses_share_one_load(self):
+        """Test a burst of misses for one key runs the loader once."""
+        import threading
+        import time
+        cache = ModelCache(max_entries=2, max_bytes=10 ** 9)
+        calls = []
+        
+        def loader():
+            calls.append(1)
+            time.sleep(0.2)
+            return 'model'
+        
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get_or_load('a', loader)))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert results == ['model'] * 8
+        assert len(calls) == 1
+        assert cache.stats()['coalesced_loads'] == 7
+    
+    def test_invalidate_during_load_discards_result(self):
+        """Test a load that raced with an invalidation is not cached."""
+        cache = ModelCache(max_entries=2, max_bytes=10 ** 9)
+        
+        def loader():
+            cache.invalidate('a')
+            return 'stale'
+        
+        assert cache.get_or_load('a', loader) == 'stale'
+        assert cache.get('a') is None
+    
+    def test_generations_are_pruned(self):
+        """Test load counters do not outlive evicted or invalidated keys."""
+        cache = ModelCache(max_entries=1, max_bytes=10 ** 9)
+        
+        def loader():
+            cache.invalidate('a')
+            return 'stale'
+        
+        cache.get_or_load('a', loader)
+        for key in 'bcd':
+            cache.get_or_load(key, lambda: key)
+        cache.invalidate('d')
+        
+        assert cache._generations == {}
+    
+    def test_zero_limits_are_not_defaults(self, monkeypatch):
+        """Test an explicit 0 is kept rather than replaced by the environment."""
+        monkeypatch.setenv('MODEL_CACHE_MAX_BYTES', '123')
+        
+        assert ModelCache(max_bytes=0).max_bytes == 0
+        assert ModelCache().max_bytes == 123
@@ -0,0 +1,212 @@
+"""Tests for S3Client model artifact storage against an in-memory S3."""
+
+import pickle
+import numpy as np
+import pytest
+from src.cloud import artifact_format
+from src.cloud.s3_client import S3Client
+from tests.fake_s3 import FakeS3
+
+
+class TestS3Client:
+    
+    @pytest.fixture(autouse=True)
+    def fake_s3(self, monkeypatch):
+        self.fake = FakeS3()
+        monkeypatch.setattr('src.cloud.s3_client.boto3.client', lambda *args, **kwargs: self.fake)
+    
+    def setup_method(self):
+        self.model = {'weights': np.arange(300_000, dtype=np.float64), 'name': 'test'}
+    
+    def test_large_model_round_trips_through_multipart(self, monkeypatch):
+        """Test a multi-part artifact uploads in parts and downloads in ranges."""
+        monkeypatch.setattr('src.cloud.transfer.MIN_PART_SIZE', 256 * 1024)
+        client = S3Client(part_size=256 * 1024, max_concurrency=3)
+        
+        key = client.upload_model('m1', self.model, {'accuracy': 0.9})
+        loaded = client.download_model('m1')
+        
+        np.testing.assert_array_equal(loaded['weights'], self.model['weights'])
+        assert self.fake.count('upload_part') > 1
+        assert self.fake.count('get_object', 'blobs/') > 1
+        assert artifact_format.read_header(self.fake.objects[key]) is not None
+    
+    def test_download_through_disk_cache(self, tmp_path):
+        """Test a second download reads only the pointer, not the blob."""
+        client = S3Client(cache_dir=str(tmp_path), part_size=256 * 1024)
+        client.upload_model('m1', self.model)
+        
+        client.download_model('m1')
+        ranged_gets = self.fake.count('get_object', 'blobs/')
+        loaded = client.download_model('m1')
+        
+        np.testing.assert_array_equal(loaded['weights'], self.model['weights'])
+        assert self.fake.count('get_object', 'blobs/') == ranged_gets
+        assert client.artifact_cache.stats()['hits'] == 1
+    
+    def test_missing_model_returns_none(self):
+        """Test NoSuchKey maps to None."""
+        assert S3Client().download_model('missing') is None
+    
+    def test_identical_artifact_is_uploaded_once(self):
+        """Test models sharing a trained artifact share one blob."""
+        client = S3Client()
+        
+        first_key = client.upload_model('m1', self.model, {'accuracy': 0.9})
+        puts = self.fake.count('put_object')
+        second_key = client.upload_model('m2', self.model, {'accuracy': 0.9})
+        
+        assert first_key == second_key
+        assert first_key.startswith('blobs/')
+        assert len([key for key in self.fake.objects if key.startswith('blobs/')]) == 1
+        # Only the reference marker, pointer and metadata were written
+        assert self.fake.count('put_object') - puts == 3
+        np.testing.assert_array_equal(client.download_model('m2')['weights'], self.model['weights'])
+    
+    def test_unchanged_retrain_skips_upload(self):
+        """Test update_model with byte-identical bytes uploads no blob."""
+        client = S3Client()
+        key = client.upload_model('m1', self.model, {'accuracy': 0.9})
+        
+        assert client.update_model('m1', self.model, {'accuracy': 0.91}) == key
+        assert self.fake.count('put_object', 'blobs/') == 1
+        assert self.fake.count('create_multipart_upload') == 0
+    
+    def test_blob_deleted_with_last_reference(self):
+        """Test delete_model garbage-collects blobs nothing points at."""
+        client = S3Client()
+        key = client.upload_model('m1', self.model, {'accuracy': 0.9})
+        client.upload_model('m2', self.model, {'accuracy': 0.9})
+        
+        client.delete_model('m1')
+        assert key in self.fake.objects
+        assert client.download_model('m1') is None
+        
+        client.delete_model('m2')
+        assert key not in self.fake.objects
+        assert not [k for k in self.fake.objects if k.startswith('refs/')]
+    
+    def test_retrain_releases_previous_blob(self):
+        """Test repointing a model frees its old artifact."""
+        client = S3Client()
+        old_key = client.upload_model('m1', self.model, {'accuracy': 0.9})
+        
+        new_key = client.update_model('m1', {'weights': np.zeros(3)})
+        
+        assert new_key != old_key
+        assert old_key not in self.fake.objects
+        assert client.download_model('m1')['weights'].tolist() == [0, 0, 0]
+    
+    def test_legacy_pickle_artifact_still_loads(self):
+        """Test models stored before content addressing."""
+        self.fake.put('models/old/model.pkl', pickle.dumps({'legacy': True}))
+        client = S3Client()
+        
+        assert client.model_exists('old')
+        assert client.download_model('old') == {'legacy': True}
+    
+    def test_delete_models_batches_keys(self, monkeypatch):
+        """Test bulk deletes go out in delete_objects calls of at most 1000 keys."""
+        monkeypatch.setattr('src.cloud.s3_client.DELETE_BATCH_SIZE', 4)
+        client = S3Client()
+        shared = client.upload_model('m1', self.model, {'accuracy': 0.9})
+        client.upload_model('m2', self.model, {'accuracy': 0.9})
+        kept = client.upload_model('m3', {'weights': np.zeros(3)}, {'accuracy': 0.9})
+        
+        uploads_deletes = self.fake.count('delete_object')
+        
+        assert client.delete_models(['m1', 'm2', 'missing']) == ['m1', 'm2']
+        
+        assert self.fake.count('delete_object') == uploads_deletes
+        assert all(len(kwargs['Keys']) <= 4 for name, kwargs in self.fake.calls if name == 'delete_objects')
+        assert shared not in self.fake.objects
+        assert kept in self.fake.objects
+        assert sorted(self.fake.objects) == sorted(['models/m3/model.ref', 'models/m3/metadata.json',
+                                                   'refs/' + kept.split('/')[1] + '/m3', kept])
+    
+    def test_update_with_stored_blob_writes_metadata_once(self):
+        """Test repointing at a pre-uploaded blob and merging metadata in one update."""
+        client = S3Client()
+        client.upload_model('m1', self.model, {'accuracy': 0.9})
+        digest = client.put_blob({'weights': np.zeros(3)})
+        metadata_puts = self.fake.count('put_object', 'models/m1/metadata.json')
+        
+        key = client.update_model('m1', metadata={'accuracy': 0.95}, digest=digest)
+        
+        assert key == f'blobs/{digest}'
+        assert self.fake.count('put_object', 'models/m1/metadata.json') == metadata_puts + 1
+        assert client.get_model_metadata('m1') == {'accuracy': 0.95}
+        assert client.download_model('m1')['weights'].tolist() == [0, 0, 0]
+    
+    def test_link_restores_blob_released_concurrently(self):
+        """Test a blob deleted between put_blob and link_model is uploaded again."""
+        client = S3Client()
+        key = client.upload_model('m1', self.model, {'accuracy': 0.9})
+        
+        # put_blob finds the blob and skips the upload ...
+        digest = client.put_blob(self.model)
+        uploads = self.fake.count('put_object', 'blobs/')
+        # ... then the last other reference goes away before the new one lands
+        client.delete_model('m1')
+        assert key not in self.fake.objects
+        
+        assert client.attach_model('m2', digest, {'accuracy': 0.9}, self.model) == key
+        
+        assert self.fake.count('put_object', 'blobs/') == uploads + 1
+        np.testing.assert_array_equal(client.download_model('m2')['weights'], self.model['weights'])
+    
+    def test_link_without_source_fails_when_blob_is_gone(self):
+        """Test linking to a deleted blob raises instead of leaving a dangling pointer."""
+        client = S3Client()
+        client.upload_model('m1', self.model)
+        digest = client.put_blob(self.model)
+        client.delete_model('m1')
+        
+        with pytest.raises(Exception):
+            client.link_model('m2', digest)
+        
+        assert not [k for k in self.fake.objects if k.startswith(('refs/', 'models/m2/'))]
+    
+    def test_failed_repoint_restores_metadata(self, monkeypatch):
+        """Test an update whose pointer write fails keeps the old artifact and metadata."""
+        client = S3Client()
+        old_key = client.upload_model('m1', self.model, {'accuracy': 0.9})
+        put_object = self.fake.put_object
+        
+        def failing_put_object(**kwargs):
+            if kwargs['Key'] == 'models/m1/model.ref':
+                raise Exception("S3 unavailable")
+            return put_object(**kwargs)
+        
+        monkeypatch.setattr(self.fake, 'put_object', failing_put_object)
+        with pytest.raises(Exception):
+            client.update_model('m1', {'weights': np.zeros(3)}, {'accuracy': 0.5})
+        
+        assert client.get_model_metadata('m1') == {'accuracy': 0.9}
+        np.testing.assert_array_equal(client.download_model('m1')['weights'], self.model['weights'])
+        assert [k for k in self.fake.objects if k.startswith('refs/')] == ['refs/' + old_key.split('/')[1] + '/m1']
+    
+    def test_predictor_etag_tracks_uploads(self):
+        """Test the ETag returned with a predictor matches HEAD until it is replaced."""
+        client = S3Client()
+        client.upload_predictor('m1', b'v1')
+        
+        predictor_bytes, etag = client.download_predictor('m1', return_etag=True)
+        assert predictor_bytes == b'v1' and client.predictor_etag('m1') == etag
+        
+        client.upload_predictor('m1', b'v2')
+        assert client.predictor_etag('m1') != etag
+        assert client.predictor_etag('missing') is None
+        assert client.download_predictor('missing', return_etag=True) == (None, None)
+    
+    def test_discard_blob_keeps_referenced_blobs(self):
+        """Test an unreferenced blob is deleted and a referenced one kept."""
+        client = S3Client()
+        orphan = client.put_blob({'name': 'orphan'})
+        key = client.upload_model('m1', self.model)
+        
+        client.discard_blob(orphan)
+        client.discard_blob(key.split('/')[1])
+        
+        assert f'blobs/{orphan}' not in self.fake.objects
+        assert key in self.fake.objects
@@ -0,0 +1,141 @@
+"""
+Tests for the predict-only serving API and its standalone artifact
+"""
+
+import pytest
+import json
+import subprocess
+import sys
+import os
+from unittest.mock import MagicMock
+
+import numpy as np
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.data_processor import DataProcessor
+from src.standalone import StandalonePredictor
+from src.model_cache import ModelCache
+import src.serving_api
+
+
+@pytest.fixture
+def trained_processor():
+    """Processor trained on the bundled dataset"""
+    processor = DataProcessor()
+    data = processor.clean_data(processor.load_data('data/iris_simple.csv'))
+    X, y = processor.split_features_target(data)
+    X_train, X_test, y_train, y_test = processor.prepare_data(X, y)
+    processor.train_model(X_train, y_train)
+    return processor, X
+
+
+@pytest.fixture
+def client(trained_processor, monkeypatch):
+    """Test client backed by a mocked S3 holding one predictor"""
+    processor, _ = trained_processor
+    artifacts = {'iris': StandalonePredictor.from_processor(processor).to_bytes()}
+    
+    def etag(model_id):
+        return f'"{hash(artifacts[model_id])}"' if model_id in artifacts else None
+    
+    mock_s3 = MagicMock()
+    mock_s3.artifacts = artifacts
+    mock_s3.download_predictor.side_effect = lambda model_id, return_etag=False: (
+        (artifacts.get(model_id), etag(model_id)) if return_etag else artifacts.get(model_id))
+    mock_s3.predictor_etag.side_effect = etag
+    monkeypatch.setattr(src.serving_api, 's3', mock_s3)
+    monkeypatch.setattr(src.serving_api, 'predictors',
+                        ModelCache(on_evict=src.serving_api.close_batcher))
+    monkeypatch.setattr(src.serving_api, 'batchers', {})
+    
+    src.serving_api.app.config['TESTING'] = True
+    with src.serving_api.app.test_client() as client:
+        yield client
+
+
+class TestStandalonePredictor:
+    """Test the NumPy-only artifact"""
+    
+    def test_round_trip_matches_processor(self, trained_processor):
+        """Test a reloaded artifact predicts like the processor"""
+        processor, X = trained_processor
+        predictor = StandalonePredictor.from_bytes(
+            StandalonePredictor.from_processor(processor).to_bytes()
+        )
+        
+        assert predictor.feature_names == processor.feature_names
+        np.testing.assert_array_equal(predictor.predict(X.to_numpy()), processor.predict(X))
+    
+    def test_serving_does_not_import_sklearn(self):
+        """Test the serving module loads without pandas or scikit-learn"""
+        code = ("import sys, src.serving_api; "
+                "sys.exit(bool({'sklearn', 'pandas'} & set(sys.modules)))")
+        result = subprocess.run([sys.executable, '-c', code],
+                                cwd=os.path.join(os.path.dirname(__file__), '..'))
+        assert result.returncode == 0
+
+
+class TestServingEndpoints:
+    """Test predict-only endpoints"""
+    
+    def test_predict_dict_instances(self, client, trained_processor):
+        """Test POST /models/<id>/predict with named features"""
+        processor, X = trained_processor
+        instances = X.head(3).to_dict(orient='records')
+        
+        response = client.post('/models/iris/predict', json={'instances': instances})
+        
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data['predictions'] == processor.predict(X.head(3)).tolist()
+    
+    def test_predict_unknown_model(self, client):
+        """Test POST /models/<id>/predict for a model without a predictor"""
+        response = client.post('/models/missing/predict', json={'instances': [[1, 2, 3, 4]]})
+        
+        assert response.status_code == 404
+    
+    def test_predict_wrong_width(self, client):
+        """Test rows with the wrong number of features are rejected"""
+        response = client.post('/models/iris/predict', json={'instances': [[1, 2]]})
+        
+        assert response.status_code == 400
+    
+    def test_retrained_predictor_is_picked_up(self, client, trained_processor, monkeypatch):
+        """Test a changed predictor.npz ETag replaces the cached predictor"""
+        processor, X = trained_processor
+        instances = X.head(3).to_numpy().tolist()
+        assert client.post('/models/iris/predict', json={'instances': instances}).status_code == 200
+        
+        # Retrained to always predict the last class
+        processor.model.fit(processor.transform(X), [2] * len(X))
+        src.serving_api.s3.artifacts['iris'] = StandalonePredictor.from_processor(processor).to_bytes()
+        
+        # Within the revalidation window the cached predictor is served as is
+        response = client.post('/models/iris/predict', json={'instances': instances})
+        assert json.loads(response.data)['predictions'] != [2, 2, 2]
+        src.serving_api.s3.predictor_etag.assert_not_called()
+        
+        monkeypatch.setattr(src.serving_api, 'PREDICTOR_REVALIDATE_SECONDS', 0)
+        response = client.post('/models/iris/predict', json={'instances': instances})
+        assert json.loads(response.data)['predictions'] == [2, 2, 2]
+    
+    def test_evicted_predictor_closes_its_batcher(self, client, trained_processor, monkeypatch):
+        """Test batchers are bounded by the predictor cache"""
+        _, X = trained_processor
+        artifacts = src.serving_api.s3.artifacts
+        artifacts['iris_copy'] = artifacts['iris']
+        monkeypatch.setattr(src.serving_api, 'predictors',
+                            ModelCache(max_entries=1, on_evict=src.serving_api.close_batcher))
+        instances = X.head(2).to_numpy().tolist()
+        
+        client.post('/models/iris/predict', json={'instances': instances})
+        first = src.serving_api.batchers['iris']
+        response = client.post('/models/iris_copy/predict', json={'instances': instances})
+        
+        assert response.status_code == 200
+        assert list(src.serving_api.batchers) == ['iris_copy']
+        # A request still holding the closed batcher is scored inline
+        assert len(first.predict(np.asarray(instances), timeout=2)) == 2
@@ -0,0 +1,105 @@
+"""Tests for multipart uploads and ranged downloads."""
+
+import os
+import pytest
+from botocore.exceptions import ClientError
+from src.cloud import transfer
+from tests.fake_s3 import FakeS3
+
+
+class FailingFakeS3(FakeS3):
+    #Rejects one upload part
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        if PartNumber == 3:
+            raise ClientError({'Error': {'Code': 'InternalError'}}, 'UploadPart')
+        return super().upload_part(Bucket, Key, UploadId, PartNumber, Body)
+
+
+class TestTransfer:
+    
+    @pytest.fixture(autouse=True)
+    def small_parts(self, monkeypatch):
+        # Keeps multipart tests small; the real minimum is covered separately
+        monkeypatch.setattr(transfer, 'MIN_PART_SIZE', 1024)
+    
+    def setup_method(self):
+        self.s3 = FakeS3()
+        self.payload = os.urandom(10_000)
+    
+    def test_iter_parts_regroups_chunks(self):
+        """Test chunks of any size become fixed-size parts."""
+        chunks = [b'abc', memoryview(b'defghij'), b'', b'k']
+        
+        assert list(transfer.iter_parts(chunks, 4)) == [b'abcd', b'efgh', b'ijk']
+    
+    def test_small_object_uses_single_put(self):
+        """Test one part skips the multipart protocol."""
+        transfer.upload_stream(self.s3, 'bucket', 'key', [b'small'], part_size=1024)
+        
+        assert self.s3.objects['key'] == b'small'
+        assert self.s3.count('put_object') == 1
+        assert self.s3.count('create_multipart_upload') == 0
+    
+    def test_multipart_upload_reassembles_in_order(self):
+        """Test parts uploaded concurrently complete in part-number order."""
+        chunks = [self.payload[i:i + 700] for i in range(0, len(self.payload), 700)]
+        
+        transfer.upload_stream(self.s3, 'bucket', 'key', chunks, part_size=1024, max_concurrency=4)
+        
+        assert self.s3.objects['key'] == self.payload
+        assert self.s3.count('upload_part') == 10
+    
+    def test_part_size_is_raised_to_minimum(self):
+        """Test parts below S3's minimum are never sent."""
+        chunks = [self.payload[i:i + 700] for i in range(0, len(self.payload), 700)]
+        
+        transfer.upload_stream(self.s3, 'bucket', 'key', chunks, part_size=512)
+        
+        assert self.s3.objects['key'] == self.payload
+        assert self.s3.count('upload_part') == 10
+    
+    def test_failed_part_aborts_upload(self):
+        """Test a failing part aborts the multipart upload."""
+        s3 = FailingFakeS3()
+        
+        with pytest.raises(ClientError):
+            transfer.upload_stream(s3, 'bucket', 'key', [self.payload], part_size=1024)
+        
+        assert 'key' not in s3.objects
+        assert s3.count('abort_multipart_upload') == 1
+    
+    def test_ranged_download_into_buffer(self):
+        """Test parallel range GETs fill one preallocated buffer."""
+        self.s3.put('key', self.payload)
+        sink = transfer.BufferSink()
+        
+        size, etag = transfer.download(self.s3, 'bucket', 'key', sink, part_size=1024, max_concurrency=4)
+        
+        assert bytes(sink.buffer) == self.payload
+        assert size == len(self.payload)
+        assert etag == self.s3.etag('key')
+        assert self.s3.count('get_object') == 10
+    
+    def test_ranged_download_into_file(self, tmp_path):
+        """Test range GETs land in place in a file via pwrite."""
+        self.s3.put('key', self.payload)
+        path = tmp_path / 'out'
+        fd = os.open(path, os.O_RDWR | os.O_CREAT)
+        try:
+            transfer.download(self.s3, 'bucket', 'key', transfer.FileSink(fd), part_size=999)
+        finally:
+            os.close(fd)
+        
+        assert path.read_bytes() == self.payload
+    
+    def test_small_object_downloads_in_one_request(self):
+        """Test the first range doubles as the size probe."""
+        self.s3.put('key', b'tiny')
+        sink = transfer.BufferSink()
+        
+        transfer.download(self.s3, 'bucket', 'key', sink, part_size=1024)
+        
+        assert bytes(sink.buffer) == b'tiny'
+        assert self.s3.count('get_object') == 1
+        assert self.s3.count('head_object') == 0